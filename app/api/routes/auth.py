@@ -1,7 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Security, status
 from app.schemas.auth import *
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from app.schemas.auth import AuthRequest, AuthResponse, VerifyOtpRequest
 from app.models.users import User
 from app.models.otps import Otp
@@ -9,13 +8,16 @@ from app.models.tokens import Token
 from database.session import get_db
 from datetime import timedelta
 from app.utils.auth_utils import *
-from app.utils.email_utils import send_email_async
+from app.crud.email_outbox import add_email
+from app.utils.clock import clock
 from app.core.config import settings
+from app.services.auth import api_key_header, parse_bearer, revoke_token
+from typing import Optional
 
 router = APIRouter(tags=["Authentication"])
 
 @router.post("/auth/send-otp")
-async def authenticate_user(request: AuthRequest, db: Session = Depends(get_db)):
+def authenticate_user(request: AuthRequest, db: Session = Depends(get_db)):
     """
     Authenticate user with email (part1).
     """
@@ -27,18 +29,18 @@ async def authenticate_user(request: AuthRequest, db: Session = Depends(get_db))
         db.refresh(user)
 
     code = generate_otp()
-    expires_at = db.query(func.now()).scalar() + timedelta(minutes=settings.OTP_EXPIRE_MINUTES)
+    expires_at = clock.now() + timedelta(minutes=settings.OTP_EXPIRE_MINUTES)
     otp = Otp(user_id=user.id, code=code, expires_at=expires_at)
     db.add(otp)
+    # sent by the outbox drainer once this commits; no SMTP on the request path
+    add_email(db, request.email, "Your OTP Code IN JobInsight", f"Your OTP is: {code}")
     db.commit()
 
-    send_email_async(to=request.email, subject="Your OTP Code IN JobInsight", body=f"Your OTP is: {code}")
-
     return {"message": "OTP sent to email"}
 
 
 @router.post("/auth/verify-otp", response_model=AuthResponse)
-async def verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)):
+def verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)):
     """
     Authenticate user with email (part2).
     """
@@ -51,7 +53,9 @@ async def verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)):
         Otp.user_id == user.id,
         Otp.code == request.code,
         Otp.is_used == False,
-        Otp.expires_at > func.now()
+        # expires_at is written from the app clock, so it is checked against it too
+        # (a bound parameter, not the DB's now()), tolerating skew between processes
+        Otp.expires_at > clock.now() - timedelta(seconds=settings.CLOCK_SKEW_TOLERANCE_SECONDS)
     ).first()
 
     if not otp:
@@ -60,9 +64,23 @@ async def verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)):
     otp.is_used = True
     db.commit()
 
-    token_str, expires_at = create_jwt(user.id, db)
+    token_str, expires_at = create_jwt(user.id)
     token = Token(user_id=user.id, token=token_str, expires_at=expires_at)
     db.add(token)
     db.commit()
 
     return {"access_token": token_str}
+
+
+@router.post("/auth/logout")
+def logout(api_key: Optional[str] = Security(api_key_header), db: Session = Depends(get_db)):
+    """
+    Revoke the current token.
+    """
+    if not api_key:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    if not revoke_token(db, parse_bearer(api_key)):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    return {"message": "Logged out"}
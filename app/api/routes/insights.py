@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from database.session import get_db
+from app.models.keyword import Keyword
+from app.schemas.insights import *
+from app.crud.skill_stat import get_top_skills, get_trending_skills
+from app.crud.salary_stat import get_keyword_salary_stats
+
+router = APIRouter(tags=["Insights"])
+
+@router.get("/keywords/{keyword_id}/skills/top", response_model=TopSkillsResponse)
+def top_skills(keyword_id: int,
+               window: SkillWindow = "30d",
+               limit: int = Query(20, ge=1, le=200),
+               db: Session = Depends(get_db)):
+    """
+    Most required skills among a keyword's jobs, from the precomputed stats.
+    """
+    rows = get_top_skills(db, keyword_id, window, limit)
+    if not rows and db.get(Keyword, keyword_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Keyword not found")
+
+    return TopSkillsResponse(
+        keyword_id=keyword_id,
+        window=window,
+        skills=[SkillCount(skill=skill, count=count) for skill, count in rows],
+    )
+
+@router.get("/skills/trending", response_model=TrendingSkillsResponse)
+def trending_skills(window: SkillWindow = "7d",
+                    limit: int = Query(20, ge=1, le=200),
+                    db: Session = Depends(get_db)):
+    """
+    Most required skills across all keywords, from the precomputed stats.
+    """
+    rows = get_trending_skills(db, window, limit)
+    return TrendingSkillsResponse(
+        window=window,
+        skills=[TrendingSkill(skill=skill, count=count, keywords=keywords) for skill, count, keywords in rows],
+    )
+
+@router.get("/keywords/{keyword_id}/salary-stats", response_model=SalaryStatsResponse)
+def salary_stats(keyword_id: int, db: Session = Depends(get_db)):
+    """
+    Salary percentiles and histogram (in toman) of a keyword's jobs,
+    from the precomputed stats.
+    """
+    stats = get_keyword_salary_stats(db, keyword_id)
+    if stats is None:
+        if db.get(Keyword, keyword_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Keyword not found")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Salary stats not computed yet")
+
+    return SalaryStatsResponse.model_validate(stats)
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from app.schemas.job import *
 from sqlalchemy.orm import Session
 from database.session import get_db
 from app.crud.keyword import *
 from app.crud.queue import *
-from app.crud.job import get_jobs_by_keyword
+from app.utils.text_utils import normalize_keyword
+from app.utils.cache import jobs_cache
+from app.crud.job import get_jobs_page, get_jobs_by_skill
+from app.crud.keyword_response import get_first_page
 from app.models.users import User
 from app.services.auth import get_current_user
 from typing import Union
@@ -12,42 +15,71 @@ from typing import Union
 router = APIRouter(tags=["Jobs"])
 
 @router.post("/jobs", response_model=Union[JobResponse, DetailResponse])
-async def get_jobs(request: JobRequest, 
-                   db: Session = Depends(get_db),
-                   current_user: Optional[User] = Depends(get_current_user)):
+def get_jobs(request: JobRequest, 
+             db: Session = Depends(get_db),
+             current_user: Optional[User] = Depends(get_current_user)):
     """
     Return a list of job postings based on a keyword and limit.
+    Pass the returned next_cursor as `cursor` to get the next page.
     If keyword doesn't exist, queue it for later processing.
     """
 
-    keyword_result = get_keyword(db , request.keyword)
-    if keyword_result["status"]:
-        keyword_id = keyword_result["id"]
-    elif keyword_result["status"] == 0:
-        add_keyword_to_queue(db, request.keyword)
+    keyword_text = normalize_keyword(request.keyword)
+    first_page = not request.cursor
 
-        if current_user:
-            return DetailResponse(
-                detail=f"Your request will be queued and you will be notified by email {current_user.email} once it has been processed."
-            )
-        else:
-            return DetailResponse(
-                detail="Your request cannot be processed at this time and has been placed in a queue."
+    # The keyword's data version and precomputed first page come in one query;
+    # the version is part of the cache key, so any write to its jobs, from
+    # whichever process, moves readers on to a fresh entry
+    data_version = None
+    if first_page:
+        data_version, precomputed = get_first_page(db, keyword_text, request.limit)
+        if precomputed is not None:
+            return Response(content=precomputed, media_type="application/json")
+
+    if data_version is not None:
+        cached_page = jobs_cache.get(keyword_text, data_version, request.limit)
+        if cached_page is not None:
+            return JobResponse(**cached_page)
+
+    # One query per page: the keyword is joined in, not looked up first
+    jobs, next_cursor = [], None
+    if request.limit:
+        try:
+            jobs, next_cursor = get_jobs_page(db, keyword_text, request.limit, request.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # No jobs: the keyword may not have been scraped yet
+    if not jobs:
+        keyword_result = get_keyword(db , keyword_text)
+        if keyword_result["status"] == 0:
+            add_keyword_to_queue(db, keyword_text, user_id=current_user.id if current_user else None)
+
+            if current_user:
+                return DetailResponse(
+                    detail=f"Your request will be queued and you will be notified by email {current_user.email} once it has been processed."
+                )
+            else:
+                return DetailResponse(
+                    detail="Your request cannot be processed at this time and has been placed in a queue."
+                )
+        elif keyword_result["status"] != 1:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Keyword '{request.keyword}' not found"
             )
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Keyword '{request.keyword}' not found"
-        )
 
-    if request.limit == 0:
-       return {"jobs": [], "keyword_id": request.keyword}
-    
-    jobs = get_jobs_by_keyword(db, keyword_id, request.limit)
+        if request.limit == 0:
+           return {"jobs": [], "keyword_id": request.keyword}
 
-    return JobResponse(
-        jobs=[JobBase.from_orm(job) for job in jobs]
-    )
+    page = {
+        "jobs": [JobBase.from_orm(job).model_dump() for job in jobs],
+        "next_cursor": next_cursor,
+    }
+    if data_version is not None:
+        jobs_cache.set(keyword_text, data_version, request.limit, page)
+
+    return JobResponse(**page)
 
     mock_jobs_data = [
     {
@@ -64,4 +96,13 @@ async def get_jobs(request: JobRequest,
     }
     ]
     jobs_list = [JobBase(**job) for job in mock_jobs_data]
-    return JobResponse(jobs=jobs_list)
\ No newline at end of file
+    return JobResponse(jobs=jobs_list)
+
+@router.get("/skills/{skill}/jobs", response_model=JobResponse)
+def get_jobs_for_skill(skill: str,
+                       limit: int = Query(10, ge=0, le=MAX_JOBS_PAGE_SIZE),
+                       db: Session = Depends(get_db)):
+    """
+    Return the most recent job postings that require a skill (exact match).
+    """
+    return JobResponse(jobs=get_jobs_by_skill(db, skill, limit))
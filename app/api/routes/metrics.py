@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from database.session import get_db, engine
+from app.crud.queue import get_queue_stats
+from app.utils.cache import jobs_cache
+from app.services.email import mail_queue
+from app.crud.email_outbox import get_outbox_stats
+from app.worker.scraper.driver_pool import driver_pool
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics")
+def get_metrics(db: Session = Depends(get_db)):
+    """
+    Operational metrics: keyword queue depth and time-to-results,
+    hit/miss counts of this process's jobs cache, its database pool usage
+    outbound mail delivery and the email outbox backlog.
+    The Selenium driver pool is only used here when the scheduler runs in the
+    API; the queue consumer logs its own every WORKER_STATS_SECONDS.
+    """
+    return {
+        "queue": get_queue_stats(db),
+        "jobs_cache": jobs_cache.get_metrics(),
+        "db_pool": engine.pool.get_metrics(),
+        "mail": mail_queue.get_metrics(),
+        "email_outbox": get_outbox_stats(db),
+        "driver_pool": driver_pool.get_metrics(),
+    }
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+import logging
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
+from fastapi.responses import JSONResponse
 from app.schemas.csv import *
 from app.schemas.job import *
 from sqlalchemy.orm import Session
@@ -6,30 +8,44 @@ from app.services.auth import get_current_user
 from database.session import get_db
 from app.crud.keyword import *
 from app.crud.queue import *
-from app.crud.job import get_jobs_by_keyword
+from app.utils.text_utils import normalize_keyword
+from app.crud.job import keyword_has_jobs
+from app.crud.export_job import create_export_job, get_export_job
+from app.worker.exports import download_link
+from app.utils.auth_utils import verify_download_token
+from app.core.config import settings
 from app.services.csv import *
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["Jobs"])
 
 @router.post("/jobs/download")
-async def download_jobs_csv(request: CSVRequest,
-                            db: Session = Depends(get_db), 
-                            current_user = Depends(get_current_user)):
+def download_jobs_csv(request: CSVRequest,
+                      db: Session = Depends(get_db), 
+                      current_user = Depends(get_current_user),
+                      if_none_match: Optional[str] = Header(None)):
     """
     Generate a CSV file with job postings and 
     return a link to download the file.
     If keyword is not yet processed, 
     queue it and notify the user by email when ready.
+    Exports are cached per keyword data version and carry an ETag; a request
+    whose If-None-Match already holds the current one gets 412.
+    Exports above EXPORT_ASYNC_THRESHOLD rows are built in the background:
+    the response holds a download link and the user is emailed when it's ready.
     """
 
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    keyword_result = get_keyword(db , request.keyword)
-    if keyword_result["status"]:
+    keyword_text = normalize_keyword(request.keyword)
+    keyword_result = get_keyword(db , keyword_text)
+    if keyword_result["status"] == 1:
         keyword_id = keyword_result["id"]
+        data_version = keyword_result["data_version"]
     elif keyword_result["status"] == 0:
-        add_keyword_to_queue(db, request.keyword, user_id=current_user.id)
+        add_keyword_to_queue(db, keyword_text, user_id=current_user.id)
         
         return DetailResponse(
             detail=f"Your request will be queued and you will be notified by email {current_user.email} once it has been processed."
@@ -43,12 +59,69 @@ async def download_jobs_csv(request: CSVRequest,
     if request.limit == 0:
        return {"jobs": [], "keyword_id": request.keyword}
     
-    jobs = get_jobs_by_keyword(db, keyword_id, request.limit)
-    if not jobs:
-        raise HTTPException(status_code=404, detail="No jobs found for this keyword")
-    
     # Generate unique filename
-    filename = f"jobinsight_{request.keyword}{request.limit}.xlsx"
+    filename = f"jobinsight_{request.keyword}{request.limit}.{request.format}"
+
+    key = export_key(keyword_id, request.limit, request.format, data_version)
+    cached = cached_export_response(key, request.format, filename, if_none_match, method="POST")
+    if cached is not None:
+        return cached
+
+    if not keyword_has_jobs(db, keyword_id):
+        raise HTTPException(status_code=404, detail="No jobs found for this keyword")
+
+    if request.limit is None or request.limit > settings.EXPORT_ASYNC_THRESHOLD:
+        job = create_export_job(
+            db, current_user.id, keyword_id, keyword_text,
+            request.limit, request.format, data_version
+        )
+        return CSVResponse(download_link=download_link(job.id), export_id=job.id, status=job.status)
+
+    # Rows are streamed from the database instead of being loaded up front
+    if request.format == "csv":
+        return stream_jobs_csv(keyword_id, request.limit, filename, key=key)
+
+    return build_jobs_xlsx(keyword_id, request.limit, filename, key)
+
+@router.get("/jobs/download/{export_id}")
+def download_export(export_id: str,
+                    db: Session = Depends(get_db),
+                    current_user = Depends(get_current_user),
+                    if_none_match: Optional[str] = Header(None),
+                    token: Optional[str] = Query(None)):
+    """
+    Download a background export, or report its status while it is being built.
+    Authenticated by the Authorization header, or by the signed token of
+    the link emailed when the export is ready.
+    """
+    if current_user:
+        user_id = current_user.id
+    elif token:
+        user_id = verify_download_token(export_id, token)
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired download link")
+    else:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    job = get_export_job(db, export_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+
+    link = download_link(job.id)
+    if job.status == "failed":
+        # the error can hold internals (paths, SQL); it's only logged
+        logger.error(f"Export {job.id} for '{job.keyword}' failed: {job.error}")
+        raise HTTPException(status_code=500, detail="Export failed, please request it again")
+    if job.status != "done":
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=CSVResponse(download_link=link, export_id=job.id, status=job.status).model_dump(),
+        )
 
-    # Save jobs to CSV and give its link
-    return save_jobs_to_csv(jobs, filename)
\ No newline at end of file
+    key = export_key(job.keyword_id, job.limit, job.format, job.data_version)
+    filename = f"jobinsight_{job.keyword}{job.limit or ''}.{job.format}"
+    response = cached_export_response(key, job.format, filename, if_none_match)
+    if response is None:
+        # evicted from the export cache
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export expired, please request it again")
+    return response
@@ -1,5 +1,6 @@
 # app/core/config.py
-from pydantic import EmailStr, PostgresDsn, Field
+from typing import Optional
+from pydantic import EmailStr, PostgresDsn, Field, model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -13,12 +14,27 @@ class Settings(BaseSettings):
     SMTP_USER: EmailStr
     SMTP_PASS: str
     FROM_EMAIL: EmailStr
+    SMTP_TIMEOUT_SECONDS: float = 30
+    SMTP_WORKERS: int = 2  # mail worker threads per process, each with its own SMTP session
+    SMTP_QUEUE_SIZE: int = 1000
+    SMTP_BATCH_SIZE: int = 20  # messages sent per worker wake-up
+    SMTP_MAX_RETRIES: int = 3
+    OUTBOX_LEASE_SECONDS: int = 600  # restarted right before sending; keep above the worst-case delivery time
+    OUTBOX_MAX_ATTEMPTS: int = 8  # SMTP attempts before an outbox email is marked failed
+    OUTBOX_RETRY_SECONDS: int = 60
+    OUTBOX_POLL_SECONDS: float = 5
+    OUTBOX_RETENTION_HOURS: int = 72  # sent and failed outbox emails are deleted after this
+    OUTBOX_DRAIN_IN_API: bool = False  # send outbox emails from the API process (no consumer running)
 
     # Auth
     JWT_SECRET: str = Field(..., min_length=32)
     JWT_ALGORITHM: str = "HS256"
     TOKEN_EXPIRE_HOURS: int = 24
     OTP_EXPIRE_MINUTES: int = 10
+    CLOCK_SKEW_TOLERANCE_SECONDS: int = 5  # allowed difference between the app and database clocks
+    AUTH_USER_CACHE_SIZE: int = 4096
+    AUTH_USER_CACHE_TTL_SECONDS: int = 300
+    AUTH_REVOCATION_REFRESH_SECONDS: int = 30  # revoked tokens may still be accepted by other processes this long
 
     # Database
     POSTGRES_USER : str
@@ -26,6 +42,60 @@ class Settings(BaseSettings):
     POSTGRES_DB : str
     POSTGRES_HOST : str = "localhost"
     POSTGRES_PORT : int =5432
+    # concurrent sync (database) requests per API process, default DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # so request threads never queue on the connection pool
+    API_THREADPOOL_SIZE: Optional[int] = None
+    # Size the pool for API_THREADPOOL_SIZE (or WORKER_CONCURRENCY + SCRAPER_HOST_CONCURRENCY
+    # in the consumer), times the number of processes, within Postgres max_connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # reconnect connections older than this, -1 = never
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = no timeout
+    DB_ECHO: bool = False  # log every SQL statement
+    # set False when migrations run as a deploy step (python -m database.migrations)
+    MIGRATE_ON_START: bool = True
+
+    # Scraping
+    SCRAPER_BACKEND: str = "http"  # http, selenium
+    HTTP_POOL_SIZE: int = 10
+    HTTP_TIMEOUT_SECONDS: float = 15
+    SCRAPER_HOST_CONCURRENCY: int = 8  # concurrent detail requests per job board
+    SCRAPER_BATCH_SIZE: int = 100  # jobs per persistence batch
+    SCRAPE_TTL_HOURS: int = 72  # incremental scrapes skip postings scraped more recently than this
+    SCRAPE_MAX_PAGES: int = 0  # per-site page cap per keyword, 0 = unlimited
+    SCRAPE_MAX_AGE_DAYS: int = 0  # ignore postings older than this, 0 = no cutoff
+
+    # Keyword queue
+    QUEUE_LEASE_SECONDS: int = 1800  # a claimed item is reclaimable once its lease expires
+    QUEUE_MAX_ATTEMPTS: int = 3
+    WORKER_CONCURRENCY: int = 2  # keywords processed in parallel per consumer process
+    WORKER_POLL_SECONDS: float = 5  # polling fallback when no NOTIFY arrives
+    WORKER_STATS_SECONDS: float = 60
+    RUN_SCHEDULER_IN_API: bool = False  # start the cron scheduler in the API process
+    SEED_ON_START: bool = True  # seed initial keywords in the background when the scheduler starts
+    DRIVER_POOL_SIZE: int = 4
+    DRIVER_MAX_PAGES: int = 50  # recycle a Chrome instance after this many pages
+
+    # Cache
+    JOBS_CACHE_SIZE: int = 1024  # (keyword, data_version, limit) entries kept in each process
+    JOBS_CACHE_TTL_SECONDS: int = 60
+    REDIS_URL: Optional[str] = None  # optional shared cache tier, e.g. redis://localhost:6379/0
+    PRECOMPUTED_JOBS_LIMIT: int = 100  # top jobs per keyword pre-serialized after each scrape
+
+    # Exports
+    EXPORT_DIR: str = "data/exports"
+    EXPORT_CACHE_MAX_MB: int = 512  # least recently used exports are deleted beyond this
+    EXPORT_ASYNC_THRESHOLD: int = 5000  # larger exports are built by the queue consumer
+    APP_BASE_URL: str = "http://localhost:8000"  # used for links in emails
+    DOWNLOAD_LINK_EXPIRE_HOURS: int = 72  # emailed export links work without a login until then
+
+    @model_validator(mode="after")
+    def _default_threadpool_size(self):
+        if self.API_THREADPOOL_SIZE is None:
+            self.API_THREADPOOL_SIZE = self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW
+        return self
 
     class Config:
         env_file = ".env"
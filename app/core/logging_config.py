@@ -0,0 +1,13 @@
+import logging
+
+def configure_logging():
+    """
+    Send INFO logs to scheduler.log.
+    Called by the entry points (API startup, queue consumer) rather than on
+    import, so scripts and benchmarks that import the app keep their own logging.
+    """
+    logging.basicConfig(
+        filename="scheduler.log",
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
@@ -0,0 +1,176 @@
+from datetime import timedelta
+from sqlalchemy import select, update, delete, and_, or_, case, func, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.email_outbox import EmailOutbox
+from app.crud.queue import get_worker_id
+
+# Postgres LISTEN/NOTIFY channel signalled when emails are added
+OUTBOX_CHANNEL = "email_outbox"
+
+def add_emails(db: Session, emails: list[tuple[str, str, str]]):
+    """
+    Add (to, subject, body) emails to the outbox as part of the caller's
+    transaction; they are sent only if it commits.
+    """
+    if not emails:
+        return
+    db.execute(
+        EmailOutbox.__table__.insert(),
+        [{"to_email": to, "subject": subject, "body": body, "status": "pending"} for to, subject, body in emails],
+    )
+    db.execute(text(f"NOTIFY {OUTBOX_CHANNEL}"))
+
+def add_email(db: Session, to: str, subject: str, body: str):
+    add_emails(db, [(to, subject, body)])
+
+def claim_emails(db: Session, limit: int, worker_id: str = None) -> list[EmailOutbox]:
+    """
+    Atomically claim up to `limit` due emails, including ones whose
+    lease expired (e.g. the sending process died).
+    """
+    lease = timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+
+    claimable = (
+        select(EmailOutbox.id)
+        .where(
+            or_(
+                and_(EmailOutbox.status == "pending", EmailOutbox.available_at <= func.now()),
+                and_(EmailOutbox.status == "sending", EmailOutbox.lease_expires_at < func.now()),
+            )
+        )
+        .order_by(EmailOutbox.available_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    statement = (
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(claimable.scalar_subquery()))
+        .values(
+            status="sending",
+            claimed_by=worker_id or get_worker_id(),
+            lease_expires_at=func.now() + lease,
+        )
+        .returning(EmailOutbox)
+        .execution_options(synchronize_session=False)
+    )
+    emails = db.execute(statement).scalars().all()
+    db.commit()
+    return emails
+
+def renew_email_lease(db: Session, email_id: int, worker_id: str) -> bool:
+    """
+    Restart the lease of an email this worker holds, right before sending it,
+    so OUTBOX_LEASE_SECONDS only has to cover one delivery, not the time it
+    waited in the mail queue.
+    Returns False if the email is no longer ours (reclaimed or already recorded).
+    """
+    lease = timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    result = db.execute(
+        update(EmailOutbox)
+        .where(
+            EmailOutbox.id == email_id,
+            EmailOutbox.status == "sending",
+            EmailOutbox.claimed_by == worker_id,
+        )
+        .values(lease_expires_at=func.now() + lease)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def record_delivery(db: Session, email_id: int, worker_id: str, error: str | None, attempts: int, send_seconds: float) -> bool:
+    """
+    Store the outcome of a delivery made under this worker's lease. Failed
+    emails are retried with backoff until OUTBOX_MAX_ATTEMPTS deliveries have
+    failed. The body (e.g. an OTP code) is cleared once the email is sent or
+    has failed for good.
+    Returns False if the lease was lost and the outcome was not recorded.
+    """
+    values = {
+        "attempts": EmailOutbox.attempts + attempts,
+        "send_ms": int(send_seconds * 1000),
+        "claimed_by": None,
+        "lease_expires_at": None,
+        "last_error": error,
+    }
+    if error is None:
+        values.update(status="sent", sent_at=func.now(), body="")
+    else:
+        backoff = timedelta(seconds=settings.OUTBOX_RETRY_SECONDS)
+        retry = EmailOutbox.attempts + attempts < settings.OUTBOX_MAX_ATTEMPTS
+        values.update(
+            status=case((retry, "pending"), else_="failed"),
+            body=case((retry, EmailOutbox.body), else_=""),
+            available_at=func.now() + backoff,
+        )
+    result = db.execute(
+        update(EmailOutbox)
+        .where(
+            EmailOutbox.id == email_id,
+            EmailOutbox.status == "sending",
+            EmailOutbox.claimed_by == worker_id,
+        )
+        .values(**values)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def purge_emails(db: Session, retention: timedelta, batch_size: int = 10000) -> int:
+    """
+    Delete sent and failed emails created more than `retention` ago,
+    in batches so no long-running lock is held.
+
+    Returns:
+        int: Number of emails deleted
+    """
+    total = 0
+    while True:
+        expired = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status.in_(("sent", "failed")),
+                EmailOutbox.created_at < func.now() - retention,
+            )
+            .limit(batch_size)
+        )
+        deleted = db.execute(
+            delete(EmailOutbox)
+            .where(EmailOutbox.id.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+def get_outbox_stats(db: Session, window_minutes: int = 60) -> dict:
+    """
+    Outbox backlog plus delivery latency percentiles (created to sent,
+    in seconds) of the emails sent in the last `window_minutes`.
+    """
+    latency = func.extract("epoch", EmailOutbox.sent_at - EmailOutbox.created_at)
+    recent = and_(
+        EmailOutbox.status == "sent",
+        EmailOutbox.sent_at >= func.now() - timedelta(minutes=window_minutes),
+    )
+
+    row = db.execute(
+        select(
+            func.count().filter(EmailOutbox.status == "pending"),
+            func.count().filter(EmailOutbox.status == "sending"),
+            func.count().filter(EmailOutbox.status == "failed"),
+            func.count().filter(recent),
+            func.percentile_cont(0.5).within_group(latency).filter(recent),
+            func.percentile_cont(0.95).within_group(latency).filter(recent),
+        )
+    ).one()
+
+    return {
+        "pending": row[0],
+        "sending": row[1],
+        "failed": row[2],
+        "sent_last_window": row[3],
+        "window_minutes": window_minutes,
+        "latency_seconds_p50": row[4],
+        "latency_seconds_p95": row[5],
+    }
@@ -0,0 +1,132 @@
+import uuid
+from datetime import timedelta
+from sqlalchemy import select, update, and_, or_, case, func, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.export_job import ExportJob
+from app.crud.queue import QUEUE_CHANNEL, get_worker_id
+
+def create_export_job(db: Session, user_id: int, keyword_id: int, keyword: str,
+                      limit: int | None, fmt: str, data_version: int) -> ExportJob:
+    """
+    Queue an export for the consumer and wake idle workers.
+    """
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        keyword_id=keyword_id,
+        keyword=keyword,
+        limit=limit,
+        format=fmt,
+        data_version=data_version,
+        status="pending",
+    )
+    db.add(job)
+    # consumers listen on the keyword queue channel for all work
+    db.execute(text(f"NOTIFY {QUEUE_CHANNEL}"))
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_export_job(db: Session, export_id: str, user_id: int) -> ExportJob | None:
+    """
+    Return an export job if it belongs to the user.
+    """
+    return db.execute(
+        select(ExportJob).where(ExportJob.id == export_id, ExportJob.user_id == user_id)
+    ).scalar_one_or_none()
+
+def fail_exhausted_exports(db: Session) -> int:
+    """
+    Mark exports that are out of attempts as "failed", including ones whose
+    worker died (lease expired) on the last attempt, which would otherwise
+    stay "processing" forever. Does not commit.
+
+    Returns:
+        int: Number of exports marked failed
+    """
+    result = db.execute(
+        update(ExportJob)
+        .where(
+            ExportJob.attempts >= settings.QUEUE_MAX_ATTEMPTS,
+            or_(
+                ExportJob.status == "pending",
+                and_(
+                    ExportJob.status == "processing",
+                    ExportJob.lease_expires_at < func.now(),
+                ),
+            ),
+        )
+        .values(
+            status="failed",
+            error=func.coalesce(ExportJob.error, "worker lease expired"),
+            finished_at=func.now(),
+            claimed_by=None,
+            lease_expires_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def claim_export_job(db: Session, worker_id: str = None) -> ExportJob | None:
+    """
+    Atomically claim the oldest pending (or lease-expired) export,
+    with the same SKIP LOCKED semantics as claim_pending_keywords.
+    Exports that are out of attempts are marked "failed" first.
+    """
+    lease = timedelta(seconds=settings.QUEUE_LEASE_SECONDS)
+    fail_exhausted_exports(db)
+
+    claimable = (
+        select(ExportJob.id)
+        .where(
+            or_(
+                ExportJob.status == "pending",
+                and_(
+                    ExportJob.status == "processing",
+                    ExportJob.lease_expires_at < func.now(),
+                ),
+            ),
+            ExportJob.attempts < settings.QUEUE_MAX_ATTEMPTS,
+        )
+        .order_by(ExportJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    statement = (
+        update(ExportJob)
+        .where(ExportJob.id.in_(claimable.scalar_subquery()))
+        .values(
+            status="processing",
+            claimed_by=worker_id or get_worker_id(),
+            lease_expires_at=func.now() + lease,
+            attempts=ExportJob.attempts + 1,
+        )
+        .returning(ExportJob)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    job = db.execute(statement).scalar_one_or_none()
+    db.commit()
+    return job
+
+def finish_export_job(db: Session, export_id: str, error: str | None = None):
+    """
+    Mark an export done, or failed with `error`.
+    A failed export with attempts left goes back to pending.
+    """
+    if error is None:
+        values = {"status": "done", "error": None, "finished_at": func.now()}
+    else:
+        values = {
+            "status": case(
+                (ExportJob.attempts < settings.QUEUE_MAX_ATTEMPTS, "pending"),
+                else_="failed",
+            ),
+            "error": error,
+        }
+    db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == export_id)
+        .values(**values, claimed_by=None, lease_expires_at=None)
+    )
+    db.commit()
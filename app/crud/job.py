@@ -1,15 +1,21 @@
 from typing import Iterable, List
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, update, delete, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.job import Job
 from app.models.keyword_job import keyword_job
 from app.schemas.job import JobBase, JobCreate
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from datetime import timedelta
 from app.utils.link_utils import *
+from app.utils.cursor_utils import encode_cursor, decode_cursor
+from app.utils.salary_utils import parse_salary_list
 from app.crud.keyword_job import *
 from app.crud.keyword import *
 
+# Rows per INSERT statement; keeps bind parameters well below the Postgres limit
+BULK_CHUNK_SIZE = 1000
+
 def _requirements_to_text(reqs: List[str] | None) -> str:
     if not reqs:
         return "نامشخص"
@@ -137,22 +143,86 @@ def delete_jobs_by_links(db: Session, links: List[str]) -> int:
         db.rollback()
         return 0
 
-def get_jobs_by_keyword(db: Session, keyword_id: int, limit: int):
+def get_jobs_page(db: Session, keyword: int | str, limit: int, cursor: str = None) -> tuple[List[Job], str | None]:
     """
-    Get jobs related to a keyword with limit.
+    Get one page of jobs related to a keyword, most recently seen first, in a single query.
+    `keyword` is the keyword's id, or its normalized value, which is joined
+    in rather than looked up first.
+
+    Uses keyset pagination on (keyword_job.last_update, job_id): pass the
+    returned cursor back to get the next page, which costs the same as the
+    first one however deep it is. The cursor is None on the last page.
+    Raises ValueError if the cursor is invalid.
     """
-    try:
-        keyword = db.query(Keyword).filter(Keyword.id == keyword_id).first()
-        if not keyword:
-            return [], 0
+    statement = (
+        select(Job, keyword_job.c.last_update)
+        .join(keyword_job, keyword_job.c.job_id == Job.id)
+    )
+    if isinstance(keyword, str):
+        statement = statement.join(Keyword, Keyword.id == keyword_job.c.keyword_id).where(Keyword.value == keyword)
+    else:
+        statement = statement.where(keyword_job.c.keyword_id == keyword)
+    if cursor:
+        last_update, job_id = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(keyword_job.c.last_update, keyword_job.c.job_id) < tuple_(last_update, job_id)
+        )
+    statement = statement.order_by(
+        keyword_job.c.last_update.desc(), keyword_job.c.job_id.desc()
+    ).limit(limit + 1)
 
-        jobs_query = db.query(Job).join(Job.keywords).filter(Keyword.id == keyword_id)
+    rows = db.execute(statement).all()
 
-        total_jobs = jobs_query.count()
-        real_limit = min(limit, total_jobs)
+    next_cursor = None
+    if len(rows) > limit:
+        last_job, last_update = rows[limit - 1]
+        next_cursor = encode_cursor(last_update, last_job.id)
 
-        jobs = jobs_query.limit(real_limit).all()
+    return [job for job, _ in rows[:limit]], next_cursor
 
+def keyword_has_jobs(db: Session, keyword_id: int) -> bool:
+    """
+    Check whether any job is linked to a keyword.
+    """
+    statement = select(keyword_job.c.job_id).where(keyword_job.c.keyword_id == keyword_id).limit(1)
+    return db.execute(statement).first() is not None
+
+def get_jobs_by_skill(db: Session, skill: str, limit: int = 10) -> List[Job]:
+    """
+    Return the most recently stored jobs that require `skill` (exact match),
+    using the GIN index on job.skills.
+    """
+    statement = (
+        select(Job)
+        .where(Job.skills.contains([skill.strip()]))
+        .order_by(Job.id.desc())
+        .limit(limit)
+    )
+    return db.execute(statement).scalars().all()
+
+def iter_jobs_by_keyword(db: Session, keyword_id: int, limit: int, chunk_size: int = 1000):
+    """
+    Stream (title, salary, link, skills) rows of a keyword's jobs, in the
+    same order as get_jobs_page, through a server-side cursor.
+    Only `chunk_size` rows are held in memory at a time.
+    """
+    statement = (
+        select(Job.title, Job.salary, Job.link, Job.skills)
+        .join(keyword_job, keyword_job.c.job_id == Job.id)
+        .where(keyword_job.c.keyword_id == keyword_id)
+        .order_by(keyword_job.c.last_update.desc(), keyword_job.c.job_id.desc())
+        .limit(limit)
+        .execution_options(yield_per=chunk_size)
+    )
+    for row in db.execute(statement):
+        yield row
+
+def get_jobs_by_keyword(db: Session, keyword_id: int, limit: int):
+    """
+    Get jobs related to a keyword with limit, most recently seen first.
+    """
+    try:
+        jobs, _ = get_jobs_page(db, keyword_id, limit)
         return jobs
     
     except SQLAlchemyError as e:
@@ -164,9 +234,172 @@ def get_jobs_by_keyword(db: Session, keyword_id: int, limit: int):
         # Error handling
          return {"status": "error", "message": f"Unexpected: {str(e)}"}
 
+def _clean_skills(skills: List[str] | None) -> List[str]:
+    # strip, drop blanks/placeholders and duplicates, keep order
+    cleaned = {}
+    for skill in skills or []:
+        skill = skill.strip()
+        if skill and skill != "نامشخص":
+            cleaned[skill] = None
+    return list(cleaned)
+
+def upsert_jobs(db: Session, jobs_in: Iterable[JobCreate], chunk_size: int = BULK_CHUNK_SIZE) -> tuple[List[int], List[int]]:
+    """
+    Insert or update many jobs with one INSERT ... ON CONFLICT (link) DO UPDATE
+    per chunk, instead of a SELECT + flush per job.
+    Stored jobs whose title, salary and skills are unchanged are not rewritten,
+    only their scraped_at is refreshed.
+    Does not commit, so it can share the caller's transaction.
+
+    Returns:
+        tuple: IDs of all upserted jobs, and of those inserted or changed
+    """
+    # Postgres refuses to update the same row twice in one statement,
+    # so duplicate links inside the batch are collapsed (last one wins).
+    rows = {}
+    for job in jobs_in:
+        rows[job.link] = {
+            "title": job.title,
+            "salary": job.salary,
+            "skills": _clean_skills(job.skills),
+            "link": job.link,
+        }
+    rows = list(rows.values())
+
+    bounds = parse_salary_list([row["salary"] for row in rows])
+    for row, (salary_min, salary_max) in zip(rows, bounds):
+        row["salary_min"] = salary_min
+        row["salary_max"] = salary_max
+
+    job_ids = []
+    changed_ids = []
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        statement = pg_insert(Job).values(chunk)
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[Job.link],
+            set_={
+                "title": excluded.title,
+                "salary": excluded.salary,
+                "salary_min": excluded.salary_min,
+                "salary_max": excluded.salary_max,
+                "skills": excluded.skills,
+                "scraped_at": func.now(),
+            },
+            # unchanged rows are skipped, and not returned
+            where=tuple_(Job.title, Job.salary, Job.skills).is_distinct_from(
+                tuple_(excluded.title, excluded.salary, excluded.skills)
+            ),
+        ).returning(Job.id, Job.link)
+        changed = db.execute(statement).all()
+        changed_ids.extend(job_id for job_id, _ in changed)
+        job_ids.extend(job_id for job_id, _ in changed)
+
+        changed_links = {link for _, link in changed}
+        unchanged_links = [row["link"] for row in chunk if row["link"] not in changed_links]
+        if unchanged_links:
+            job_ids.extend(db.execute(
+                update(Job)
+                .where(Job.link.in_(unchanged_links))
+                .values(scraped_at=func.now())
+                .returning(Job.id)
+            ).scalars().all())
+
+    return job_ids, changed_ids
+
+def bump_data_versions_for_jobs(db: Session, job_ids: List[int]):
+    """
+    Bump the data version of every keyword linked to any of `job_ids`,
+    e.g. after their content changed. Part of the caller's transaction.
+    """
+    for i in range(0, len(job_ids), BULK_CHUNK_SIZE):
+        linked = select(keyword_job.c.keyword_id).where(keyword_job.c.job_id.in_(job_ids[i:i + BULK_CHUNK_SIZE]))
+        db.execute(
+            update(Keyword)
+            .where(Keyword.id.in_(linked))
+            .values(data_version=Keyword.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+def _get_or_create_keyword_id(db: Session, keyword_text: str) -> int:
+    keyword_data = get_keyword(db, keyword_text)
+
+    if keyword_data["status"] == 1:
+        return keyword_data["id"]
+
+    new_keyword = Keyword(value=keyword_text)
+    db.add(new_keyword)
+    db.flush()  # get keyword.id without committing
+    return new_keyword.id
+
+def get_fresh_job_links(db: Session, links: List[str], ttl: timedelta) -> set[str]:
+    """
+    Return the subset of links that are already stored and were scraped within `ttl`.
+    Uses a single query for the whole list.
+    """
+    if not links:
+        return set()
+
+    statement = select(Job.link).where(
+        Job.link.in_(links),
+        Job.scraped_at >= func.now() - ttl,
+    )
+    return set(db.execute(statement).scalars().all())
+
+def get_keyword_job_links(db: Session, keyword_text: str) -> set[str]:
+    """
+    Return the links of all jobs already linked to a keyword.
+    """
+    statement = (
+        select(Job.link)
+        .join(keyword_job, keyword_job.c.job_id == Job.id)
+        .join(Keyword, Keyword.id == keyword_job.c.keyword_id)
+        .where(Keyword.value == keyword_text)
+    )
+    return set(db.execute(statement).scalars().all())
+
+def touch_jobs_for_keyword(db: Session, keyword_text: str, links: List[str]) -> dict:
+    """
+    Mark already-stored jobs as seen again for a keyword without re-scraping them:
+    refresh their scraped_at and the keyword_job last_update.
+
+    Returns:
+        dict: {"status": 1, "job_ids": [...]} or {"status": 0, "error": ...}
+    """
+    if not links:
+        return {"status": 0, "error": "No links provided."}
+    try:
+        keyword_id = _get_or_create_keyword_id(db, keyword_text)
+
+        job_ids = []
+        for i in range(0, len(links), BULK_CHUNK_SIZE):
+            statement = (
+                update(Job)
+                .where(Job.link.in_(links[i:i + BULK_CHUNK_SIZE]))
+                .values(scraped_at=func.now())
+                .returning(Job.id)
+            )
+            job_ids.extend(db.execute(statement).scalars().all())
+
+        # refreshed relations move to the top of the keyword's jobs,
+        # so its exports change even if no job was newly linked
+        upsert_keyword_job_relations(db, keyword_id, job_ids)
+        if job_ids:
+            bump_data_version(db, keyword_id)
+
+        db.commit()
+        return {"status": 1, "keyword_id": keyword_id, "job_ids": job_ids}
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        return {"status": 0, "error": str(e)}
+
 def create_jobs_with_keyword(db: Session, keyword_text: str, jobs_in: Iterable[JobCreate]) -> dict:
     """
     Save a keyword, its jobs, and relations to the database in a single transaction.
+    Jobs and relations are written with set-based upserts, so the number of
+    round trips depends on the number of chunks, not the number of jobs.
     
     Returns:
         dict: {
@@ -179,61 +412,21 @@ def create_jobs_with_keyword(db: Session, keyword_text: str, jobs_in: Iterable[J
         return {"status": 0, "error": "No jobs provided."}
     try:
         # 1. Create or get keyword
-        keyword_data = get_keyword(db, keyword_text)
-
-        if keyword_data["status"] == 1:
-            keyword_id = keyword_data["id"]
-        else:
-            new_keyword = Keyword(value=keyword_text)
-            db.add(new_keyword)
-            db.flush()  # get keyword.id without committing
-            keyword_id = new_keyword.id
+        keyword_id = _get_or_create_keyword_id(db, keyword_text)
         
-        # 2. Create jobs
-        job_ids = []
-        for job in jobs_in:
-            db_job = db.query(Job).filter(Job.link == job.link).first()
-            if db_job:
-                # Update existing job
-                db_job.title = job.title
-                db_job.salary = job.salary
-                db_job.skills = ",".join(job.skills) if job.skills else "نامشخص"
-                db_job.scraped_at = func.now()
-            else:
-                db_job = Job(
-                    title=job.title,
-                    salary=job.salary,
-                    skills=",".join(job.skills) if job.skills else "نامشخص",
-                    link=job.link
-                )
-                db.add(db_job)
-            db.flush()
-            job_ids.append(db_job.id)
-
-        # 3. Create keyword-job relations
-        for jid in job_ids:
-            exists = db.execute(
-                select(keyword_job.c.keyword_id).where(
-                    keyword_job.c.keyword_id == keyword_id,
-                    keyword_job.c.job_id == jid
-                )
-            ).scalar_one_or_none()
-            
-            if not exists:
-                db.execute(keyword_job.insert().values(keyword_id=keyword_id, job_id=jid))
-            else:
-                db.execute(
-                    update(keyword_job)
-                    .where(
-                        keyword_job.c.keyword_id == keyword_id,
-                        keyword_job.c.job_id == jid
-                    )
-                    .values(last_update=func.now())
-                )
+        # 2. Create or update jobs; changed jobs invalidate the exports
+        # of every keyword they are already linked to
+        job_ids, changed_ids = upsert_jobs(db, jobs_in)
+        bump_data_versions_for_jobs(db, changed_ids)
+
+        # 3. Create or refresh keyword-job relations; either reorders the keyword's jobs
+        upsert_keyword_job_relations(db, keyword_id, job_ids)
+        if job_ids:
+            bump_data_version(db, keyword_id)
 
         db.commit()
         return {"status": 1, "keyword_id": keyword_id, "job_ids": job_ids}
 
     except SQLAlchemyError as e:
         db.rollback()
-        return {"status": 0, "error": str(e)}
\ No newline at end of file
+        return {"status": 0, "error": str(e)}
@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, update, func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from app.models.keyword import Keyword 
@@ -7,7 +7,8 @@ def get_keyword(db: Session, keyword_text: str):
 
     """
     Check if a keyword exists in the database.
-    - If exists: return status=1 and its ID
+    - If exists: return status=1, its ID, data version and when its
+      last complete scrape finished (scraped_at, None if none did)
     - If not: return status=0
     - On error: return status=-1 with error message
     """
@@ -21,7 +22,9 @@ def get_keyword(db: Session, keyword_text: str):
         if existing_keyword:
             return {
                 "status": 1,  # Keyword exists
-                "id": existing_keyword.id
+                "id": existing_keyword.id,
+                "data_version": existing_keyword.data_version,
+                "scraped_at": existing_keyword.scraped_at,
             }
         return {
             "status": 0,
@@ -66,4 +69,25 @@ def create_keyword(db: Session, keyword_text: str):
                 "status": -1, # Error occurred
                 "error": str(e)
             }
-            
+
+def bump_data_version(db: Session, keyword_id: int):
+    """
+    Increment a keyword's data version so artifacts derived from its jobs
+    (e.g. cached exports) are rebuilt. Part of the caller's transaction.
+    """
+    db.execute(
+        update(Keyword)
+        .where(Keyword.id == keyword_id)
+        .values(data_version=Keyword.data_version + 1)
+    )
+
+def mark_keyword_scraped(db: Session, keyword_text: str):
+    """
+    Record that a scrape of the keyword ran to the end, so it isn't
+    scraped again from scratch. Part of the caller's transaction.
+    """
+    db.execute(
+        update(Keyword)
+        .where(Keyword.value == keyword_text)
+        .values(scraped_at=func.now())
+    )
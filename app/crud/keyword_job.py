@@ -1,4 +1,5 @@
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, update, delete, func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.models.keyword_job import keyword_job
 
@@ -104,3 +105,28 @@ def delete_keyword_job_records(db: Session, keyword_id: int = None, job_id: int
     except Exception:
         db.rollback()
         return 0
+
+def upsert_keyword_job_relations(db: Session, keyword_id: int, job_ids: list[int], chunk_size: int = 1000) -> int:
+    """
+    Link a keyword to many jobs with one INSERT ... ON CONFLICT per chunk.
+    Existing relations only get their last_update refreshed.
+    Does not commit, so it can share the caller's transaction.
+
+    Returns:
+        int: Number of relations inserted (not counting refreshed ones)
+    """
+    job_ids = list(dict.fromkeys(job_ids))  # drop duplicates, keep order
+    total = 0
+
+    for i in range(0, len(job_ids), chunk_size):
+        chunk = job_ids[i:i + chunk_size]
+        statement = pg_insert(keyword_job).values(
+            [{"keyword_id": keyword_id, "job_id": job_id} for job_id in chunk]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[keyword_job.c.keyword_id, keyword_job.c.job_id],
+            set_={"last_update": func.now()},
+        ).returning(literal_column("xmax = 0"))  # true for inserted rows, false for updated ones
+        total += sum(db.execute(statement).scalars().all())
+
+    return total
@@ -0,0 +1,110 @@
+import json
+from sqlalchemy import and_, select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.job import Job
+from app.models.keyword import Keyword
+from app.models.keyword_job import keyword_job
+from app.models.keyword_response import KeywordResponse
+from app.schemas.job import JobBase
+from app.utils.cursor_utils import encode_cursor
+
+def refresh_keyword_response(db: Session, keyword_id: int, top_n: int = None) -> int:
+    """
+    Serialize the top `top_n` jobs of a keyword once and store the bytes,
+    along with where each array element ends so any smaller limit can be
+    served as a prefix.
+
+    Returns:
+        int: Number of jobs stored
+    """
+    top_n = top_n or settings.PRECOMPUTED_JOBS_LIMIT
+
+    # read before the jobs: a bump in between leaves the blob marked stale
+    data_version = db.execute(select(Keyword.data_version).where(Keyword.id == keyword_id)).scalar_one()
+
+    # same order as get_jobs_page, so cursors continue where the blob ends
+    rows = db.execute(
+        select(Job, keyword_job.c.last_update)
+        .join(keyword_job, keyword_job.c.job_id == Job.id)
+        .where(keyword_job.c.keyword_id == keyword_id)
+        .order_by(keyword_job.c.last_update.desc(), keyword_job.c.job_id.desc())
+        .limit(top_n + 1)
+    ).all()
+
+    complete = len(rows) <= top_n
+    rows = rows[:top_n]
+
+    jobs_json = bytearray(b"[")
+    offsets = []
+    cursors = []
+    for i, (job, last_update) in enumerate(rows):
+        if i:
+            jobs_json += b","
+        jobs_json += JobBase.from_orm(job).model_dump_json().encode()
+        offsets.append(len(jobs_json))
+        cursors.append(encode_cursor(last_update, job.id))
+    jobs_json += b"]"
+
+    statement = pg_insert(KeywordResponse).values(
+        keyword_id=keyword_id,
+        jobs_json=bytes(jobs_json),
+        offsets=offsets,
+        cursors=cursors,
+        complete=complete,
+        data_version=data_version,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[KeywordResponse.keyword_id],
+        set_={
+            "jobs_json": statement.excluded.jobs_json,
+            "offsets": statement.excluded.offsets,
+            "cursors": statement.excluded.cursors,
+            "complete": statement.excluded.complete,
+            "data_version": statement.excluded.data_version,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+    db.commit()
+    return len(rows)
+
+def get_first_page(db: Session, keyword_text: str, limit: int) -> tuple[int | None, bytes | None]:
+    """
+    Look up a keyword's current data_version (None if the keyword doesn't
+    exist) together with its precomputed first page, in one query.
+    The page is the serialized JobResponse body ({"jobs": [...], "next_cursor": ...})
+    for the first `limit` jobs, or None if it has not been precomputed, the
+    keyword's jobs changed since (its data_version moved on) or `limit`
+    exceeds what is stored.
+    """
+    row = db.execute(
+        select(Keyword.data_version, KeywordResponse)
+        .outerjoin(KeywordResponse, and_(
+            KeywordResponse.keyword_id == Keyword.id,
+            KeywordResponse.data_version == Keyword.data_version,
+        ))
+        .where(Keyword.value == keyword_text)
+    ).first()
+
+    if row is None:
+        return None, None
+    data_version, response = row
+    if response is None or not limit or len(response.cursors) != len(response.offsets):
+        return data_version, None
+
+    count = len(response.offsets)
+    if limit < count:
+        jobs_json = response.jobs_json[:response.offsets[limit - 1]] + b"]"
+        next_cursor = response.cursors[limit - 1]
+    elif response.complete:
+        jobs_json = response.jobs_json
+        next_cursor = None
+    elif limit == count:
+        jobs_json = response.jobs_json
+        next_cursor = response.cursors[-1]
+    else:
+        return data_version, None
+
+    return data_version, b'{"jobs":' + jobs_json + b',"next_cursor":' + json.dumps(next_cursor).encode() + b'}'
@@ -1,23 +1,277 @@
+import os
+import socket
+from sqlalchemy import select, update, and_, or_, case, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.models.keyword_queue import KeywordQueue
-from datetime import datetime
+from app.models.keyword_queue_subscriber import keyword_queue_subscriber
+from app.models.users import User
+from app.utils.text_utils import normalize_keyword
+from datetime import timedelta
+
+ACTIVE_STATUSES = ("pending", "processing")
+
+# Postgres LISTEN/NOTIFY channel signalled when work is queued
+QUEUE_CHANNEL = "keyword_queue"
+
+# insert-or-join attempts while the keyword's active item finishes concurrently
+QUEUE_INSERT_RETRIES = 5
+
+class QueueError(Exception):
+    """
+    Raised when a keyword can't be queued.
+    """
+
+class LeaseLost(Exception):
+    """
+    Raised when a worker no longer holds the queue item it is processing.
+    """
+
+def get_worker_id() -> str:
+    """
+    Identify this process in queue leases.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
 
 def add_keyword_to_queue(db: Session, keyword: str, user_id: int = None):
-    queue_item = KeywordQueue(keyword=keyword, user_id=user_id)
-    db.add(queue_item)
+    """
+    Queue a keyword for scraping, coalescing duplicate requests.
+
+    Requests are keyed by normalize_keyword(), so all pending/processing
+    requests for the same keyword share one work item; the requesting user
+    is added to that item's subscribers.
+    Returns the ID of the work item.
+    Raises QueueError if no active item could be created or joined.
+    """
+    normalized = normalize_keyword(keyword)
+
+    for _ in range(QUEUE_INSERT_RETRIES):
+        statement = (
+            pg_insert(KeywordQueue)
+            .values(keyword=normalized, user_id=user_id, status="pending")
+            .on_conflict_do_nothing(
+                index_elements=[KeywordQueue.keyword],
+                index_where=KeywordQueue.status.in_(ACTIVE_STATUSES),
+            )
+            .returning(KeywordQueue.id)
+        )
+        queue_id = db.execute(statement).scalar_one_or_none()
+
+        if queue_id is not None:
+            # wake up idle queue workers once this transaction commits
+            db.execute(text(f"NOTIFY {QUEUE_CHANNEL}"))
+        else:
+            # Already queued: lock the active item so it can't be marked done
+            # before our subscription is committed
+            queue_id = db.execute(
+                select(KeywordQueue.id)
+                .where(
+                    KeywordQueue.keyword == normalized,
+                    KeywordQueue.status.in_(ACTIVE_STATUSES),
+                )
+                .with_for_update(read=True)
+            ).scalar_one_or_none()
+
+        # The active item may have finished in between; try again
+        if queue_id is not None:
+            break
+        db.rollback()
+    else:
+        raise QueueError(f"Could not queue keyword '{normalized}': its active item kept changing")
+
+    if user_id is not None:
+        db.execute(
+            pg_insert(keyword_queue_subscriber)
+            .values(queue_id=queue_id, user_id=user_id)
+            .on_conflict_do_nothing()
+        )
     db.commit()
-    db.refresh(queue_item)
-    return queue_item.id
+    return queue_id
+
+def get_subscriber_emails(db: Session, queue_id: int) -> list[str]:
+    """
+    Return the emails of all users waiting on a queue item.
+    """
+    statement = (
+        select(User.email)
+        .join(keyword_queue_subscriber, keyword_queue_subscriber.c.user_id == User.id)
+        .where(keyword_queue_subscriber.c.queue_id == queue_id)
+    )
+    return list(db.execute(statement).scalars().all())
 
 def get_pending_keywords(db: Session, limit: int = 10):
     items = db.query(KeywordQueue).filter(KeywordQueue.status=="pending").limit(limit).all()
     return items
 
-def mark_keyword_done(db: Session, keyword_id: int):
-    item = db.query(KeywordQueue).filter(KeywordQueue.id == keyword_id).first()
-    if item:
-        item.status = "done"
-        item.processed_at = datetime.now()
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+def claim_pending_keywords(db: Session, limit: int = 10, worker_id: str = None, keyword: str = None):
+    """
+    Atomically claim up to `limit` queue items for this worker.
+
+    Pending items and items whose processing lease has expired are locked with
+    FOR UPDATE SKIP LOCKED and switched to "processing" in a single statement,
+    so concurrent workers (threads, processes or hosts) never claim the same item.
+    Items that already failed QUEUE_MAX_ATTEMPTS times are marked "failed" first.
+    """
+    lease = timedelta(seconds=settings.QUEUE_LEASE_SECONDS)
+    fail_exhausted_keywords(db)
+
+    claimable = (
+        select(KeywordQueue.id)
+        .where(
+            or_(
+                KeywordQueue.status == "pending",
+                and_(
+                    KeywordQueue.status == "processing",
+                    KeywordQueue.lease_expires_at < func.now(),
+                ),
+            ),
+            KeywordQueue.attempts < settings.QUEUE_MAX_ATTEMPTS,
+        )
+        .order_by(KeywordQueue.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if keyword is not None:
+        claimable = claimable.where(KeywordQueue.keyword == keyword)
+
+    statement = (
+        update(KeywordQueue)
+        .where(KeywordQueue.id.in_(claimable.scalar_subquery()))
+        .values(
+            status="processing",
+            claimed_by=worker_id or get_worker_id(),
+            claimed_at=func.now(),
+            lease_expires_at=func.now() + lease,
+            attempts=KeywordQueue.attempts + 1,
+        )
+        .returning(KeywordQueue)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    items = db.execute(statement).scalars().all()
+    db.commit()
+    return items
+
+def renew_lease(db: Session, keyword_id: int, worker_id: str = None) -> bool:
+    """
+    Extend the processing lease of an item this worker holds.
+    Returns False if the lease was lost to another worker.
+    """
+    lease = timedelta(seconds=settings.QUEUE_LEASE_SECONDS)
+    result = db.execute(
+        update(KeywordQueue)
+        .where(
+            KeywordQueue.id == keyword_id,
+            KeywordQueue.status == "processing",
+            KeywordQueue.claimed_by == (worker_id or get_worker_id()),
+        )
+        .values(lease_expires_at=func.now() + lease)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def fail_exhausted_keywords(db: Session) -> int:
+    """
+    Mark items that are out of attempts as "failed": pending ones, and
+    processing ones whose worker died (lease expired) on the last attempt.
+    Failed items free the keyword's active slot, so it can be queued again.
+    Does not commit.
+
+    Returns:
+        int: Number of items marked failed
+    """
+    result = db.execute(
+        update(KeywordQueue)
+        .where(
+            KeywordQueue.attempts >= settings.QUEUE_MAX_ATTEMPTS,
+            or_(
+                KeywordQueue.status == "pending",
+                and_(
+                    KeywordQueue.status == "processing",
+                    KeywordQueue.lease_expires_at < func.now(),
+                ),
+            ),
+        )
+        .values(status="failed", processed_at=func.now(), claimed_by=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def release_keyword(db: Session, keyword_id: int, worker_id: str = None):
+    """
+    Put an item this worker holds back to "pending" so it can be retried,
+    or mark it "failed" once it has used up QUEUE_MAX_ATTEMPTS.
+    Items another worker has taken over since are left alone.
+    """
+    exhausted = KeywordQueue.attempts >= settings.QUEUE_MAX_ATTEMPTS
+    db.execute(
+        update(KeywordQueue)
+        .where(
+            KeywordQueue.id == keyword_id,
+            KeywordQueue.status == "processing",
+            KeywordQueue.claimed_by == (worker_id or get_worker_id()),
+        )
+        .values(
+            status=case((exhausted, "failed"), else_="pending"),
+            processed_at=case((exhausted, func.now()), else_=None),
+            claimed_by=None,
+            lease_expires_at=None,
+        )
+    )
+    db.execute(text(f"NOTIFY {QUEUE_CHANNEL}"))
+    db.commit()
+
+def mark_keyword_done(db: Session, keyword_id: int, worker_id: str = None) -> bool:
+    """
+    Mark an item this worker holds as "done", locking its row until the
+    caller's transaction ends, so nobody can join it as a subscriber
+    in between. Does not commit.
+    Returns False if the lease was lost.
+    """
+    done_id = db.execute(
+        update(KeywordQueue)
+        .where(
+            KeywordQueue.id == keyword_id,
+            KeywordQueue.status == "processing",
+            KeywordQueue.claimed_by == (worker_id or get_worker_id()),
+        )
+        .values(status="done", processed_at=func.now(), lease_expires_at=None)
+        .returning(KeywordQueue.id)
+    ).scalar_one_or_none()
+    return done_id is not None
+
+def get_queue_stats(db: Session, window_minutes: int = 60) -> dict:
+    """
+    Queue depth plus wait and processing time percentiles (in seconds)
+    of the items finished in the last `window_minutes`.
+    """
+    wait_time = func.extract("epoch", KeywordQueue.claimed_at - KeywordQueue.created_at)
+    processing_time = func.extract("epoch", KeywordQueue.processed_at - KeywordQueue.claimed_at)
+    recent = and_(
+        KeywordQueue.status == "done",
+        KeywordQueue.claimed_at.isnot(None),
+        KeywordQueue.processed_at >= func.now() - timedelta(minutes=window_minutes),
+    )
+
+    row = db.execute(
+        select(
+            func.count().filter(KeywordQueue.status == "pending"),
+            func.count().filter(KeywordQueue.status == "processing"),
+            func.count().filter(recent),
+            func.percentile_cont(0.5).within_group(wait_time).filter(recent),
+            func.percentile_cont(0.95).within_group(wait_time).filter(recent),
+            func.percentile_cont(0.5).within_group(processing_time).filter(recent),
+            func.percentile_cont(0.95).within_group(processing_time).filter(recent),
+        )
+    ).one()
+
+    return {
+        "pending": row[0],
+        "processing": row[1],
+        "done_last_window": row[2],
+        "window_minutes": window_minutes,
+        "wait_seconds_p50": row[3],
+        "wait_seconds_p95": row[4],
+        "processing_seconds_p50": row[5],
+        "processing_seconds_p95": row[6],
+    }
@@ -0,0 +1,62 @@
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.job import Job
+from app.models.keyword_job import keyword_job
+from app.models.keyword_salary_stat import KeywordSalaryStat
+
+SALARY_HISTOGRAM_BINS = 10
+
+def refresh_keyword_salary_stats(db: Session, keyword_id: int) -> int:
+    """
+    Recompute the salary distribution of one keyword's jobs and store it.
+    Each job counts with the midpoint of its salary range (or its only bound).
+
+    Returns:
+        int: Number of jobs with a known salary
+    """
+    rows = db.execute(
+        select(Job.salary_min, Job.salary_max)
+        .join(keyword_job, keyword_job.c.job_id == Job.id)
+        .where(keyword_job.c.keyword_id == keyword_id)
+    ).all()
+
+    bounds = np.array(rows, dtype=float).reshape(-1, 2)
+    low, high = bounds[:, 0], bounds[:, 1]
+    salaries = np.where(np.isnan(low), high, np.where(np.isnan(high), low, (low + high) / 2))
+    salaries = salaries[~np.isnan(salaries)]
+
+    values = {
+        "keyword_id": keyword_id,
+        "jobs": len(rows),
+        "jobs_with_salary": len(salaries),
+        "min": None, "p25": None, "p50": None, "p75": None, "p90": None, "max": None,
+        "histogram": [],
+    }
+    if len(salaries):
+        p25, p50, p75, p90 = np.percentile(salaries, [25, 50, 75, 90])
+        counts, edges = np.histogram(salaries, bins=SALARY_HISTOGRAM_BINS)
+        values.update(
+            min=int(salaries.min()), p25=int(p25), p50=int(p50), p75=int(p75), p90=int(p90),
+            max=int(salaries.max()),
+            histogram=[
+                {"from": int(edges[i]), "to": int(edges[i + 1]), "count": int(count)}
+                for i, count in enumerate(counts)
+            ],
+        )
+
+    statement = pg_insert(KeywordSalaryStat).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[KeywordSalaryStat.keyword_id],
+        set_={
+            **{key: statement.excluded[key] for key in values if key != "keyword_id"},
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+    db.commit()
+    return len(salaries)
+
+def get_keyword_salary_stats(db: Session, keyword_id: int) -> KeywordSalaryStat | None:
+    return db.get(KeywordSalaryStat, keyword_id)
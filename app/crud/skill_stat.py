@@ -0,0 +1,115 @@
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import select, delete, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.job import Job
+from app.models.keyword import Keyword
+from app.models.keyword_job import keyword_job
+from app.models.keyword_skill_stat import KeywordSkillStat
+from app.models.skill_stat import SkillStat
+
+# window name -> days of keyword_job.last_update it covers (None = all time)
+SKILL_WINDOWS = {"7d": 7, "30d": 30, "all": None}
+
+def refresh_keyword_skill_stats(db: Session, keyword_id: int) -> int:
+    """
+    Recount the skills of one keyword's jobs for every window, replace its
+    stored stats and apply the difference to the totals in skill_stat.
+    Reads only that keyword's jobs.
+
+    Returns:
+        int: Number of distinct skills
+    """
+    # One refresh per keyword at a time, so its difference is applied once
+    db.execute(select(Keyword.id).where(Keyword.id == keyword_id).with_for_update(key_share=True))
+
+    skills = (
+        select(func.unnest(Job.skills).label("skill"), keyword_job.c.last_update)
+        .join(keyword_job, keyword_job.c.job_id == Job.id)
+        .where(keyword_job.c.keyword_id == keyword_id)
+        .subquery()
+    )
+    counts = [
+        func.count().filter(skills.c.last_update >= func.now() - timedelta(days=days))
+        if days is not None else func.count()
+        for days in SKILL_WINDOWS.values()
+    ]
+    rows = db.execute(select(skills.c.skill, *counts).group_by(skills.c.skill)).all()
+
+    old = db.execute(
+        delete(KeywordSkillStat)
+        .where(KeywordSkillStat.keyword_id == keyword_id)
+        .returning(KeywordSkillStat.window, KeywordSkillStat.skill, KeywordSkillStat.count)
+    ).all()
+    new = [
+        (window, row[0], count)
+        for row in rows
+        for window, count in zip(SKILL_WINDOWS, row[1:])
+        if count
+    ]
+    if new:
+        db.execute(KeywordSkillStat.__table__.insert(), [
+            {"keyword_id": keyword_id, "window": window, "skill": skill, "count": count}
+            for window, skill, count in new
+        ])
+    _apply_skill_deltas(db, old, new)
+    db.commit()
+    return len(rows)
+
+def _apply_skill_deltas(db: Session, old: list, new: list):
+    """
+    Update skill_stat from a keyword's old and new (window, skill, count) rows.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for window, skill, count in old:
+        deltas[(window, skill)][0] -= count
+        deltas[(window, skill)][1] -= 1
+    for window, skill, count in new:
+        deltas[(window, skill)][0] += count
+        deltas[(window, skill)][1] += 1
+
+    # sorted, so concurrent refreshes lock shared rows in the same order
+    values = [
+        {"window": window, "skill": skill, "count": count, "keywords": keywords}
+        for (window, skill), (count, keywords) in sorted(deltas.items())
+        if count or keywords
+    ]
+    if not values:
+        return
+
+    statement = pg_insert(SkillStat).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SkillStat.window, SkillStat.skill],
+        set_={
+            "count": SkillStat.count + statement.excluded.count,
+            "keywords": SkillStat.keywords + statement.excluded.keywords,
+            "updated_at": func.now(),
+        },
+    ).returning(SkillStat.window, SkillStat.skill, SkillStat.keywords)
+    gone = [(window, skill) for window, skill, keywords in db.execute(statement) if keywords <= 0]
+    if gone:
+        db.execute(delete(SkillStat).where(tuple_(SkillStat.window, SkillStat.skill).in_(gone)))
+
+def get_top_skills(db: Session, keyword_id: int, window: str, limit: int) -> list:
+    """
+    Most required skills of a keyword: [(skill, count), ...]
+    """
+    return db.execute(
+        select(KeywordSkillStat.skill, KeywordSkillStat.count)
+        .where(KeywordSkillStat.keyword_id == keyword_id, KeywordSkillStat.window == window)
+        .order_by(KeywordSkillStat.count.desc(), KeywordSkillStat.skill)
+        .limit(limit)
+    ).all()
+
+def get_trending_skills(db: Session, window: str, limit: int) -> list:
+    """
+    Most required skills across all keywords: [(skill, count, keywords), ...]
+    A job found under several keywords is counted once per keyword.
+    """
+    return db.execute(
+        select(SkillStat.skill, SkillStat.count, SkillStat.keywords)
+        .where(SkillStat.window == window)
+        .order_by(SkillStat.count.desc(), SkillStat.skill)
+        .limit(limit)
+    ).all()
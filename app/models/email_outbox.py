@@ -0,0 +1,27 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Index, func
+from database.base import Base
+
+class EmailOutbox(Base):
+    """
+    Emails waiting to be sent, written in the same transaction as the change
+    they report and delivered by the outbox drainer (app/worker/outbox.py).
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(Text, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, server_default="0", default=0)  # SMTP attempts, including retries
+    last_error = Column(Text, nullable=True)
+    claimed_by = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now())  # retry backoff
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    send_ms = Column(Integer, nullable=True)  # time spent delivering, including retries
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_available_at", "status", "available_at"),
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from database.base import Base
+
+class ExportJob(Base):
+    """
+    A large /jobs/download export built by the queue consumer.
+    The id is random, since it appears in the download link.
+    """
+    __tablename__ = "export_job"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    keyword_id = Column(Integer, ForeignKey("keyword.id", ondelete="CASCADE"), nullable=False)
+    keyword = Column(Text, nullable=False)
+    limit = Column(Integer, nullable=True)  # None = all jobs of the keyword
+    format = Column(String(8), nullable=False)  # csv, xlsx
+    data_version = Column(Integer, nullable=False)  # keyword data version the export was requested at
+    status = Column(String(20), nullable=False, default="pending")  # pending, processing, done, failed
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, server_default="0", default=0)
+    claimed_by = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_export_job_status_created_at", "status", "created_at"),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, BigInteger, TIMESTAMP, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, BigInteger, TIMESTAMP, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database.base import Base
@@ -8,9 +9,17 @@ class Job(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(Text, nullable=False)
-    salary = Column(Text, nullable=True)
-    skills = Column(Text, nullable=False)
+    salary = Column(Text, nullable=True)  # as scraped
+    # parsed from salary, in toman; see app/utils/salary_utils.py
+    salary_min = Column(BigInteger, nullable=True)
+    salary_max = Column(BigInteger, nullable=True)
+    skills = Column(ARRAY(Text), nullable=False, server_default="{}")
     link = Column(Text, nullable=False, unique=True)
     scraped_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
     keywords = relationship("Keyword", secondary="keyword_job", back_populates="jobs")
+
+    __table_args__ = (
+        # "jobs requiring skill X": Job.skills.contains([skill])
+        Index("ix_job_skills", "skills", postgresql_using="gin"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text
+from sqlalchemy import Column, DateTime, Integer, Text
 from sqlalchemy.orm import relationship
 from database.base import Base
 
@@ -7,5 +7,10 @@ class Keyword(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     value = Column(Text, nullable=False, unique=True)
+    # bumped whenever the keyword's job list changes; keys cached exports
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # set when a scrape of the keyword ran to the end; the row itself is
+    # created by the first saved batch, so it exists for partial scrapes too
+    scraped_at = Column(DateTime(timezone=True), nullable=True)
 
     jobs = relationship("Job", secondary="keyword_job", back_populates="keywords")
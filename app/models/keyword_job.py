@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table, TIMESTAMP
+from sqlalchemy import Column, Integer, ForeignKey, Table, TIMESTAMP, Index
 from sqlalchemy.sql import func
 from database.base import Base
 
@@ -7,5 +7,7 @@ keyword_job = Table(
     Base.metadata,
     Column("keyword_id", Integer, ForeignKey("keyword.id", ondelete="CASCADE"), primary_key=True),
     Column("job_id", Integer, ForeignKey("job.id", ondelete="CASCADE"), primary_key=True),
-    Column("last_update", TIMESTAMP, nullable=False, server_default=func.now())
+    Column("last_update", TIMESTAMP, nullable=False, server_default=func.now()),
+    # keyset pagination of a keyword's jobs, newest first
+    Index("ix_keyword_job_keyword_last_update", "keyword_id", "last_update", "job_id"),
 )
@@ -1,13 +1,30 @@
-from sqlalchemy import Column, Integer, String, DateTime
-from sqlalchemy import func
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy import func, text
 from database.base import Base
 
 class KeywordQueue(Base):
     __tablename__ = "keyword_queue"
 
     id = Column(Integer, primary_key=True, index=True)
-    keyword = Column(String(255), nullable=False)
-    user_id = Column(Integer, nullable=True)
-    status = Column(String(20), default="pending")  # pending, processing, done
+    keyword = Column(String(255), nullable=False)  # normalized, see normalize_keyword
+    user_id = Column(Integer, nullable=True)  # first requester; all requesters are in keyword_queue_subscriber
+    status = Column(String(20), default="pending")  # pending, processing, done, failed, merged
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # set while status is "processing"; an expired lease can be reclaimed by another worker
+    claimed_by = Column(String(128), nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, server_default="0", default=0)
+
+    __table_args__ = (
+        Index("ix_keyword_queue_status_created_at", "status", "created_at"),
+        # at most one active work item per keyword
+        Index(
+            "uq_keyword_queue_active_keyword",
+            "keyword",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'processing')"),
+        ),
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, ForeignKey, Table
+from database.base import Base
+
+# users waiting to be notified when a queued keyword has been processed
+keyword_queue_subscriber = Table(
+    "keyword_queue_subscriber",
+    Base.metadata,
+    Column("queue_id", Integer, ForeignKey("keyword_queue.id", ondelete="CASCADE"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Boolean, LargeBinary, Text, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from database.base import Base
+
+class KeywordResponse(Base):
+    """
+    Precomputed, serialized top jobs of a keyword, served as-is by POST /jobs.
+    """
+    __tablename__ = "keyword_response"
+
+    keyword_id = Column(Integer, ForeignKey("keyword.id", ondelete="CASCADE"), primary_key=True)
+    jobs_json = Column(LargeBinary, nullable=False)  # JSON array of JobBase, in response order
+    offsets = Column(ARRAY(Integer), nullable=False)  # byte offset where each array element ends
+    cursors = Column(ARRAY(Text), nullable=False, server_default="{}")  # pagination cursor after each element
+    complete = Column(Boolean, nullable=False, default=False)  # True if the keyword has no more jobs
+    data_version = Column(Integer, nullable=True)  # keyword data version the jobs were read at; stale once it moves on
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
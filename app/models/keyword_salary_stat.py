@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB
+from database.base import Base
+
+class KeywordSalaryStat(Base):
+    """
+    Salary distribution of a keyword's jobs, in toman.
+    Rebuilt for a keyword after each scrape (see refresh_keyword_aggregates).
+    """
+    __tablename__ = "keyword_salary_stat"
+
+    keyword_id = Column(Integer, ForeignKey("keyword.id", ondelete="CASCADE"), primary_key=True)
+    jobs = Column(Integer, nullable=False)  # all jobs of the keyword
+    jobs_with_salary = Column(Integer, nullable=False)
+    min = Column(BigInteger, nullable=True)
+    p25 = Column(BigInteger, nullable=True)
+    p50 = Column(BigInteger, nullable=True)
+    p75 = Column(BigInteger, nullable=True)
+    p90 = Column(BigInteger, nullable=True)
+    max = Column(BigInteger, nullable=True)
+    histogram = Column(JSONB, nullable=False, server_default="[]")  # [{"from", "to", "count"}, ...]
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
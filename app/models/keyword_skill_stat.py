@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from database.base import Base
+
+class KeywordSkillStat(Base):
+    """
+    Number of a keyword's jobs requiring each skill, per time window.
+    Rebuilt for a keyword after each scrape (see refresh_keyword_aggregates);
+    the totals across keywords are in skill_stat.
+    """
+    __tablename__ = "keyword_skill_stat"
+
+    keyword_id = Column(Integer, ForeignKey("keyword.id", ondelete="CASCADE"), primary_key=True)
+    window = Column(String(8), primary_key=True)  # see SKILL_WINDOWS
+    skill = Column(Text, primary_key=True)
+    count = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # top skills of a keyword
+        Index("ix_keyword_skill_stat_keyword_window_count", "keyword_id", "window", "count"),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime, func
+from database.base import Base
+
+class SchemaMigration(Base):
+    """
+    Entries of database.migrations.MIGRATIONS already applied, so they
+    run once per database instead of on every startup.
+    """
+    __tablename__ = "schema_migration"
+
+    id = Column(String(128), primary_key=True)  # see database.migrations.migration_id
+    applied_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
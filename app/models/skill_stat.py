@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+from database.base import Base
+
+class SkillStat(Base):
+    """
+    Number of jobs requiring each skill across all keywords, per time window:
+    the sums of keyword_skill_stat, kept up to date by refresh_keyword_skill_stats.
+    """
+    __tablename__ = "skill_stat"
+
+    window = Column(String(8), primary_key=True)  # see SKILL_WINDOWS
+    skill = Column(Text, primary_key=True)
+    count = Column(Integer, nullable=False)  # a job found under several keywords counts once per keyword
+    keywords = Column(Integer, nullable=False)  # keywords with jobs requiring the skill
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # trending skills
+        Index("ix_skill_stat_window_count", "window", "count"),
+    )
@@ -10,5 +10,6 @@ class Token(Base):
     token = Column(String, unique=True, index=True, nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    revoked_at = Column(DateTime(timezone=True), nullable=True)  # see app.services.auth.RevocationList
 
     user = relationship("User", back_populates="tokens")
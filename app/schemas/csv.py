@@ -1,9 +1,12 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Literal
 
 class CSVRequest(BaseModel):
     keyword: str
     limit: Optional[int] = 50
+    format: Literal["xlsx", "csv"] = "xlsx"
 
 class CSVResponse(BaseModel):
-    download_link: str
\ No newline at end of file
+    download_link: str
+    export_id: Optional[str] = None
+    status: Optional[str] = None  # pending, processing, done, failed
\ No newline at end of file
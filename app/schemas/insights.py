@@ -0,0 +1,44 @@
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+from typing import List, Literal, Optional
+
+SkillWindow = Literal["7d", "30d", "all"]
+
+class SkillCount(BaseModel):
+    skill: str
+    count: int
+
+class TopSkillsResponse(BaseModel):
+    keyword_id: int
+    window: SkillWindow
+    skills: List[SkillCount]
+
+class TrendingSkill(SkillCount):
+    keywords: int  # number of keywords whose jobs require the skill
+
+class TrendingSkillsResponse(BaseModel):
+    window: SkillWindow
+    skills: List[TrendingSkill]
+
+class SalaryBucket(BaseModel):
+    from_: int = Field(alias="from")
+    to: int
+    count: int
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class SalaryStatsResponse(BaseModel):
+    keyword_id: int
+    currency: str = "IRT"  # toman, monthly
+    jobs: int
+    jobs_with_salary: int
+    min: Optional[int] = None
+    p25: Optional[int] = None
+    p50: Optional[int] = None
+    p75: Optional[int] = None
+    p90: Optional[int] = None
+    max: Optional[int] = None
+    histogram: List[SalaryBucket]
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 
+# largest page a client can request from /jobs
+MAX_JOBS_PAGE_SIZE = 100
+
 class JobBase(BaseModel):
     title: str
     salary: Optional[str] = None
@@ -30,12 +33,14 @@ class JobOut(JobBase):
 
 class JobRequest(BaseModel):
     keyword: str
-    limit: Optional[int] = 10
+    limit: int = Field(10, ge=0, le=MAX_JOBS_PAGE_SIZE)
+    cursor: Optional[str] = None  # next_cursor of the previous page
 
     model_config = ConfigDict(from_attributes=True)
 
 class JobResponse(BaseModel):
     jobs: List[JobBase]
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
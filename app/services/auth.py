@@ -1,14 +1,121 @@
-
+import hashlib
+import threading
+import time
+import jwt
 from fastapi import Security, HTTPException, Depends
 from fastapi.security.api_key import APIKeyHeader
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from database.session import get_db
+from app.core.config import settings
 from app.models.tokens import Token
-from sqlalchemy import func
+from app.models.users import User
+from app.utils.cache import TTLCache
+from app.utils.auth_utils import decode_jwt
 from typing import Optional
 
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
+def token_digest(token_str: str) -> str:
+    return hashlib.sha256(token_str.encode("utf-8")).hexdigest()
+
+class RevocationList:
+    """
+    In-memory set of revoked, not yet expired tokens (as sha256 digests),
+    reloaded from the tokens table at most every `refresh_seconds`.
+    Revocations made in this process apply immediately; other processes
+    pick them up on their next reload.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._digests = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self, db: Session):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        # one thread reloads, the others keep using the current set
+        if not self._lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            tokens = db.execute(
+                select(Token.token).where(Token.revoked_at.isnot(None), Token.expires_at > func.now())
+            ).scalars()
+            self._digests = frozenset(token_digest(token) for token in tokens)
+            self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, token_str: str, db: Session) -> bool:
+        self._refresh(db)
+        return token_digest(token_str) in self._digests
+
+    def add(self, token_str: str):
+        with self._lock:
+            self._digests = self._digests | {token_digest(token_str)}
+
+revoked_tokens = RevocationList(settings.AUTH_REVOCATION_REFRESH_SECONDS)
+user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+def get_user(db: Session, user_id: int) -> Optional[User]:
+    """
+    Load a user through the TTL cache.
+    Cached users are detached, so only their column attributes can be used.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        db.expunge(user)
+        user_cache.set(user_id, user)
+    return user
+
+def authenticate(token_str: str, db: Session) -> User:
+    """
+    Verify a JWT's signature and expiry locally (see decode_jwt), check it against the
+    revocation list and return its user.
+    Raises HTTPException 401 if the token is invalid, expired or revoked.
+    """
+    try:
+        payload = decode_jwt(token_str)
+        user_id = int(payload["sub"])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except (jwt.InvalidTokenError, KeyError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if revoked_tokens.is_revoked(token_str, db):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = get_user(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user
+
+def parse_bearer(authorization: str) -> str:
+    if authorization.lower().startswith("bearer "):
+        return authorization.split(" ", 1)[1]
+    raise HTTPException(status_code=401, detail="Invalid token format")
+
+def revoke_token(db: Session, token_str: str) -> bool:
+    """
+    Revoke an issued token. Returns False if it is unknown or already revoked.
+    """
+    token = db.execute(
+        select(Token).where(Token.token == token_str, Token.revoked_at.is_(None))
+    ).scalar_one_or_none()
+    if token is None:
+        return False
+    token.revoked_at = func.now()
+    db.commit()
+    revoked_tokens.add(token_str)
+    return True
+
 def get_current_user(
     api_key: Optional[str] = Security(api_key_header),
     db: Session = Depends(get_db)
@@ -16,17 +123,4 @@ def get_current_user(
     if not api_key:
         return None
 
-    if api_key.lower().startswith("bearer "):
-        token_str = api_key.split(" ", 1)[1]
-    else:
-        raise HTTPException(status_code=401, detail="Invalid token format")
-
-    db_token = db.query(Token).filter(Token.token == token_str).first()
-    if not db_token:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    current_time = db.query(func.now()).scalar()
-    if db_token.expires_at < current_time:
-        raise HTTPException(status_code=401, detail="Token expired")
-
-    return db_token.user
+    return authenticate(parse_bearer(api_key), db)
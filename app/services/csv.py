@@ -1,16 +1,173 @@
-import tempfile
+import csv
+import io
 import os
+import re
+import shutil
+import tempfile
+from urllib.parse import quote
 from app.schemas.job import *
 from openpyxl import Workbook
-from fastapi.responses import FileResponse
+from fastapi import Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from database.session import SessionLocal
+from app.crud.job import iter_jobs_by_keyword
+from app.services.export_cache import *
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+MEDIA_TYPES = {"xlsx": XLSX_MEDIA_TYPE, "csv": CSV_MEDIA_TYPE}
+HEADERS = ["title", "salary", "link", "skills"]
+
+# rows buffered before a CSV chunk is sent
+CSV_CHUNK_ROWS = 500
+
+# characters that can't appear in a quoted ASCII filename= parameter
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\x20-\x7e]|["\\]')
+
+def content_disposition(filename: str) -> str:
+    """
+    Content-Disposition for a download named `filename` (RFC 6266):
+    an ASCII fallback for old clients plus the UTF-8 name in filename*.
+    Keywords are user input, so nothing from them reaches the header unescaped.
+    """
+    fallback = UNSAFE_FILENAME_CHARS.sub("_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=utf-8''{quote(filename, safe='')}"
+
+def _export_rows(keyword_id: int, limit: int):
+    # The request's session is closed before a streamed body is sent,
+    # so exports read through their own session.
+    with SessionLocal() as db:
+        for row in iter_jobs_by_keyword(db, keyword_id, limit):
+            yield [row.title, row.salary or "", row.link, ", ".join(row.skills)]
+
+def iter_jobs_csv(keyword_id: int, limit: int):
+    """
+    Yield a CSV export of a keyword's jobs in encoded chunks.
+    Starts with a UTF-8 BOM so Excel shows Persian text correctly.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(HEADERS)
+
+    for i, row in enumerate(_export_rows(keyword_id, limit), start=1):
+        writer.writerow(row)
+        if i % CSV_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+def write_jobs_csv(keyword_id: int, limit: int, filepath: str):
+    """
+    Write a keyword's jobs to a CSV file.
+    """
+    with open(filepath, "wb") as f:
+        for chunk in iter_jobs_csv(keyword_id, limit):
+            f.write(chunk)
+
+# read size when serving a cached export
+FILE_CHUNK_BYTES = 64 * 1024
+
+def _iter_file(f):
+    with f:
+        while chunk := f.read(FILE_CHUNK_BYTES):
+            yield chunk
+
+def export_file_response(path: str, fmt: str, filename: str, etag: str) -> StreamingResponse | None:
+    """
+    Serve an export from the cache, or None if it was evicted.
+    The file is opened before responding and streamed from that handle,
+    so eviction unlinking it mid-download doesn't cut the download short.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    headers = {
+        "Content-Disposition": content_disposition(filename),
+        "Content-Length": str(os.fstat(f.fileno()).st_size),
+        "ETag": etag,
+    }
+    return StreamingResponse(_iter_file(f), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+def cached_export_response(key: str, fmt: str, filename: str, if_none_match: str | None = None,
+                           method: str = "GET") -> Response | None:
+    """
+    Answer an export request from the cache: if the client already has
+    this version, 304 (412 for methods other than GET/HEAD, see RFC 9110
+    If-None-Match), the cached file if present, otherwise None.
+    """
+    etag = export_etag(key)
+    if etag_matches(if_none_match, etag):
+        if method in ("GET", "HEAD"):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(status_code=status.HTTP_412_PRECONDITION_FAILED, headers={"ETag": etag})
+
+    path = get_cached_export(key, fmt)
+    if path is None:
+        return None
+    return export_file_response(path, fmt, filename, etag)
+
+def stream_jobs_csv(keyword_id: int, limit: int, filename: str, key: str | None = None) -> StreamingResponse:
+    """
+    Stream a keyword's jobs as CSV straight from a server-side cursor;
+    memory use does not depend on `limit`.
+    With a cache `key`, the stream is also written to the export cache.
+    """
+    chunks = iter_jobs_csv(keyword_id, limit)
+    headers = {"Content-Disposition": content_disposition(filename)}
+    if key is not None:
+        chunks = tee_export(key, "csv", chunks)
+        headers["ETag"] = export_etag(key)
+
+    return StreamingResponse(chunks, media_type=CSV_MEDIA_TYPE, headers=headers)
+
+def write_jobs_xlsx(keyword_id: int, limit: int, filepath: str):
+    """
+    Write a keyword's jobs to an Excel (.xlsx) file.
+    Uses openpyxl's write-only mode, so rows are flushed to disk as they are added.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("JobInsight")
+
+    # header
+    ws.append(HEADERS)
+
+    # rows
+    for row in _export_rows(keyword_id, limit):
+        ws.append(row)
+
+    wb.save(filepath)
+
+def build_export_file(keyword_id: int, limit: int, fmt: str, key: str) -> str:
+    """
+    Make sure an export is in the export cache and return its path.
+    """
+    path = get_cached_export(key, fmt)
+    if path is not None:
+        return path
+    writer = write_jobs_csv if fmt == "csv" else write_jobs_xlsx
+    return build_export(key, fmt, lambda filepath: writer(keyword_id, limit, filepath))
+
+def build_jobs_xlsx(keyword_id: int, limit: int, filename: str, key: str) -> StreamingResponse:
+    """
+    Build a keyword's .xlsx export into the export cache and return it.
+    """
+    path = build_export(key, "xlsx", lambda filepath: write_jobs_xlsx(keyword_id, limit, filepath))
+    response = export_file_response(path, "xlsx", filename, export_etag(key))
+    if response is None:
+        raise FileNotFoundError(f"Export {path} was evicted before it could be served")
+    return response
 
 def save_jobs_to_csv(jobs: list[JobBase], filename) -> str:
     """
     Save jobs to an Excel (.xlsx) file and return the file path.
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "JobInsight"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("JobInsight")
 
     filepath = filename
 
@@ -18,8 +175,7 @@ def save_jobs_to_csv(jobs: list[JobBase], filename) -> str:
     filepath = os.path.join(tmp_dir, filepath)
 
     # header
-    headers = ["title", "salary", "link", "skills"]
-    ws.append(headers)
+    ws.append(HEADERS)
 
     # rows
     for job in jobs:
@@ -27,14 +183,13 @@ def save_jobs_to_csv(jobs: list[JobBase], filename) -> str:
             job.title,
             job.salary or "",
             job.link,
-            job.skills
+            ", ".join(job.skills)
         ])
 
     wb.save(filepath)
     return FileResponse(
         filepath,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        media_type=XLSX_MEDIA_TYPE,
         filename=filename,
-        background=lambda: os.remove(filepath)
+        background=BackgroundTask(shutil.rmtree, tmp_dir, ignore_errors=True),
     )
-    # return filepath
\ No newline at end of file
@@ -1,22 +1,211 @@
 # app/services/email.py
+import logging
+import queue
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from fastapi import HTTPException
 from app.core.config import settings
 
-def send_email(to: str, subject: str, body: str):
+logger = logging.getLogger(__name__)
+
+class EmailError(Exception):
+    """
+    Raised when an email can't be sent or queued.
+    """
+
+def build_message(to: str, subject: str, body: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"] = settings.FROM_EMAIL
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain"))
+    return msg
+
+def open_smtp() -> smtplib.SMTP:
+    """
+    Open an authenticated SMTP session.
+    """
+    server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
     try:
-        msg = MIMEMultipart()
-        msg["From"] = settings.FROM_EMAIL
-        msg["To"] = to
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "plain"))
-
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASS)
-            server.send_message(msg)
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Email sending failed: {str(e)}")
+        server.starttls()
+        server.login(settings.SMTP_USER, settings.SMTP_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+class MailQueue:
+    """
+    Bounded outbound mail queue drained by a few worker threads.
+
+    Each worker keeps its authenticated SMTP session open between messages
+    (closing it after `idle_seconds` without mail), sends up to `batch_size`
+    queued messages per wake-up, and retries failed messages with
+    exponential backoff on a fresh session.
+    Sessions are opened with `connect` (open_smtp by default).
+    """
+
+    def __init__(self, workers: int, maxsize: int, batch_size: int, max_retries: int,
+                 idle_seconds: float = 30, retry_base_seconds: float = 1, connect=open_smtp):
+        self.workers = workers
+        self.connect = connect
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.idle_seconds = idle_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._started_at = None
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.connections = 0
+
+    def _start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            self._started_at = time.monotonic()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"mail-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, to: str, subject: str, body: str, timeout: float = None, before_send=None, on_result=None):
+        """
+        Queue an email. Blocks up to `timeout` seconds while the queue is full,
+        then raises EmailError.
+        `before_send()` is called from the worker right before sending; the
+        email is dropped if it returns False.
+        `on_result(error, attempts, send_seconds)` is called from the worker
+        once the email is sent (error is None) or given up on.
+        """
+        self._start()
+        try:
+            self._queue.put((to, subject, body, before_send, on_result), timeout=timeout)
+        except queue.Full:
+            raise EmailError("Mail queue is full")
+
+    def _next_batch(self) -> list | None:
+        try:
+            batch = [self._queue.get(timeout=self.idle_seconds)]
+        except queue.Empty:
+            return None
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        server = None
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                # idle: don't hold the session open
+                server = self._close(server)
+                continue
+
+            for to, subject, body, before_send, on_result in batch:
+                if before_send is not None and not self._call(before_send):
+                    self._queue.task_done()
+                    continue
+
+                started = time.monotonic()
+                server, error, attempts = self._deliver(server, build_message(to, subject, body))
+                if on_result is not None:
+                    try:
+                        on_result(error, attempts, time.monotonic() - started)
+                    except Exception as e:
+                        logger.error(f"Email result callback failed: {e}")
+                self._queue.task_done()
+
+    def _call(self, before_send) -> bool:
+        try:
+            return before_send()
+        except Exception as e:
+            logger.error(f"Email pre-send callback failed, not sending: {e}")
+            return False
+
+    def worst_case_delivery_seconds(self) -> float:
+        """
+        Upper bound on the time one email can take: every attempt running into
+        the SMTP timeout on connect, TLS, login and send, plus the backoff.
+        """
+        attempts = self.max_retries + 1
+        backoff = sum(self.retry_base_seconds * 2 ** i for i in range(self.max_retries))
+        return attempts * 4 * settings.SMTP_TIMEOUT_SECONDS + backoff
+
+    def _deliver(self, server, msg):
+        """
+        Send a message, retrying on a new session.
+        Returns (server, error or None, attempts).
+        """
+        error = None
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                if server is None:
+                    server = self.connect()
+                    with self._stats_lock:
+                        self.connections += 1
+                server.send_message(msg)
+                with self._stats_lock:
+                    self.sent += 1
+                return server, None, attempt
+            except smtplib.SMTPRecipientsRefused as e:
+                # permanent, retrying won't help
+                logger.error(f"Email to {msg['To']} refused: {e}")
+                error = str(e)
+                break
+            except Exception as e:
+                server = self._close(server)
+                error = str(e)
+                if attempt > self.max_retries:
+                    logger.error(f"Email to {msg['To']} failed after {attempt} attempts: {e}")
+                    break
+                with self._stats_lock:
+                    self.retries += 1
+                time.sleep(self.retry_base_seconds * 2 ** (attempt - 1))
+
+        with self._stats_lock:
+            self.failed += 1
+        return server, error, attempt
+
+    def _close(self, server):
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+        return None
+
+    def flush(self):
+        """
+        Block until all queued emails have been handled.
+        """
+        if self._threads:
+            self._queue.join()
+
+    def get_metrics(self) -> dict:
+        with self._stats_lock:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0
+            return {
+                "queued": self._queue.qsize(),
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "connections": self.connections,
+                "messages_per_second": round(self.sent / elapsed, 3) if elapsed else 0.0,
+            }
+
+mail_queue = MailQueue(
+    workers=settings.SMTP_WORKERS,
+    maxsize=settings.SMTP_QUEUE_SIZE,
+    batch_size=settings.SMTP_BATCH_SIZE,
+    max_retries=settings.SMTP_MAX_RETRIES,
+)
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from app.core.config import settings
+
+# Serializes eviction scans within a process
+_evict_lock = threading.Lock()
+
+# Exports published or hit this recently are never evicted, which covers
+# the gap between finding a file and opening it to serve it
+EVICT_GRACE_SECONDS = 60
+
+def export_key(keyword_id: int, limit: int, fmt: str, data_version: int) -> str:
+    """
+    Content address of an export: identical inputs over identical data
+    always map to the same file, and a data version bump to a new one.
+    """
+    raw = f"{keyword_id}:{limit}:{fmt}:{data_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+def export_etag(key: str) -> str:
+    return f'"{key}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against an ETag.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def export_path(key: str, fmt: str) -> str:
+    return os.path.join(settings.EXPORT_DIR, f"{key}.{fmt}")
+
+def get_cached_export(key: str, fmt: str) -> str | None:
+    """
+    Return the path of a cached export, or None.
+    A hit refreshes the file's mtime, which is what eviction orders by.
+    """
+    path = export_path(key, fmt)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+def _temp_path(key: str, fmt: str) -> str:
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{key}.", suffix=f".{fmt}.tmp", dir=settings.EXPORT_DIR)
+    os.close(fd)
+    return tmp_path
+
+def _publish(tmp_path: str, key: str, fmt: str) -> str:
+    # Atomic within one directory, so readers never see a partial export
+    path = export_path(key, fmt)
+    os.replace(tmp_path, path)
+    evict_exports()
+    return path
+
+def build_export(key: str, fmt: str, write) -> str:
+    """
+    Build an export with `write(filepath)` and store it in the cache.
+    """
+    tmp_path = _temp_path(key, fmt)
+    try:
+        write(tmp_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return _publish(tmp_path, key, fmt)
+
+def tee_export(key: str, fmt: str, chunks):
+    """
+    Pass `chunks` through while also writing them to the cache.
+    The file is only published if the stream is consumed completely,
+    e.g. an aborted download leaves nothing behind.
+    """
+    tmp_path = _temp_path(key, fmt)
+    completed = False
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        completed = True
+    finally:
+        if completed:
+            _publish(tmp_path, key, fmt)
+        else:
+            os.remove(tmp_path)
+
+def evict_exports(max_bytes: int | None = None):
+    """
+    Delete least recently used exports until the directory fits within
+    EXPORT_CACHE_MAX_MB. In-progress temp files and exports used within
+    EVICT_GRACE_SECONDS are never touched, so the cache can briefly exceed it.
+    """
+    if max_bytes is None:
+        max_bytes = settings.EXPORT_CACHE_MAX_MB * 1024 * 1024
+    grace_cutoff = time.time() - EVICT_GRACE_SECONDS
+
+    with _evict_lock:
+        files = []
+        total = 0
+        with os.scandir(settings.EXPORT_DIR) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        files.sort()
+        for mtime, size, path in files:
+            if total <= max_bytes or mtime >= grace_cutoff:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
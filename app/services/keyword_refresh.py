@@ -0,0 +1,64 @@
+import logging
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.keyword import Keyword
+from app.crud.keyword import get_keyword
+from app.crud.keyword_response import refresh_keyword_response
+from app.crud.skill_stat import refresh_keyword_skill_stats
+from app.crud.salary_stat import refresh_keyword_salary_stats
+
+logger = logging.getLogger(__name__)
+
+def refresh_keyword_aggregates(db: Session, keyword_text: str):
+    """
+    Rebuild the data precomputed from a keyword's jobs.
+    Called once a scrape of the keyword has finished.
+    """
+    keyword_result = get_keyword(db, keyword_text)
+    if keyword_result["status"] != 1:
+        return
+
+    keyword_id = keyword_result["id"]
+    stored = refresh_keyword_response(db, keyword_id)
+    logger.info(f"Precomputed response for '{keyword_text}' with {stored} jobs")
+
+    skills = refresh_keyword_skill_stats(db, keyword_id)
+    logger.info(f"Refreshed skill stats for '{keyword_text}' with {skills} skills")
+
+    salaries = refresh_keyword_salary_stats(db, keyword_id)
+    logger.info(f"Refreshed salary stats for '{keyword_text}' from {salaries} salaries")
+
+def refresh_all_skill_stats(db: Session) -> int:
+    """
+    Recount the skill stats of every keyword. Their 7d/30d counts are
+    only correct on the day they were counted, so this runs daily to age
+    out jobs not seen within the window since.
+
+    Returns:
+        int: Number of keywords recounted
+    """
+    keyword_ids = db.execute(select(Keyword.id).order_by(Keyword.id)).scalars().all()
+    refreshed = 0
+    for keyword_id in keyword_ids:
+        try:
+            refresh_keyword_skill_stats(db, keyword_id)
+            refreshed += 1
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Recounting skill stats of keyword {keyword_id} failed: {e}")
+    return refreshed
+
+def refresh_all_keyword_aggregates(db: Session):
+    """
+    Rebuild the precomputed data of every keyword, without scraping.
+    """
+    keywords = db.execute(select(Keyword.value).order_by(Keyword.id)).scalars().all()
+    for i, keyword_text in enumerate(keywords, start=1):
+        print(f"[{i}/{len(keywords)}] {keyword_text}")
+        refresh_keyword_aggregates(db, keyword_text)
+
+if __name__ == "__main__":
+    from database.session import SessionLocal
+
+    with SessionLocal() as db:
+        refresh_all_keyword_aggregates(db)
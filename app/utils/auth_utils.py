@@ -1,12 +1,11 @@
+import hashlib
+import hmac
 import random
 import string
 import jwt
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database.session import get_db
-from fastapi import Depends
 from datetime import timedelta
 from app.core.config import settings
+from app.utils.clock import clock
 
 JWT_SECRET = settings.JWT_SECRET
 JWT_ALGORITHM = settings.JWT_ALGORITHM
@@ -15,10 +14,57 @@ TOKEN_EXPIRE_HOURS = settings.TOKEN_EXPIRE_HOURS
 def generate_otp(length: int = 6):
     return ''.join(random.choices(string.digits, k=length))
 
-def create_jwt(user_id: int, db: Session = Depends(get_db)):
+def create_jwt(user_id: int):
 
-    current_time = db.query(func.now()).scalar()
+    current_time = clock.now()
     expire_time = current_time + timedelta(hours=TOKEN_EXPIRE_HOURS)
     payload = {"sub": str(user_id), "exp": expire_time}
     token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return token, expire_time
+
+def decode_jwt(token_str: str) -> dict:
+    """
+    Verify a JWT's signature and expiry against the app clock, allowing
+    CLOCK_SKEW_TOLERANCE_SECONDS of skew.
+    Raises jwt.ExpiredSignatureError or jwt.InvalidTokenError.
+    """
+    # exp is checked here rather than by PyJWT so a frozen clock applies
+    payload = jwt.decode(
+        token_str, JWT_SECRET, algorithms=[JWT_ALGORITHM],
+        options={"verify_exp": False, "require": ["exp", "sub"]},
+    )
+    try:
+        expires_at = float(payload["exp"])
+    except (TypeError, ValueError):
+        raise jwt.InvalidTokenError("Invalid exp claim")
+    if expires_at <= clock.timestamp() - settings.CLOCK_SKEW_TOLERANCE_SECONDS:
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return payload
+
+def _download_signature(export_id: str, user_id: int, expires_at: int) -> str:
+    message = f"{export_id}:{user_id}:{expires_at}".encode("utf-8")
+    return hmac.new(JWT_SECRET.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+def create_download_token(export_id: str, user_id: int) -> str:
+    """
+    Sign a link to one export for one user, valid for DOWNLOAD_LINK_EXPIRE_HOURS,
+    so it can be opened from an email without the Authorization header.
+    """
+    expires_at = int(clock.timestamp()) + settings.DOWNLOAD_LINK_EXPIRE_HOURS * 3600
+    return f"{user_id}.{expires_at}.{_download_signature(export_id, user_id, expires_at)}"
+
+def verify_download_token(export_id: str, token: str) -> int | None:
+    """
+    Return the user a download token was issued to, or None if it is
+    malformed, expired or not signed for this export.
+    """
+    try:
+        user_id, expires_at, signature = token.split(".")
+        user_id, expires_at = int(user_id), int(expires_at)
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _download_signature(export_id, user_id, expires_at)):
+        return None
+    if expires_at <= clock.timestamp():
+        return None
+    return user_id
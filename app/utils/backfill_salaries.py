@@ -0,0 +1,83 @@
+"""
+Fill job.salary_min / salary_max from the raw salary text of stored jobs:
+
+    python -m app.utils.backfill_salaries [--batch-size N] [--all]
+
+Reads jobs in id order (keyset pagination) and parses each batch with the
+vectorized parser, so it runs in constant memory over any table size.
+"""
+import argparse
+import time
+from sqlalchemy import BigInteger, Integer, bindparam, cast, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from app.models.job import Job
+from app.utils.salary_utils import parse_salary_list
+
+# One UPDATE per batch, joined to the batch passed as three arrays.
+# An executemany costs a round trip per job, and a VALUES list as many
+# bind parameters to compile.
+_parsed = func.unnest(
+    cast(bindparam("ids"), ARRAY(Integer)),
+    cast(bindparam("salary_mins"), ARRAY(BigInteger)),
+    cast(bindparam("salary_maxs"), ARRAY(BigInteger)),
+).table_valued("id", "salary_min", "salary_max").render_derived(name="parsed")
+
+UPDATE_BOUNDS = (
+    update(Job)
+    .where(Job.id == _parsed.c.id)
+    .values(salary_min=_parsed.c.salary_min, salary_max=_parsed.c.salary_max)
+    .execution_options(synchronize_session=False)
+)
+
+def backfill_salaries(db: Session, batch_size: int = 10000, only_missing: bool = True) -> int:
+    """
+    Parse and store the salary bounds of stored jobs, committing per batch.
+    With only_missing, jobs that already have a salary_min or salary_max are skipped.
+
+    Returns:
+        int: Number of jobs processed
+    """
+    last_id = 0
+    processed = 0
+    started = time.monotonic()
+
+    while True:
+        statement = select(Job.id, Job.salary).where(Job.id > last_id, Job.salary.isnot(None))
+        if only_missing:
+            statement = statement.where(Job.salary_min.is_(None), Job.salary_max.is_(None))
+        rows = db.execute(statement.order_by(Job.id).limit(batch_size)).all()
+        if not rows:
+            break
+
+        bounds = parse_salary_list([salary for _, salary in rows])
+        data = [
+            (job_id, salary_min, salary_max)
+            for (job_id, _), (salary_min, salary_max) in zip(rows, bounds)
+            if salary_min is not None or salary_max is not None or not only_missing
+        ]
+        if data:
+            ids, salary_mins, salary_maxs = zip(*data)
+            db.execute(UPDATE_BOUNDS, {
+                "ids": list(ids),
+                "salary_mins": list(salary_mins),
+                "salary_maxs": list(salary_maxs),
+            })
+        db.commit()
+
+        last_id = rows[-1][0]
+        processed += len(rows)
+        print(f"{processed} jobs processed ({processed / (time.monotonic() - started):.0f}/s)")
+
+    return processed
+
+if __name__ == "__main__":
+    from database.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Parse stored salaries into salary_min/salary_max.")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--all", action="store_true", help="also re-parse jobs that already have parsed salaries")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        backfill_salaries(db, batch_size=args.batch_size, only_missing=not args.all)
@@ -0,0 +1,133 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+class JobsCache:
+    """
+    Read-through cache for keyword -> jobs lookups, keyed by
+    (keyword, data_version, limit).
+
+    Every write to a keyword's jobs bumps its data_version, including
+    jobs changed under another keyword (bump_data_versions_for_jobs), so
+    a reader that looks the version up first never sees stale entries, in
+    whichever process the write happened. Old versions are never read
+    again and age out of both tiers.
+
+    Tier 1 is an in-process LRU with a TTL. Tier 2 is an optional
+    Redis-compatible server shared by all processes (REDIS_URL), storing
+    one hash per keyword version. Redis failures are logged and treated
+    as misses.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, redis_url: str = None):
+        self.ttl = ttl
+        self.local = TTLCache(maxsize, ttl)
+        self.redis = None
+        self.redis_hits = 0
+        self.redis_misses = 0
+        if redis_url:
+            if redis is None:
+                logger.warning("REDIS_URL is set but the 'redis' package is not installed; using local cache only")
+            else:
+                self.redis = redis.Redis.from_url(redis_url)
+
+    def _redis_key(self, keyword: str, data_version: int) -> str:
+        return f"jobs:{keyword}:{data_version}"
+
+    def get(self, keyword: str, data_version: int, limit: int):
+        value = self.local.get((keyword, data_version, limit))
+        if value is not None or self.redis is None:
+            return value
+
+        try:
+            raw = self.redis.hget(self._redis_key(keyword, data_version), str(limit))
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache read failed: {e}")
+            return None
+
+        if raw is None:
+            self.redis_misses += 1
+            return None
+        self.redis_hits += 1
+        value = json.loads(raw)
+        self.local.set((keyword, data_version, limit), value)
+        return value
+
+    def set(self, keyword: str, data_version: int, limit: int, value):
+        self.local.set((keyword, data_version, limit), value)
+        if self.redis is None:
+            return
+        try:
+            key = self._redis_key(keyword, data_version)
+            pipe = self.redis.pipeline()
+            pipe.hset(key, str(limit), json.dumps(value, ensure_ascii=False))
+            pipe.expire(key, int(self.ttl))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache write failed: {e}")
+
+    def get_metrics(self) -> dict:
+        metrics = {"local": self.local.get_metrics()}
+        if self.redis is not None:
+            metrics["redis"] = {"hits": self.redis_hits, "misses": self.redis_misses}
+        return metrics
+
+jobs_cache = JobsCache(
+    maxsize=settings.JOBS_CACHE_SIZE,
+    ttl=settings.JOBS_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL,
+)
@@ -0,0 +1,50 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+class Clock:
+    """
+    Application time source, used instead of asking the database for now().
+
+    Returns timezone-aware UTC datetimes. Can be frozen (e.g. in tests or
+    benchmarks) so time-dependent code such as token expiry is deterministic.
+    """
+
+    def __init__(self):
+        self._frozen = None
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        frozen = self._frozen
+        return frozen if frozen is not None else datetime.now(timezone.utc)
+
+    def timestamp(self) -> float:
+        return self.now().timestamp()
+
+    def freeze(self, at: datetime = None):
+        if at is None:
+            at = datetime.now(timezone.utc)
+        elif at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        with self._lock:
+            self._frozen = at
+
+    def advance(self, delta: timedelta):
+        with self._lock:
+            if self._frozen is None:
+                raise RuntimeError("Clock is not frozen")
+            self._frozen += delta
+
+    def unfreeze(self):
+        with self._lock:
+            self._frozen = None
+
+    @contextmanager
+    def frozen(self, at: datetime = None):
+        self.freeze(at)
+        try:
+            yield self
+        finally:
+            self.unfreeze()
+
+clock = Clock()
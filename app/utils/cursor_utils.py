@@ -0,0 +1,21 @@
+import base64
+from datetime import datetime
+
+def encode_cursor(last_update: datetime, job_id: int) -> str:
+    """
+    Encode a (keyword_job.last_update, job.id) position as an opaque cursor.
+    """
+    raw = f"{last_update.isoformat()}|{job_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor made by encode_cursor.
+    Raises ValueError if it is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_update, job_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(last_update), int(job_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
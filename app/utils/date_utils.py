@@ -0,0 +1,43 @@
+import re
+from datetime import datetime, timedelta, timezone
+from app.utils.clock import clock
+from app.utils.text_utils import DIGITS
+
+# "۳ روز پیش" (3 days ago), also in weeks and months
+RELATIVE_AGE_PATTERN = re.compile(r"(\d+)\s*(روز|هفته|ماه)\s*(?:پیش|قبل)")
+UNIT_DAYS = {"روز": 1, "هفته": 7, "ماه": 30}
+
+def parse_datetime(value) -> datetime | None:
+    """
+    Parse an ISO-8601 timestamp from a scraped payload.
+    Naive values are assumed to be UTC. Returns None if it can't be parsed.
+    """
+    if isinstance(value, dict):
+        value = value.get("date") or value.get("value")
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def parse_relative_age(text: str | None) -> datetime | None:
+    """
+    Approximate posting date from the relative age job cards show, e.g.
+    "امروز" (today), "دیروز" (yesterday) or "۳ روز پیش".
+    Returns None if the text has none.
+    """
+    text = (text or "").translate(DIGITS)
+    match = RELATIVE_AGE_PATTERN.search(text)
+    if match:
+        days = int(match.group(1)) * UNIT_DAYS[match.group(2)]
+    elif "دیروز" in text:
+        days = 1
+    elif "امروز" in text:
+        days = 0
+    else:
+        return None
+    return clock.now() - timedelta(days=days)
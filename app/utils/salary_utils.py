@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from app.utils.text_utils import DIGITS
+
+NUMBER = r"\d+(?:\.\d+)?"
+UNIT = r"میلیارد|میلیون|هزار"
+UNITS = {"میلیارد": 1e9, "میلیون": 1e6, "هزار": 1e3}
+
+def _amount_pattern(name: str) -> str:
+    # a number with its own unit; "۱۲ میلیون و ۵۰۰ هزار" is one amount
+    return (
+        rf"(?P<{name}>{NUMBER})\s*"
+        rf"(?:(?P<{name}_unit>{UNIT})(?:\s*و\s*(?P<{name}_extra>{NUMBER})\s*(?P<{name}_extra_unit>{UNIT}))?)?"
+    )
+
+# first amount, and a second one if a range separator follows it
+SALARY_PATTERN = _amount_pattern("low") + r"(?:\s*(?:-|–|تا|الی)\s*" + _amount_pattern("high") + ")?"
+
+# no numeric value
+UNKNOWN_PATTERN = r"توافقی|نامشخص|قانون کار|وزارت کار"
+
+def _parse_salary_texts(salaries: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert raw salary strings to numeric monthly amounts in toman.
+
+    Handles Persian/Arabic digits, thousands separators, ranges
+    ("۲۰ - ۳۰ میلیون تومان", "۸۰۰ هزار تا ۱.۲ میلیون"), open ranges
+    ("از ۱۵ میلیون", "تا ۲۵ میلیون"), compound amounts ("۱۲ میلیون و ۵۰۰ هزار"),
+    the units میلیارد / میلیون / هزار and amounts in ریال. Each number takes
+    its own unit, or the other end's in a range; numbers without any unit
+    below 1000 are taken as millions, as job boards display them. Only the
+    first amount or range counts ("۲۰ میلیون + پاداش ۲ ماهه").
+    "توافقی", "نامشخص" and anything without a number give nulls.
+
+    Returns:
+        tuple: float arrays of minimums and maximums, NaN if unknown
+    """
+    text = salaries.fillna("").astype(str).str.translate(DIGITS)
+    text = text.str.replace(r"(?<=\d)[,٬](?=\d)", "", regex=True).str.replace("٫", ".", regex=False)
+
+    parts = text.str.extract(SALARY_PATTERN)
+    number = lambda column: pd.to_numeric(parts[column], errors="coerce").to_numpy(dtype=float)
+    unit = lambda column: parts[column].map(UNITS).to_numpy(dtype=float)
+
+    first, second = number("low"), number("high")
+    first_unit, second_unit = unit("low_unit"), unit("high_unit")
+    # "۲۰ - ۳۰ میلیون": a unit written once applies to both ends
+    first_unit = np.where(np.isnan(first_unit), second_unit, first_unit)
+    second_unit = np.where(np.isnan(second_unit), first_unit, second_unit)
+    bare = np.where(np.fmax(first, second) < 1000, 1e6, 1.0)
+    first_unit = np.where(np.isnan(first_unit), bare, first_unit)
+    second_unit = np.where(np.isnan(second_unit), bare, second_unit)
+
+    first = first * first_unit + np.nan_to_num(number("low_extra") * unit("low_extra_unit"))
+    second = second * second_unit + np.nan_to_num(number("high_extra") * unit("high_extra_unit"))
+
+    is_range = ~np.isnan(second)
+    low = np.where(is_range, np.fmin(first, second), first)
+    high = np.where(is_range, np.fmax(first, second), first)
+
+    # "از X" (from X) and "تا X" (up to X) are open-ended
+    from_only = text.str.contains(r"^\s*(?:حقوق\s*)?از", regex=True).to_numpy() & ~is_range
+    up_to = text.str.contains(r"^\D*تا\s*\d", regex=True).to_numpy() & ~is_range
+    low = np.where(up_to, np.nan, low)
+    high = np.where(from_only, np.nan, high)
+
+    rial = text.str.contains("ریال", regex=False).to_numpy()
+    low = np.where(rial, low / 10, low)
+    high = np.where(rial, high / 10, high)
+
+    unknown = text.str.contains(UNKNOWN_PATTERN, regex=True).to_numpy()
+    low = np.where(unknown, np.nan, np.round(low))
+    high = np.where(unknown, np.nan, np.round(high))
+    return low, high
+
+def parse_salaries(salaries: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized salary parsing over a whole series, see _parse_salary_texts.
+    Scraped salaries repeat a lot, so each distinct string is parsed once.
+
+    Returns:
+        pd.DataFrame: salary_min and salary_max columns (nullable Int64),
+        aligned with the input index
+    """
+    codes, uniques = pd.factorize(salaries, use_na_sentinel=True)
+    low, high = _parse_salary_texts(pd.Series(uniques, dtype=object))
+
+    # code -1 (missing salary) maps to the trailing NaN
+    low = np.append(low, np.nan)[codes]
+    high = np.append(high, np.nan)[codes]
+
+    return pd.DataFrame(
+        {
+            "salary_min": pd.array(low, dtype="Float64").astype("Int64"),
+            "salary_max": pd.array(high, dtype="Float64").astype("Int64"),
+        },
+        index=salaries.index,
+    )
+
+def parse_salary_list(salaries: list) -> list[tuple[int | None, int | None]]:
+    """
+    Parse a batch of salary strings, see parse_salaries.
+
+    Returns:
+        list: (salary_min, salary_max) per input, either may be None
+    """
+    parsed = parse_salaries(pd.Series(salaries, dtype=object))
+    return [
+        (None if pd.isna(low) else int(low), None if pd.isna(high) else int(high))
+        for low, high in zip(parsed["salary_min"], parsed["salary_max"])
+    ]
+
+def parse_salary(salary: str | None) -> tuple[int | None, int | None]:
+    """
+    Parse one salary string, see parse_salaries.
+
+    Returns:
+        tuple: (salary_min, salary_max) in toman, either may be None
+    """
+    return parse_salary_list([salary])[0]
@@ -1,27 +1,65 @@
+import argparse
+import time
 from sqlalchemy.orm import Session
-from app.worker.scraper.scrape import scrape_jobs
-from app.crud.job import create_jobs_with_keyword
+from app.worker.scraper.pipeline import ScrapeError
+from app.worker.scraper.scrape import save_jobs, scrape_jobs
 from app.crud.keyword import *
+from app.services.keyword_refresh import refresh_keyword_aggregates
+from app.utils.text_utils import normalize_keyword
 
-def seed_initial_keywords(db: Session, keywords: list[str]):
+def seed_initial_keywords(db: Session, keywords: list[str], refresh: bool = False):
     """
     Seed initial keywords into the database and scrape their jobs.
     
     Args:
         db (Session): SQLAlchemy DB session
         keywords (list[str]): List of keywords to scrape
+        refresh (bool): Re-scrape keywords that already exist, incrementally
     """
-    for keyword_text in keywords:
+    total = len(keywords)
+    for index, keyword_text in enumerate(keywords, start=1):
+        progress = f"[{index}/{total}]"
+        # stored the way the API looks keywords up
+        keyword_text = normalize_keyword(keyword_text)
         result = get_keyword(db, keyword_text)
-        if result.get("status") == 1:
-            print(f"Keyword '{keyword_text}' already exists or error occurred")
+        # keywords whose last scrape stopped part way are scraped again
+        if result.get("scraped_at") is not None and not refresh:
+            print(f"{progress} Keyword '{keyword_text}' already scraped")
             continue
         
         # log scraping start
-        print(f"Scraping jobs for keyword: {keyword_text}")
-        # run scraper for this keyword
-        jobs = scrape_jobs(keyword_text)
-        # save scraped jobs to database and link them to keyword
-        create_jobs_with_keyword(db, keyword_text, jobs)
+        started = time.monotonic()
+        print(f"{progress} Scraping jobs for keyword: {keyword_text}")
+        # run scraper for this keyword, saving jobs to database
+        # and linking them to the keyword batch by batch
+        try:
+            scrape_jobs(
+                keyword_text,
+                on_batch=lambda batch: save_jobs(db, keyword_text, batch),
+                db=db,
+                incremental=True,
+                watermark=refresh,
+            )
+        except ScrapeError as e:
+            # not marked scraped, so the next run picks it up again
+            print(f"{progress} Keyword '{keyword_text}' failed: {e}")
+            continue
+        refresh_keyword_aggregates(db, keyword_text)
+        mark_keyword_scraped(db, keyword_text)
+        db.commit()
         # log completion
-        print(f"Keyword '{keyword_text}' processed and jobs saved to DB")
+        print(f"{progress} Keyword '{keyword_text}' processed and jobs saved to DB ({time.monotonic() - started:.0f}s)")
+
+if __name__ == "__main__":
+    from database.session import SessionLocal
+    from app.core.logging_config import configure_logging
+    from app.utils.initial_keywords import initial_keywords
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Seed the initial keywords and scrape their jobs.")
+    parser.add_argument("--refresh", action="store_true", help="re-scrape keywords that already exist")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        seed_initial_keywords(db, initial_keywords, refresh=args.refresh)
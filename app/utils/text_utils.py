@@ -1,2 +1,12 @@
+# Persian (۰-۹) and Arabic-Indic (٠-٩) digits to ASCII
+DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
 def clean_text(text: str) -> str:
     return text.replace("\u200c", " ").strip()
+
+def normalize_keyword(text: str) -> str:
+    """
+    Canonical form of a search keyword: cleaned, whitespace collapsed, case folded.
+    Used to coalesce queue requests for the same keyword.
+    """
+    return " ".join(clean_text(text).split()).casefold()
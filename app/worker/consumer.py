@@ -0,0 +1,239 @@
+"""
+Long-running keyword queue consumer.
+
+Runs separately from the API:
+
+    python -m app.worker.consumer [--with-scheduler]
+
+Workers claim keywords, large export jobs and outbox emails as soon as
+they are queued (Postgres LISTEN/NOTIFY), with short polling as a
+fallback, so several consumer processes can run
+side by side on one or more hosts. Pass --with-scheduler to exactly one
+of them to also run the cron jobs (seeding, daily refresh).
+"""
+import argparse
+import logging
+import select
+import signal
+import threading
+import time
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.crud.queue import QUEUE_CHANNEL, claim_pending_keywords, get_queue_stats, get_worker_id, release_keyword
+from app.crud.email_outbox import OUTBOX_CHANNEL
+from app.worker.outbox import run_outbox_drainer
+from app.crud.export_job import claim_export_job
+from app.worker.scheduler import process_keyword, start_scheduler, shutdown_scheduler
+from app.worker.exports import process_export
+from app.worker.scraper.driver_pool import driver_pool
+from app.services.email import mail_queue
+from database.session import SessionLocal, SQLALCHEMY_DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+_stop = threading.Event()
+_wake = threading.Condition()
+_outbox_wake = threading.Event()
+
+def process_next(worker_id: str) -> bool:
+    """
+    Claim and process one queue item.
+    Returns False if the queue was empty.
+    """
+    with SessionLocal() as db:
+        items = claim_pending_keywords(db, limit=1, worker_id=worker_id)
+        if not items:
+            return False
+
+        item = items[0]
+        started = time.monotonic()
+        try:
+            process_keyword(db, item)
+            logger.info(f"[{worker_id}] '{item.keyword}' processed in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[{worker_id}] processing '{item.keyword}' failed: {e}")
+            release_keyword(db, item.id, worker_id)
+        return True
+
+def process_next_export(worker_id: str) -> bool:
+    """
+    Claim and build one export job.
+    Returns False if there was none.
+    """
+    with SessionLocal() as db:
+        job = claim_export_job(db, worker_id=worker_id)
+        if job is None:
+            return False
+
+        started = time.monotonic()
+        process_export(db, job)
+        logger.info(f"[{worker_id}] export {job.id} for '{job.keyword}' handled in {time.monotonic() - started:.1f}s")
+        return True
+
+def _work_loop(worker_id: str):
+    while not _stop.is_set():
+        try:
+            # exports are short compared to scrapes, so they go first
+            if process_next_export(worker_id) or process_next(worker_id):
+                continue
+        except Exception as e:
+            logger.error(f"[{worker_id}] queue error: {e}")
+
+        # Queue is empty: sleep until notified or the poll interval elapses
+        with _wake:
+            _wake.wait(timeout=settings.WORKER_POLL_SECONDS)
+
+def _wake_workers():
+    with _wake:
+        _wake.notify_all()
+
+# Backoff between attempts to restore a lost LISTEN connection
+LISTEN_RETRY_MIN_SECONDS = 1
+LISTEN_RETRY_MAX_SECONDS = 60
+
+def _listen_connection():
+    try:
+        connection = psycopg2.connect(SQLALCHEMY_DATABASE_URL)
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        connection.cursor().execute(f"LISTEN {QUEUE_CHANNEL}; LISTEN {OUTBOX_CHANNEL}")
+        return connection
+    except psycopg2.Error as e:
+        logger.warning(f"LISTEN unavailable, falling back to polling: {e}")
+        return None
+
+class Listener:
+    """
+    LISTEN connection for the queue and outbox channels.
+
+    If the connection can't be opened or drops (database restart, failover,
+    idle timeout), it is reopened with exponential backoff; meanwhile the
+    workers keep polling every WORKER_POLL_SECONDS.
+    """
+
+    def __init__(self, stop: threading.Event, connect=_listen_connection):
+        self.stop = stop
+        self.connect = connect
+        self.connection = None
+        self.retry_seconds = LISTEN_RETRY_MIN_SECONDS
+        self.retry_at = 0.0
+
+    def wait(self, timeout: float) -> set:
+        """
+        Wait up to `timeout` seconds for notifications and return their channels.
+        Returns every channel right after (re)connecting, since notifications
+        sent while disconnected are lost.
+        """
+        if self.connection is None:
+            remaining = self.retry_at - time.monotonic()
+            if remaining > 0:
+                self.stop.wait(min(timeout, remaining))
+                return set()
+            self.connection = self.connect()
+            if self.connection is None:
+                self._retry_later()
+                return set()
+            self.retry_seconds = LISTEN_RETRY_MIN_SECONDS
+            return {QUEUE_CHANNEL, OUTBOX_CHANNEL}
+
+        try:
+            readable, _, _ = select.select([self.connection], [], [], timeout)
+            if not readable:
+                return set()
+            self.connection.poll()
+        except (psycopg2.Error, OSError) as e:
+            logger.warning(f"LISTEN connection lost, polling until it is back: {e}")
+            self.close()
+            self._retry_later()
+            return set()
+
+        channels = {notify.channel for notify in self.connection.notifies}
+        self.connection.notifies.clear()
+        return channels
+
+    def _retry_later(self):
+        self.retry_at = time.monotonic() + self.retry_seconds
+        self.retry_seconds = min(self.retry_seconds * 2, LISTEN_RETRY_MAX_SECONDS)
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except psycopg2.Error:
+                pass
+            self.connection = None
+
+def _log_stats():
+    try:
+        with SessionLocal() as db:
+            logger.info(f"Queue stats: {get_queue_stats(db)}")
+    except Exception as e:
+        logger.error(f"Could not read queue stats: {e}")
+    # the browsers of the Selenium fallback live in this process
+    logger.info(f"Driver pool: {driver_pool.get_metrics()}")
+
+def run_worker(concurrency: int = None, with_scheduler: bool = False):
+    """
+    Start `concurrency` worker threads and block until SIGINT/SIGTERM.
+    """
+    concurrency = concurrency or settings.WORKER_CONCURRENCY
+    base_id = get_worker_id()
+
+    threads = [
+        threading.Thread(target=_work_loop, args=(f"{base_id}:{i}",), name=f"queue-worker-{i}")
+        for i in range(concurrency)
+    ]
+    threads.append(threading.Thread(
+        target=run_outbox_drainer,
+        args=(f"{base_id}:outbox", _stop, _outbox_wake),
+        name="outbox-drainer",
+    ))
+    for thread in threads:
+        thread.start()
+    logger.info(f"Queue consumer started with {concurrency} workers")
+
+    if with_scheduler:
+        start_scheduler()
+
+    listener = Listener(_stop)
+    last_stats = 0.0
+    try:
+        while not _stop.is_set():
+            channels = listener.wait(settings.WORKER_POLL_SECONDS)
+            if QUEUE_CHANNEL in channels:
+                _wake_workers()
+            if OUTBOX_CHANNEL in channels:
+                _outbox_wake.set()
+
+            if time.monotonic() - last_stats >= settings.WORKER_STATS_SECONDS:
+                last_stats = time.monotonic()
+                _log_stats()
+    finally:
+        _stop.set()
+        if with_scheduler:
+            shutdown_scheduler()
+        _wake_workers()
+        _outbox_wake.set()
+        for thread in threads:
+            thread.join()
+        listener.close()
+        # deliver notifications that are still queued
+        mail_queue.flush()
+        logger.info("Queue consumer stopped")
+
+def _handle_signal(signum, frame):
+    _stop.set()
+
+if __name__ == "__main__":
+    configure_logging()
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+
+    parser = argparse.ArgumentParser(description="Process the keyword queue continuously.")
+    parser.add_argument("--concurrency", type=int, default=None, help="worker threads (default: WORKER_CONCURRENCY)")
+    parser.add_argument("--with-scheduler", action="store_true", help="also run the cron scheduler in this process")
+    args = parser.parse_args()
+
+    run_worker(concurrency=args.concurrency, with_scheduler=args.with_scheduler)
@@ -0,0 +1,42 @@
+import logging
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.export_job import finish_export_job
+from app.crud.users import get_user_email
+from app.services.csv import build_export_file
+from app.services.export_cache import export_key
+from app.utils.auth_utils import create_download_token
+from app.crud.email_outbox import add_email
+
+logger = logging.getLogger(__name__)
+
+def download_link(export_id: str, user_id: int = None) -> str:
+    """
+    Path of an export's download route; with a user, signed so it works
+    without the Authorization header (e.g. opened from an email).
+    """
+    if user_id is None:
+        return f"/jobs/download/{export_id}"
+    return f"/jobs/download/{export_id}?token={create_download_token(export_id, user_id)}"
+
+def process_export(db: Session, job):
+    """
+    Build a claimed export into the export cache and email the user its link.
+    """
+    key = export_key(job.keyword_id, job.limit, job.format, job.data_version)
+    try:
+        build_export_file(job.keyword_id, job.limit, job.format, key)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Export {job.id} for '{job.keyword}' failed: {e}")
+        finish_export_job(db, job.id, error=str(e))
+        return
+
+    # the email is committed together with the job's status
+    add_email(
+        db,
+        get_user_email(db, job.user_id),
+        "Export Ready",
+        f"Your export for '{job.keyword}' is ready: {settings.APP_BASE_URL}{download_link(job.id, job.user_id)}"
+    )
+    finish_export_job(db, job.id)
@@ -0,0 +1,56 @@
+"""
+Lease heartbeat: keeps a claimed keyword queue item's lease alive while it
+is processed, however long a single step (e.g. a Selenium fallback) takes.
+"""
+import logging
+import threading
+from app.core.config import settings
+from app.crud.queue import LeaseLost, renew_lease
+from database.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class LeaseHeartbeat:
+    """
+    Renew the lease on a queue item every QUEUE_LEASE_SECONDS / 3 from a
+    background thread, with its own session, until the block exits.
+    Once a renewal finds the item taken over, check() raises LeaseLost.
+
+        with LeaseHeartbeat(item.id, item.claimed_by) as lease:
+            ...
+            lease.check()
+    """
+
+    def __init__(self, keyword_id: int, worker_id: str, interval: float = None):
+        self.keyword_id = keyword_id
+        self.worker_id = worker_id
+        self.interval = interval if interval is not None else settings.QUEUE_LEASE_SECONDS / 3
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{keyword_id}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def check(self):
+        if self.lost.is_set():
+            raise LeaseLost(f"lease on queue item {self.keyword_id} lost by {self.worker_id}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with SessionLocal() as db:
+                    if renew_lease(db, self.keyword_id, self.worker_id):
+                        continue
+            except Exception as e:
+                # the lease is still valid for a while, try again on the next beat
+                logger.warning(f"[{self.worker_id}] renewing lease on queue item {self.keyword_id} failed: {e}")
+                continue
+            logger.warning(f"[{self.worker_id}] lease on queue item {self.keyword_id} lost")
+            self.lost.set()
+            return
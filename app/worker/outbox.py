@@ -0,0 +1,83 @@
+"""
+Outbox drainer: hands claimed email_outbox rows to the mail workers
+(app.services.email.mail_queue) and records each delivery on its row.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from app.core.config import settings
+from app.crud.email_outbox import claim_emails, purge_emails, record_delivery, renew_email_lease
+from app.services.email import mail_queue
+from database.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# how often sent/failed emails older than OUTBOX_RETENTION_HOURS are deleted
+PURGE_INTERVAL_SECONDS = 3600
+
+def _lease_renewer(email_id: int, worker_id: str):
+    def before_send():
+        with SessionLocal() as db:
+            if renew_email_lease(db, email_id, worker_id):
+                return True
+        logger.warning(f"[{worker_id}] lease on email {email_id} lost before sending, skipped")
+        return False
+    return before_send
+
+def _recorder(email_id: int, worker_id: str):
+    def on_result(error, attempts, send_seconds):
+        with SessionLocal() as db:
+            if not record_delivery(db, email_id, worker_id, error, attempts, send_seconds):
+                logger.warning(f"[{worker_id}] lease on email {email_id} lost while sending, outcome not recorded")
+    return on_result
+
+def drain_outbox(worker_id: str) -> int:
+    """
+    Claim one batch of due emails and queue them for delivery.
+    Blocks while the mail queue is full. Returns the number claimed.
+    """
+    with SessionLocal() as db:
+        emails = claim_emails(db, limit=settings.SMTP_BATCH_SIZE, worker_id=worker_id)
+
+    for email in emails:
+        mail_queue.enqueue(
+            email.to_email, email.subject, email.body,
+            before_send=_lease_renewer(email.id, worker_id),
+            on_result=_recorder(email.id, worker_id),
+        )
+    return len(emails)
+
+def run_outbox_drainer(worker_id: str, stop: threading.Event, wake: threading.Event):
+    """
+    Drain the outbox until `stop` is set; sleeps until `wake` is set
+    (on NOTIFY) or OUTBOX_POLL_SECONDS pass when there's nothing due.
+    Also deletes old sent/failed emails every PURGE_INTERVAL_SECONDS.
+    """
+    worst_case = mail_queue.worst_case_delivery_seconds()
+    if settings.OUTBOX_LEASE_SECONDS <= worst_case:
+        logger.warning(
+            f"OUTBOX_LEASE_SECONDS ({settings.OUTBOX_LEASE_SECONDS}s) is shorter than the worst-case "
+            f"delivery time ({worst_case:.0f}s); slow deliveries may be sent twice"
+        )
+
+    purged_at = None
+    while not stop.is_set():
+        if purged_at is None or time.monotonic() - purged_at >= PURGE_INTERVAL_SECONDS:
+            purged_at = time.monotonic()
+            try:
+                with SessionLocal() as db:
+                    purged = purge_emails(db, timedelta(hours=settings.OUTBOX_RETENTION_HOURS))
+                if purged:
+                    logger.info(f"[{worker_id}] purged {purged} old outbox emails")
+            except Exception as e:
+                logger.error(f"[{worker_id}] outbox purge error: {e}")
+
+        try:
+            if drain_outbox(worker_id) == settings.SMTP_BATCH_SIZE:
+                continue
+        except Exception as e:
+            logger.error(f"[{worker_id}] outbox error: {e}")
+
+        wake.wait(timeout=settings.OUTBOX_POLL_SECONDS)
+        wake.clear()
@@ -8,20 +8,23 @@ from sqlalchemy.orm import Session
 
 from database.session import get_db
 from database.session import SessionLocal
-from app.crud.queue import get_pending_keywords, mark_keyword_done
-from app.crud.users import get_user_email
+from app.crud.queue import (
+    LeaseLost,
+    claim_pending_keywords,
+    get_subscriber_emails,
+    get_worker_id,
+    mark_keyword_done,
+    release_keyword,
+)
 from app.crud.keyword import *
-from app.utils.email_utils import send_email_async
+from app.crud.email_outbox import add_emails
+from app.utils.text_utils import normalize_keyword
 from app.utils.seed_keywords import seed_initial_keywords
-from app.worker.scraper.scrape import scrape_jobs
-from app.crud.job import create_jobs_with_keyword
+from app.worker.scraper.scrape import save_jobs, scrape_jobs
+from app.services.keyword_refresh import refresh_all_skill_stats, refresh_keyword_aggregates
+from app.worker.lease import LeaseHeartbeat
 from app.utils.initial_keywords import initial_keywords
-# logging setup
-logging.basicConfig(
-    filename="scheduler.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 # initialize scheduler with Tehran timezone
@@ -39,87 +42,154 @@ def add_on_demand_job(keyword: str):
     logger.info(f"Added on-demand job for keyword '{keyword}' with ID {job_id}")
     print(f"On-demand job added for keyword '{keyword}'")
 
+# notify every user waiting on a queue item
+def notify_subscribers(db: Session, keyword_item, message: str):
+    """
+    Add a notification for each subscriber to the email outbox.
+    Part of the caller's transaction, see finish_keyword.
+    """
+    emails = get_subscriber_emails(db, keyword_item.id)
+    add_emails(db, [(user_email, "Keyword Processed", message) for user_email in emails])
+    if emails:
+        logger.info(f"Notification email queued for {len(emails)} subscribers of '{keyword_item.keyword}'")
+
+# mark a queue item done and notify its subscribers
+def finish_keyword(db: Session, keyword_item, worker_id: str, message: str):
+    """
+    Mark the item done, then queue the subscribers' emails, in one transaction.
+    Marking it first locks the row: a user joining concurrently either commits
+    the subscription before it's read here, or finds the item done and queues a new one.
+    Raises LeaseLost if another worker took the item over meanwhile.
+    """
+    if not mark_keyword_done(db, keyword_item.id, worker_id):
+        raise LeaseLost(f"lease on queue item {keyword_item.id} lost by {worker_id}")
+    notify_subscribers(db, keyword_item, message)
+    db.commit()
+
 # process a single keyword item from queue
 def process_keyword(db: Session, keyword_item):
     """
-    Process a single keyword and send email notification if user_id exists.
+    Process a single keyword and notify all users subscribed to it by email.
+    Raises LeaseLost if another worker took the item over meanwhile.
     """
     logger.info(f"Processing keyword: {keyword_item.keyword}")
-
-    # Check if keyword already scraped
-    if get_keyword(db, keyword_item.keyword):
-        # Already processed, just notify user
-        if keyword_item.user_id:
-            user_email = get_user_email(db, keyword_item.user_id)
-            send_email_async(
-                user_email,
-                "Keyword Processed",
-                f"Your keyword '{keyword_item.keyword}' has already been processed. CSV is ready."
-            )
-        mark_keyword_done(db, keyword_item.id)
+    worker_id = keyword_item.claimed_by
+
+    # Check if keyword already scraped to the end
+    if get_keyword(db, keyword_item.keyword).get("scraped_at") is not None:
+        # Already processed, just notify users
+        finish_keyword(
+            db,
+            keyword_item,
+            worker_id,
+            f"Your keyword '{keyword_item.keyword}' has already been processed. CSV is ready."
+        )
         return
-    
-    # run the actual scraper
-    jobs= scrape_jobs(keyword_item.keyword)
-
-    # Save jobs to DB
-    create_jobs_with_keyword(db, keyword_item.keyword, jobs, )
-
-    # mark the keyword as done in queue
-    mark_keyword_done(db, keyword_item.id)
-
-    # Notify user
-    if keyword_item.user_id:
-        user_email = get_user_email(db, keyword_item.user_id)
-        send_email_async(
-            user_email,
-            "Keyword Processed",
-            f"Your keyword '{keyword_item.keyword}' has been processed. Your CSV is ready."
+
+    # keep our claim alive while the scrape is still running
+    with LeaseHeartbeat(keyword_item.id, worker_id) as lease:
+        def save_batch(batch):
+            lease.check()
+            save_jobs(db, keyword_item.keyword, batch)
+
+        # run the actual scraper, saving jobs to DB batch by batch as they arrive
+        scrape_jobs(
+            keyword_item.keyword,
+            on_batch=save_batch,
+            db=db,
+            incremental=True,
         )
-        logger.info(f"Notification email sent to {user_email}")
+        lease.check()
+        refresh_keyword_aggregates(db, keyword_item.keyword)
+        mark_keyword_scraped(db, keyword_item.keyword)
+
+    finish_keyword(
+        db,
+        keyword_item,
+        worker_id,
+        f"Your keyword '{keyword_item.keyword}' has been processed. Your CSV is ready."
+    )
 
-# process a batch of pending keywords
+# process pending keywords one at a time
 def process_pending_keywords(db: Session, limit: int = 10):
     """
-    Fetch pending keywords from the queue and process each one.
+    Claim and process up to `limit` pending keywords, one at a time, so
+    each claimed item's lease only has to cover its own processing.
+    Items claimed by other workers are skipped; failed items go back to pending.
     """
-    pending_items = get_pending_keywords(db, limit)
-    for item in pending_items:
-        process_keyword(db, item)
+    worker_id = get_worker_id()
+    for _ in range(limit):
+        items = claim_pending_keywords(db, limit=1, worker_id=worker_id)
+        if not items:
+            return
+        item = items[0]
+        try:
+            process_keyword(db, item)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Processing keyword '{item.keyword}' failed: {e}")
+            release_keyword(db, item.id, worker_id)
 
 # daily job (runs every day at 2 AM)
 def daily_job():
     logger.info("Starting daily job")
-    with Session(get_db().bind) as db:
+    with SessionLocal() as db:
         process_pending_keywords(db, limit=20)  # process first 20 items
     logger.info("Daily job finished")
 
 # fallback job (runs every 3 days at 5 AM)
 def fallback_job():
     logger.info("Starting fallback job")
-    with Session(get_db().bind) as db:
+    with SessionLocal() as db:
         process_pending_keywords(db, limit=50)  # process larger batch
     logger.info("Fallback job finished")
 
+# seed job (runs once, in the background, when the scheduler starts)
+def seed_job():
+    logger.info("Starting initial keywords seeding")
+    with SessionLocal() as db:
+        seed_initial_keywords(db, initial_keywords)
+    logger.info("Initial keywords seeding finished")
+
+# refresh job (runs every day at 3 AM)
+def refresh_job():
+    logger.info("Starting seeded keywords refresh")
+    with SessionLocal() as db:
+        seed_initial_keywords(db, initial_keywords, refresh=True)
+        # windowed skill counts of every keyword age by a day
+        recounted = refresh_all_skill_stats(db)
+    logger.info(f"Seeded keywords refresh finished, skill stats of {recounted} keywords recounted")
+
 # On-demand job for a specific keyword
 def on_demand_job(keyword: str):
     logger.info(f"Starting on-demand job for keyword: {keyword}")
-    with Session(get_db().bind) as db:
-        pending_items = get_pending_keywords(db)
+    worker_id = get_worker_id()
+    with SessionLocal() as db:
+        pending_items = claim_pending_keywords(
+            db, limit=1, worker_id=worker_id, keyword=normalize_keyword(keyword)
+        )
         for item in pending_items:
-            if item.keyword == keyword:
+            try:
                 process_keyword(db, item)
-                break
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Processing keyword '{item.keyword}' failed: {e}")
+                release_keyword(db, item.id, worker_id)
     logger.info(f"On-demand job for '{keyword}' finished")
 
 # start the scheduler
 def start_scheduler():
     """
-    Schedule daily and fallback jobs, and optionally run an initial batch.
+    Schedule daily and fallback jobs, and optionally seed the initial keywords.
+    Returns immediately; seeding runs in the scheduler's background threads.
     """
-    # seed initial keywords and scrape job
-    with SessionLocal() as db:
-        seed_initial_keywords(db, initial_keywords)
+    # seed initial keywords and scrape jobs, without blocking the caller
+    if settings.SEED_ON_START:
+        scheduler.add_job(
+            seed_job,
+            id="seed_keywords_job",
+            replace_existing=True
+        )
     
     # daily job at 2 AM
     scheduler.add_job(
@@ -129,6 +199,14 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # incremental refresh of seeded keywords at 3 AM
+    scheduler.add_job(
+        refresh_job,
+        trigger=CronTrigger(hour=3, minute=0),
+        id="refresh_scraper_job",
+        replace_existing=True
+    )
+
     # fallback job every 3 days at 5 AM
     scheduler.add_job(
         fallback_job,
@@ -1,52 +1,153 @@
-from selenium import webdriver as wd
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException
+import logging
 import urllib.parse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
-from typing import List, Dict
+import requests
+from datetime import datetime
+from typing import List, Dict, Optional, Set
 from app.schemas.job import JobBase
 from app.utils.link_utils import normalize_job_link
+from app.utils.date_utils import parse_datetime, parse_relative_age
+from app.worker.scraper.http_client import get_json, post_json
+from app.worker.scraper.driver_pool import driver_pool
+from app.worker.scraper.pagination import drop_older_than, is_watermark_page
+
+logger = logging.getLogger(__name__)
 
 BASE_URL = "https://jobvision.ir"
 
-def get_driver():
-    chrome_options = wd.ChromeOptions()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    return wd.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+# Backend API that the jobvision.ir listing and detail pages render from
+API_URL = "https://candidateapi.jobvision.ir/api/v1/JobPost"
+PAGE_SIZE = 30
+
+# Fields of the detail payload that hold the requirement tags
+SKILL_FIELDS = ("softwareRequirements", "skillRequirements", "languageRequirements")
+
+def _parse_salary(salary) -> str:
+    if isinstance(salary, dict):
+        salary = salary.get("displayText") or salary.get("text")
+    salary = (salary or "").strip()
+    if not salary or "کارآموز" in salary or "امکان" in salary:
+        return "نامشخص"
+    return salary
+
+def parse_job_list(payload: dict) -> List[Dict[str, str]]:
+    """
+    Extract title, salary and link from one page of the listing API.
+    Raises ValueError if the payload doesn't have the expected shape,
+    e.g. because the API changed, so callers can fall back to Selenium.
+    """
+    data = payload.get("data") if isinstance(payload, dict) else None
+    items = data.get("jobPosts") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("Unrecognized JobVision listing payload")
+
+    jobs = []
+    for post in items:
+        title = (post.get("title") or "").strip()
+        job_id = post.get("id")
+
+        # Skip if title or link is missing
+        if not title or not job_id:
+            continue
+
+        jobs.append({
+            "title": title,
+            "salary": _parse_salary(post.get("salary")),
+            "link": normalize_job_link(f"{BASE_URL}/jobs/{job_id}"),
+            "posted_at": parse_datetime(post.get("activationTime")),
+        })
+    if items and not jobs:
+        raise ValueError("JobVision listing payload has no usable postings")
+    return jobs
+
+def parse_job_skills(payload: dict) -> List[str]:
+    """
+    Extract required skills from a job detail API payload.
+    """
+    data = payload.get("data") or {}
+    skills = []
+    for field in SKILL_FIELDS:
+        for item in data.get(field) or []:
+            if isinstance(item, dict):
+                name = item.get("titleEn") or item.get("titleFa") or item.get("title")
+            else:
+                name = item
+            name = (name or "").strip()
+            if name and name not in skills:
+                skills.append(name)
+    return skills
+
+def fetch_list_page(keyword: str, page: int) -> List[Dict[str, str]]:
+    """
+    Fetch one page of search results over HTTP.
+    Returns an empty list once the results are exhausted.
+    Raises requests.RequestException or ValueError (see parse_job_list).
+    """
+    payload = post_json(f"{API_URL}/List", {
+        "pageSize": PAGE_SIZE,
+        "requestedPage": page,
+        "keyword": keyword,
+        "sortBy": 0,
+        "searchId": None,
+    })
+    return parse_job_list(payload)
+
+def fetch_job_detail(job: Dict[str, str]) -> Dict[str, str]:
+    """
+    Fetch the detail payload of a job over HTTP and attach its skills.
+    """
+    job_id = job["link"].rstrip("/").rsplit("/", 1)[-1]
+    try:
+        payload = get_json(f"{API_URL}/Detail", params={"jobPostId": job_id})
+        job["skills"] = parse_job_skills(payload)
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"[JobVision] detail fetch failed for {job['link']}: {e}")
+        job["skills"] = []
+    return job
+
+def _to_scraped_jobs(all_jobs: List[Dict[str, str]]) -> List[JobBase]:
+    # keep only jobs that have non-empty 'skills' lists
+    all_jobs = [job for job in all_jobs if "skills" in job and job["skills"]]
+
+    # map scraped dicts -> ScrapedJob
+    return [
+        JobBase(
+            title=job["title"],
+            salary=job.get("salary"),
+            skills=job.get("skills"),
+            link=job.get("link"),
+        )
+        for job in all_jobs
+    ]
 
 def fetch_job_skills(job):
-    driver = get_driver()
     try:
-        # Open job detail page in a new tab to extract job requirements
-        driver.get(job["link"])
-        WebDriverWait(driver, 5).until(
-            EC.any_of(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "span.d-flex.bg-white.text-black.border")),
-                EC.presence_of_element_located((By.CSS_SELECTOR, "span.tag-title")),
-                EC.presence_of_element_located((By.CSS_SELECTOR, "span.tag.row"))
+        with driver_pool.driver() as driver:
+            # Open job detail page to extract job requirements
+            driver.get(job["link"])
+            WebDriverWait(driver, 5).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "span.d-flex.bg-white.text-black.border")),
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "span.tag-title")),
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "span.tag.row"))
+                )
             )
-        )
-        skills = []
-        # Extract required skills from job detail page
-        spans = driver.find_elements(By.CSS_SELECTOR, "span.d-flex.bg-white.text-black.border")
-        for sp in spans:
-            txt = sp.text.strip()
-            if txt:
-                skills.append(txt)
-        job["skills"] = skills
+            skills = []
+            # Extract required skills from job detail page
+            spans = driver.find_elements(By.CSS_SELECTOR, "span.d-flex.bg-white.text-black.border")
+            for sp in spans:
+                txt = sp.text.strip()
+                if txt:
+                    skills.append(txt)
+            job["skills"] = skills
     except Exception as e:
-        print(f"Error {job['link']}: {e}")
+        logger.warning(f"[JobVision] detail fetch failed for {job['link']}: {e}")
         job["skills"] = []
-    finally:
-        driver.quit()
     return job
 
 def fetch_parallel(all_jobs, workers):
@@ -69,32 +170,39 @@ def fetch_parallel(all_jobs, workers):
                 if res:
                     results.extend(res)
             except Exception as e:
-                print(f"[Future error] {e}")
+                logger.error(f"[JobVision] detail worker failed: {e}")
 
     return results
 
-def scraping_JobVision(keyword: str) -> List[Dict[str, str]]:
+def scraping_JobVision_selenium(
+    keyword: str,
+    watermark_links: Optional[Set[str]] = None,
+    max_pages: Optional[int] = None,
+    max_age_cutoff: Optional[datetime] = None,
+) -> List[JobBase]:
     """
-    Scrape job listings from JobVision.ir based on a keyword.
+    Scrape job listings from JobVision.ir based on a keyword, using a headless browser.
 
     Args:
         keyword (str): Search keyword for job titles.
+        watermark_links (Set[str]): Stop at a full page of these links (already linked to the keyword).
+        max_pages (int): Stop after this many result pages.
+        max_age_cutoff (datetime): Skip postings older than this, going by the age on the cards,
+            and stop at a page without newer ones.
 
     Returns:
-        List[Dict[str, str]]: List of job dictionaries with title, salary, skills and link.
+        List[JobBase]: Jobs with title, salary, skills and link.
     """
-    # Initialize Selenium Chrome WebDriver
-    driver = get_driver()
-
     searched_url = BASE_URL + "/jobs/keyword/"
     encoded = urllib.parse.quote(keyword)
 
     all_jobs = []  # To store extracted job info
     page = 1
 
-    try:
-        while True:
-            url = f"{searched_url}{encoded}?page={page}&sort=0"
+    while True:
+        url = f"{searched_url}{encoded}?page={page}&sort=0"
+        page_jobs = []
+        with driver_pool.driver() as driver:
             driver.get(url)
             time.sleep(1)
 
@@ -142,33 +250,35 @@ def scraping_JobVision(keyword: str) -> List[Dict[str, str]]:
                 except:
                     salary = "نامشخص"
 
+                # Extract posting age (optional), e.g. "۳ روز پیش"
+                try:
+                    posted_at = parse_relative_age(card.text)
+                except:
+                    posted_at = None
+
                 # Add structured job info to result list
-                all_jobs.append({
+                page_jobs.append({
                     "title": title,
                     "salary": salary,
                     "link": normalize_job_link(link),
+                    "posted_at": posted_at,
                 })
-            # Go to next page
-            page += 1
-        driver.quit()
 
-        all_jobs = fetch_parallel(all_jobs, workers= 6)
-                
-    finally:
-        # Close browser
-        driver.quit()
+        # Stop once a full page is already linked to this keyword
+        if is_watermark_page(page_jobs, PAGE_SIZE, watermark_links):
+            break
 
-    # keep only jobs that have non-empty 'skills' lists
-    all_jobs = [job for job in all_jobs if "skills" in job and job["skills"]]
-    
-    # map scraped dicts -> ScrapedJob
-    scraped_jobs: List[JobBase] = [
-        JobBase(
-            title=job["title"],
-            salary=job.get("salary"),
-            skills=job.get("skills"),
-            link=job.get("link"),
-        )
-        for job in all_jobs
-    ]
-    return scraped_jobs
+        # Stop once a page has nothing newer than the cutoff
+        fresh_jobs = drop_older_than(page_jobs, max_age_cutoff)
+        if page_jobs and not fresh_jobs:
+            break
+        all_jobs.extend(fresh_jobs)
+
+        if max_pages and page >= max_pages:
+            break
+        # Go to next page
+        page += 1
+
+    all_jobs = fetch_parallel(all_jobs, workers=driver_pool.size)
+
+    return _to_scraped_jobs(all_jobs)
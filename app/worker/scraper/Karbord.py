@@ -1,45 +1,203 @@
-from selenium import webdriver as wd
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from typing import List, Dict
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Optional, Set
+import logging
 import urllib.parse
 import time
+import requests
 from app.schemas.job import JobBase
 from app.utils.link_utils import normalize_job_link
 from app.utils.text_utils import clean_text
+from app.utils.date_utils import parse_datetime, parse_relative_age
+from app.worker.scraper.http_client import get_json, post_json
+from app.worker.scraper.driver_pool import driver_pool
+from app.worker.scraper.pagination import drop_older_than, is_watermark_page
+
+logger = logging.getLogger(__name__)
 
 BASE_URL = "https://karbord.io/jobs"
 
-def scraping_Karbord(keyword: str) -> List[Dict[str, str]]:
+# Backend API that the karbord.io listing and detail pages render from
+API_URL = "https://api.karbord.io/api/v1/Candidate/JobPosition"
+PAGE_SIZE = 20
+
+def _parse_salary(salary) -> str:
+    if isinstance(salary, dict):
+        salary = salary.get("title") or salary.get("text")
+    salary = (salary or "").strip()
+    return salary if "تومان" in salary else "نامشخص"
+
+def parse_job_list(payload: dict) -> List[Dict[str, str]]:
+    """
+    Extract title, salary and link from one page of the listing API.
+    Raises ValueError if the payload doesn't have the expected shape,
+    e.g. because the API changed, so callers can fall back to Selenium.
+    """
+    data = payload.get("data") if isinstance(payload, dict) else None
+    items = data.get("jobPositions") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("Unrecognized Karbord listing payload")
+
+    jobs = []
+    for position in items:
+        title = clean_text(position.get("title") or "")
+        job_id = position.get("id")
+
+        if not title or not job_id:
+            continue
+
+        jobs.append({
+            "title": title,
+            "salary": _parse_salary(position.get("salary")),
+            "link": normalize_job_link(f"https://karbord.io/jobs/detail/{job_id}"),
+            "posted_at": parse_datetime(position.get("publishDate")),
+        })
+    if items and not jobs:
+        raise ValueError("Karbord listing payload has no usable postings")
+    return jobs
+
+def parse_job_skills(payload: dict) -> List[str]:
+    """
+    Extract skills from a job detail API payload.
+    Software tags keep their level, e.g. "Python (پیشرفته)", like the detail page shows them.
+    """
+    data = payload.get("data") or {}
+    skills = []
+    for tag in data.get("skills") or []:
+        skill = ((tag.get("title") if isinstance(tag, dict) else tag) or "").strip()
+        if skill:
+            skills.append(skill)
+
+    for software in data.get("softwares") or []:
+        skill = (software.get("title") or "").strip()
+        level = (software.get("level") or "").strip()
+        if skill and level:
+            skills.append(f"{skill} ({level})")
+        elif skill:
+            skills.append(skill)
+    return skills
+
+def fetch_list_page(keyword: str, page: int) -> List[Dict[str, str]]:
+    """
+    Fetch one page of search results over HTTP.
+    Returns an empty list once the results are exhausted.
+    Raises requests.RequestException or ValueError (see parse_job_list).
+    """
+    payload = post_json(f"{API_URL}/Search", {
+        "keyword": keyword,
+        "page": page,
+        "pageSize": PAGE_SIZE,
+        "sort": 0,
+    })
+    return parse_job_list(payload)
+
+def fetch_job_detail(job: Dict[str, str]) -> Dict[str, str]:
+    """
+    Fetch the detail payload of a job over HTTP and attach its skills.
+    """
+    job_id = job["link"].rstrip("/").rsplit("/", 1)[-1]
+    try:
+        payload = get_json(f"{API_URL}/{job_id}")
+        job["skills"] = parse_job_skills(payload)
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"[Karbord] detail fetch failed for {job['link']}: {e}")
+        job["skills"] = []
+    return job
+
+def _to_scraped_jobs(all_jobs: List[Dict[str, str]]) -> List[JobBase]:
+    # keep only jobs that have non-empty 'skills' lists
+    all_jobs = [job for job in all_jobs if job.get("skills")]
+
+    # map scraped dicts -> ScrapedJob
+    return [
+        JobBase(
+            title=job["title"],
+            salary=job.get("salary"),
+            skills=job.get("skills", ["نامشخص"]),
+            link=job.get("link"),
+        )
+        for job in all_jobs
+    ]
+
+def fetch_job_skills(job: Dict[str, str]) -> Dict[str, str]:
+    """
+    Open a job detail page with a pooled driver and attach its skills.
+    A driver error only costs this job its skills; the driver is recycled.
     """
-    Scrape job listings from Karbord.io based on a keyword.
+    try:
+        with driver_pool.driver() as driver:
+            # Open job detail page
+            driver.get(job["link"])
+
+            # Wait for the entire container that includes all job conditions
+            try:
+                WebDriverWait(driver, 8).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.job-specification__condition-value"))
+                )
+            except TimeoutException:
+                job["skills"] = []
+                return job
+
+            skills = []
+            # Extract skills
+            try:
+                li_tags = driver.find_elements(By.CSS_SELECTOR, "li.tag")
+                for li in li_tags:
+                    skill = li.text.strip()
+                    if skill:
+                        skills.append(skill)
+
+                software_tags = driver.find_elements(
+                By.CSS_SELECTOR, "app-tag.tag.job-specification__condition-value__tag"
+                )
+                for tag in software_tags:
+                    parts = tag.text.strip().split("|")
+                    if len(parts) == 2:
+                        skill, level = parts[0].strip(), parts[1].strip()
+                        skills.append(f"{skill} ({level})")
+                    elif parts:
+                        skills.append(parts[0].strip())
+            except Exception as e:
+                # keep the skills read before the page went away
+                logger.warning(f"[Karbord] reading skills failed for {job['link']}: {e}")
+
+            job["skills"] = skills
+    except WebDriverException as e:
+        logger.warning(f"[Karbord] detail fetch failed for {job['link']}: {e}")
+        job["skills"] = []
+    return job
+
+def scraping_Karbord_selenium(
+    keyword: str,
+    watermark_links: Optional[Set[str]] = None,
+    max_pages: Optional[int] = None,
+    max_age_cutoff: Optional[datetime] = None,
+) -> List[JobBase]:
+    """
+    Scrape job listings from Karbord.io based on a keyword, using a headless browser.
 
     Args:
         keyword (str): Search keyword for job titles.
+        watermark_links (Set[str]): Stop at a full page of these links (already linked to the keyword).
+        max_pages (int): Stop after this many result pages.
+        max_age_cutoff (datetime): Skip postings older than this, going by the age on the cards,
+            and stop at a page without newer ones.
 
     Returns:
-        List[Dict[str, str]]: List of job dictionaries with title, salary, skills and link.
+        List[JobBase]: Jobs with title, salary, skills and link.
     """
-    chrome_options = wd.ChromeOptions()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    
-    # Initialize Selenium Chrome WebDriver
-    driver = wd.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-
     encoded = urllib.parse.quote(keyword)
     all_jobs = []  # To store extracted job info
     page = 1
 
-    try:
-        while True: 
-            url = f"{BASE_URL}?keyword={encoded}&page={page}&sort=0"
+    while True: 
+        url = f"{BASE_URL}?keyword={encoded}&page={page}&sort=0"
+        page_jobs = []
+        with driver_pool.driver() as driver:
             driver.get(url)
             time.sleep(1)
             try:
@@ -52,7 +210,7 @@ def scraping_Karbord(keyword: str) -> List[Dict[str, str]]:
                 if empty_state:
                     break
             except TimeoutException:
-                print("Timeout")
+                logger.warning(f"[Karbord] timed out waiting for results page {page} of '{keyword}'")
                 break
            
             job_cards = driver.find_elements(By.CSS_SELECTOR, "a.job-card")
@@ -85,68 +243,37 @@ def scraping_Karbord(keyword: str) -> List[Dict[str, str]]:
                 except:
                     salary = "نامشخص"
 
+                # Posting age (optional), e.g. "۳ روز پیش"
+                try:
+                    posted_at = parse_relative_age(job.text)
+                except:
+                    posted_at = None
+
                 # Append job to results list
-                all_jobs.append({
+                page_jobs.append({
                     "title": title,
                     "salary": salary if salary else "نامشخص",
-                    "link": link
+                    "link": link,
+                    "posted_at": posted_at,
                 })
-            # Go to next page
-            page += 1
 
-        for job in all_jobs:
-            # Open job detail page
-            driver.get(job["link"])
+        # Stop once a full page is already linked to this keyword
+        if is_watermark_page(page_jobs, PAGE_SIZE, watermark_links):
+            break
 
-            # Wait for the entire container that includes all job conditions
-            try:
-                WebDriverWait(driver, 8).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.job-specification__condition-value"))
-                )
-            except TimeoutException:
-                job["skills"] = []
-                continue
+        # Stop once a page has nothing newer than the cutoff
+        fresh_jobs = drop_older_than(page_jobs, max_age_cutoff)
+        if page_jobs and not fresh_jobs:
+            break
+        all_jobs.extend(fresh_jobs)
 
-            skills = []
-            # Extract skills
-            try:
-                li_tags = driver.find_elements(By.CSS_SELECTOR, "li.tag")
-                for li in li_tags:
-                    skill = li.text.strip()
-                    if skill:
-                        skills.append(skill)
+        if max_pages and page >= max_pages:
+            break
+        # Go to next page
+        page += 1
 
-                software_tags = driver.find_elements(
-                By.CSS_SELECTOR, "app-tag.tag.job-specification__condition-value__tag"
-                )
-                for tag in software_tags:
-                    parts = tag.text.strip().split("|")
-                    if len(parts) == 2:
-                        skill, level = parts[0].strip(), parts[1].strip()
-                        skills.append(f"{skill} ({level})")
-                    elif parts:
-                        skills.append(parts[0].strip())
-            
-            except Exception as e :
-                job["skills"] = None 
-                
-            job["skills"] = skills
-            
-        # keep only jobs that have non-empty 'skills' lists
-        all_jobs = [job for job in all_jobs if job.get("skills")]
-    finally:
-        # Close browser
-        driver.quit()
-
-    # map scraped dicts -> ScrapedJob
-    scraped_jobs: List[JobBase] = [
-        JobBase(
-            title=job["title"],
-            salary=job.get("salary"),
-            skills=job.get("skills", ["نامشخص"]),
-            link=job.get("link"),
-        )
-        for job in all_jobs
-    ]
+    # detail pages are opened concurrently, one pooled driver per worker
+    with ThreadPoolExecutor(max_workers=driver_pool.size) as executor:
+        all_jobs = list(executor.map(fetch_job_skills, all_jobs))
 
-    return scraped_jobs
+    return _to_scraped_jobs(all_jobs)
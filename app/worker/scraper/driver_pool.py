@@ -0,0 +1,141 @@
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from selenium import webdriver as wd
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+from app.core.config import settings
+
+@lru_cache(maxsize=1)
+def _driver_path() -> str:
+    # Resolve (and download if needed) chromedriver once per process
+    return ChromeDriverManager().install()
+
+def create_driver():
+    chrome_options = wd.ChromeOptions()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    return wd.Chrome(service=Service(_driver_path()), options=chrome_options)
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+class DriverPool:
+    """
+    Bounded, thread-safe pool of headless Chrome drivers.
+
+    Drivers are launched lazily up to `size`, health-checked on checkout,
+    and recycled after `max_pages` checkouts or when they crash.
+    """
+
+    def __init__(self, size: int, max_pages: int):
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._launches = 0
+        self._reuses = 0
+        self._recycles = 0
+        self._checkouts = 0
+        self._wait_total = 0.0
+
+    def _launch(self) -> _PooledDriver:
+        entry = _PooledDriver(create_driver())
+        with self._lock:
+            self._launches += 1
+        return entry
+
+    def _discard(self, entry: _PooledDriver):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._recycles += 1
+
+    def _is_healthy(self, entry: _PooledDriver) -> bool:
+        try:
+            entry.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _acquire(self) -> _PooledDriver:
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                return self._launch()
+
+            if self._is_healthy(entry):
+                with self._lock:
+                    self._reuses += 1
+                return entry
+            self._discard(entry)
+
+    @contextmanager
+    def driver(self):
+        """
+        Check out a driver for the duration of the `with` block.
+        Blocks while all `size` drivers are in use.
+        """
+        started = time.monotonic()
+        self._slots.acquire()
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += time.monotonic() - started
+
+        entry = None
+        broken = False
+        try:
+            entry = self._acquire()
+            yield entry.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            if entry is not None:
+                entry.pages += 1
+                if broken or entry.pages >= self.max_pages:
+                    self._discard(entry)
+                else:
+                    self._idle.put(entry)
+            self._slots.release()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "launches": self._launches,
+                "reuses": self._reuses,
+                "recycles": self._recycles,
+                "checkouts": self._checkouts,
+                "avg_checkout_wait_seconds": self._wait_total / self._checkouts if self._checkouts else 0.0,
+            }
+
+    def close(self):
+        """
+        Quit all idle drivers.
+        """
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                entry.driver.quit()
+            except Exception:
+                pass
+
+driver_pool = DriverPool(size=settings.DRIVER_POOL_SIZE, max_pages=settings.DRIVER_MAX_PAGES)
+atexit.register(driver_pool.close)
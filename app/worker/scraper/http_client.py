@@ -0,0 +1,63 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.core.config import settings
+
+_session = None
+_lock = threading.Lock()
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+    ),
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "fa-IR,fa;q=0.9,en;q=0.8",
+}
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide HTTP session used by the scrapers.
+    Connections are kept alive and pooled per host, so listing and
+    detail requests reuse the same TCP/TLS connections.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                retry = Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET", "POST"),
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=settings.HTTP_POOL_SIZE,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def get_json(url: str, **kwargs):
+    """
+    GET a URL through the pooled session and return the decoded JSON body.
+    Raises requests.RequestException or ValueError on failure.
+    """
+    response = get_session().get(url, timeout=settings.HTTP_TIMEOUT_SECONDS, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+def post_json(url: str, payload: dict, **kwargs):
+    """
+    POST a JSON payload through the pooled session and return the decoded JSON body.
+    Raises requests.RequestException or ValueError on failure.
+    """
+    response = get_session().post(url, json=payload, timeout=settings.HTTP_TIMEOUT_SECONDS, **kwargs)
+    response.raise_for_status()
+    return response.json()
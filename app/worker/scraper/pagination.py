@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+def is_watermark_page(jobs: List[Dict], page_size: int, watermark_links: Optional[Set[str]]) -> bool:
+    """
+    Whether pagination can stop at this list page. Results are sorted
+    newest-first, so once a full page only holds links already linked to the
+    keyword, later pages hold nothing new. Only full pages count: a short
+    one is the last page or had postings dropped for missing fields.
+    """
+    return (
+        watermark_links is not None
+        and len(jobs) >= page_size
+        and all(job["link"] in watermark_links for job in jobs)
+    )
+
+def drop_older_than(jobs: List[Dict], cutoff: Optional[datetime]) -> List[Dict]:
+    """
+    Drop postings older than `cutoff`. Postings without a date are kept.
+    """
+    if cutoff is None:
+        return jobs
+    return [job for job in jobs if not job.get("posted_at") or job["posted_at"] >= cutoff]
@@ -0,0 +1,234 @@
+import asyncio
+import functools
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Set
+import requests
+from app.core.config import settings
+from app.schemas.job import JobBase
+from app.worker.scraper import JobVision, Karbord
+from app.worker.scraper.pagination import drop_older_than, is_watermark_page
+
+logger = logging.getLogger(__name__)
+
+# Each source exposes page-level HTTP primitives plus a full Selenium scraper as fallback
+SOURCES = [
+    {
+        "name": "jobvision",
+        "page_size": JobVision.PAGE_SIZE,
+        "fetch_list_page": JobVision.fetch_list_page,
+        "fetch_job_detail": JobVision.fetch_job_detail,
+        "fallback": JobVision.scraping_JobVision_selenium,
+    },
+    {
+        "name": "karbord",
+        "page_size": Karbord.PAGE_SIZE,
+        "fetch_list_page": Karbord.fetch_list_page,
+        "fetch_job_detail": Karbord.fetch_job_detail,
+        "fallback": Karbord.scraping_Karbord_selenium,
+    },
+]
+
+_DONE = object()  # end-of-stream marker
+
+class ScrapeError(Exception):
+    """
+    Raised when scraped jobs could not be saved, so the keyword is retried.
+    """
+
+async def run_pipeline(
+    keyword: str,
+    on_batch: Callable[[List[JobBase]], None],
+    batch_size: int = None,
+    host_concurrency: int = None,
+    skip_known: Optional[Callable[[List[str]], Set[str]]] = None,
+    on_known: Optional[Callable[[List[str]], None]] = None,
+    watermark_links: Optional[Set[str]] = None,
+    max_pages: Optional[int] = None,
+    max_age_days: Optional[int] = None,
+) -> int:
+    """
+    Scrape all sources for a keyword concurrently.
+
+    List pages of every source stream into a bounded queue, detail pages are
+    fetched from it with at most `host_concurrency` requests per source, and
+    finished jobs are handed to `on_batch` in batches of `batch_size`.
+    Blocking fetches run on a thread pool.
+
+    If `skip_known` is given it is called once per list page with the page's
+    links and returns those whose details need not be fetched again; they
+    are passed to `on_known` once at the end instead.
+    The callbacks run one at a time on a single thread, so they may share a DB session.
+    A batch whose `on_batch` raises is counted as failed; the scrape goes on
+    and raises ScrapeError at the end if any batch failed.
+
+    Pagination of a source stops early (results are sorted newest-first) when
+    a full page only holds links in `watermark_links`, after `max_pages`
+    pages, or when a page only holds postings older than `max_age_days`.
+    A source whose listing API fails, returns an unrecognized payload or has
+    nothing on its first page is scraped with its Selenium fallback instead,
+    within the same bounds.
+
+    Returns:
+        int: Number of jobs saved by `on_batch`
+    """
+    batch_size = batch_size or settings.SCRAPER_BATCH_SIZE
+    host_concurrency = host_concurrency or settings.SCRAPER_HOST_CONCURRENCY
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=len(SOURCES) * (host_concurrency + 1))
+    db_executor = ThreadPoolExecutor(max_workers=1)
+
+    detail_queue = asyncio.Queue(maxsize=batch_size * 2)
+    result_queue = asyncio.Queue(maxsize=batch_size * 2)
+    limits = {source["name"]: asyncio.Semaphore(host_concurrency) for source in SOURCES}
+    seen_links = set()
+    known_links = []
+    max_age_cutoff = (
+        datetime.now(timezone.utc) - timedelta(days=max_age_days) if max_age_days else None
+    )
+
+    async def run_fallback(source):
+        try:
+            jobs = await loop.run_in_executor(executor, functools.partial(
+                source["fallback"],
+                keyword,
+                watermark_links=watermark_links,
+                max_pages=max_pages,
+                max_age_cutoff=max_age_cutoff,
+            ))
+        except Exception as e:
+            logger.error(f"[{source['name']}] Selenium fallback failed for '{keyword}': {e}")
+            return
+        for job in jobs:
+            if job.link not in seen_links:
+                seen_links.add(job.link)
+                await result_queue.put(job)
+
+    async def list_stage(source):
+        started = time.monotonic()
+        if settings.SCRAPER_BACKEND != "http":
+            await run_fallback(source)
+            return
+
+        page = 1
+        stop_reason = None
+        try:
+            while True:
+                jobs = await loop.run_in_executor(executor, source["fetch_list_page"], keyword, page)
+
+                # Stop if there are no more results. An empty first page looks the
+                # same as an API that moved, so Selenium gets to confirm it.
+                if not jobs:
+                    if page == 1:
+                        raise ValueError("no results on the first page")
+                    stop_reason = "no more results"
+                    break
+
+                # Stop once a full page is already linked to this keyword
+                if is_watermark_page(jobs, source["page_size"], watermark_links):
+                    known_links.extend(job["link"] for job in jobs)
+                    stop_reason = "watermark reached"
+                    break
+
+                # Drop postings older than the cutoff; stop once a page has nothing newer
+                jobs = drop_older_than(jobs, max_age_cutoff)
+                if not jobs:
+                    stop_reason = f"postings older than {max_age_days} days"
+                    break
+
+                new_jobs = []
+                for job in jobs:
+                    if job["link"] not in seen_links:
+                        seen_links.add(job["link"])
+                        new_jobs.append(job)
+
+                if skip_known and new_jobs:
+                    known = await loop.run_in_executor(db_executor, skip_known, [job["link"] for job in new_jobs])
+                    known_links.extend(known)
+                    new_jobs = [job for job in new_jobs if job["link"] not in known]
+
+                for job in new_jobs:
+                    await detail_queue.put((source, job))
+
+                if max_pages and page >= max_pages:
+                    stop_reason = f"max pages ({max_pages})"
+                    break
+                page += 1
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"[{source['name']}] HTTP listing failed on page {page}, falling back to Selenium: {e}")
+            await run_fallback(source)
+            stop_reason = "selenium fallback"
+        logger.info(
+            f"[{source['name']}] stopped paginating '{keyword}' at page {page}: {stop_reason} "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+
+    async def detail_stage():
+        while True:
+            item = await detail_queue.get()
+            if item is _DONE:
+                break
+            source, job = item
+            try:
+                async with limits[source["name"]]:
+                    job = await loop.run_in_executor(executor, source["fetch_job_detail"], job)
+            except Exception as e:
+                logger.error(f"[{source['name']}] detail fetch failed for {job['link']}: {e}")
+                continue
+
+            # keep only jobs that have non-empty 'skills' lists
+            if job.get("skills"):
+                await result_queue.put(JobBase(
+                    title=job["title"],
+                    salary=job.get("salary"),
+                    skills=job["skills"],
+                    link=job["link"],
+                ))
+
+    failed_batches = []
+
+    async def persist_stage():
+        total = 0
+        batch = []
+        while True:
+            job = await result_queue.get()
+            if job is not _DONE:
+                batch.append(job)
+            if batch and (job is _DONE or len(batch) >= batch_size):
+                try:
+                    await loop.run_in_executor(db_executor, on_batch, batch)
+                    total += len(batch)
+                except Exception as e:
+                    logger.error(f"Saving a batch of {len(batch)} jobs for '{keyword}' failed: {e}")
+                    failed_batches.append(e)
+                batch = []
+            if job is _DONE:
+                return total
+
+    try:
+        persister = asyncio.create_task(persist_stage())
+        workers = [asyncio.create_task(detail_stage()) for _ in range(len(SOURCES) * host_concurrency)]
+
+        await asyncio.gather(*(list_stage(source) for source in SOURCES))
+
+        for _ in workers:
+            await detail_queue.put(_DONE)
+        await asyncio.gather(*workers)
+
+        await result_queue.put(_DONE)
+        total = await persister
+
+        if failed_batches:
+            raise ScrapeError(
+                f"{len(failed_batches)} batches of jobs for '{keyword}' could not be saved"
+            ) from failed_batches[0]
+
+        if on_known and known_links:
+            await loop.run_in_executor(db_executor, on_known, known_links)
+        logger.info(f"'{keyword}': {total} jobs scraped, {len(known_links)} already up to date")
+        return total
+    finally:
+        executor.shutdown(wait=False)
+        db_executor.shutdown(wait=False)
@@ -1,16 +1,84 @@
-from app.worker.scraper.JobVision import scraping_JobVision 
-from app.worker.scraper.Karbord import scraping_Karbord
-from typing import List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.job import create_jobs_with_keyword, get_fresh_job_links, get_keyword_job_links, touch_jobs_for_keyword
 from app.schemas.job import JobBase
+from app.worker.scraper.pipeline import ScrapeError, run_pipeline
 
-def scrape_jobs(keyword: str) -> List[JobBase]:
+def save_jobs(db: Session, keyword: str, jobs: List[JobBase]):
+    """
+    Save a batch of scraped jobs and link them to the keyword, as the
+    `on_batch` of scrape_jobs. Raises ScrapeError if they weren't saved.
+    """
+    result = create_jobs_with_keyword(db, keyword, jobs)
+    if result["status"] != 1:
+        raise ScrapeError(f"saving {len(jobs)} jobs for '{keyword}' failed: {result.get('error')}")
+
+def scrape_jobs(
+    keyword: str,
+    on_batch: Optional[Callable[[List[JobBase]], None]] = None,
+    db: Optional[Session] = None,
+    incremental: bool = False,
+    watermark: bool = False,
+    max_pages: Optional[int] = None,
+    max_age_days: Optional[int] = None,
+) -> List[JobBase]:
     """
     Scrape jobs from both JobVision and Karbord without a limit.
-    Combines results from both sites into a single list.
+    Both sites are scraped concurrently, so latency is that of the slowest one.
+
+    If `on_batch` is given, jobs are streamed to it in batches as they are
+    scraped (e.g. to persist them) and the returned list is empty.
+    Otherwise results from both sites are combined into a single list.
+
+    In incremental mode (requires `db`), postings already stored and scraped
+    within SCRAPE_TTL_HOURS are not re-opened; they only get their scraped_at
+    and keyword_job.last_update refreshed.
+
+    In watermark mode (requires `db`), pagination of a site stops at the first
+    full page whose links are all already linked to this keyword. `max_pages` and
+    `max_age_days` cap pagination per keyword; they default to
+    SCRAPE_MAX_PAGES / SCRAPE_MAX_AGE_DAYS (0 disables a cap).
+
+    Raises ScrapeError if any batch (or the refresh of known postings)
+    could not be saved, so callers don't treat the keyword as scraped.
     """
-    jobs_jobvision = scraping_JobVision(keyword)
-    jobs_karbord = scraping_Karbord(keyword)
+    Scraped_job: List[JobBase] = []
+    sink = on_batch or Scraped_job.extend
+
+    skip_known = on_known = None
+    if incremental and db is not None:
+        ttl = timedelta(hours=settings.SCRAPE_TTL_HOURS)
+        skip_known = lambda links: get_fresh_job_links(db, links, ttl)
+
+        def on_known(links):
+            result = touch_jobs_for_keyword(db, keyword, links)
+            if result["status"] != 1:
+                raise ScrapeError(f"refreshing {len(links)} known jobs for '{keyword}' failed: {result.get('error')}")
+
+    watermark_links = get_keyword_job_links(db, keyword) if watermark and db is not None else None
+
+    def run():
+        return asyncio.run(run_pipeline(
+            keyword,
+            sink,
+            skip_known=skip_known,
+            on_known=on_known,
+            watermark_links=watermark_links,
+            max_pages=settings.SCRAPE_MAX_PAGES if max_pages is None else max_pages,
+            max_age_days=settings.SCRAPE_MAX_AGE_DAYS if max_age_days is None else max_age_days,
+        ))
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        run()
+    else:
+        # Called from inside an event loop (e.g. a sync startup hook): use a helper thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(run).result()
 
-    Scraped_job: List[JobBase] = jobs_jobvision + jobs_karbord
-    
-    return Scraped_job
\ No newline at end of file
+    return Scraped_job
@@ -0,0 +1,69 @@
+"""
+Shared setup for the benchmark scripts (python -m benchmarks.<name>).
+
+Like the test suite, benchmarks drop and recreate every table, so they run
+against the scratch database given by TEST_POSTGRES_*, never the one in .env.
+"""
+import os
+import resource
+import time
+from contextlib import contextmanager
+
+os.environ["POSTGRES_HOST"] = os.environ.get("TEST_POSTGRES_HOST", "localhost")
+os.environ["POSTGRES_PORT"] = os.environ.get("TEST_POSTGRES_PORT", "5432")
+os.environ["POSTGRES_USER"] = os.environ.get("TEST_POSTGRES_USER", "postgres")
+os.environ["POSTGRES_PASSWORD"] = os.environ.get("TEST_POSTGRES_PASSWORD", "postgres")
+os.environ["POSTGRES_DB"] = os.environ.get("TEST_POSTGRES_DB", "jobinsight_test")
+os.environ.setdefault("SMTP_HOST", "localhost")
+os.environ.setdefault("SMTP_PORT", "2525")
+os.environ.setdefault("SMTP_USER", "bench@example.com")
+os.environ.setdefault("SMTP_PASS", "bench")
+os.environ.setdefault("FROM_EMAIL", "bench@example.com")
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret")
+os.environ["REDIS_URL"] = ""
+os.environ["RUN_SCHEDULER_IN_API"] = "false"
+os.environ["OUTBOX_DRAIN_IN_API"] = "false"
+
+def reset_schema():
+    """
+    Recreate all tables on the scratch database and return its engine.
+    """
+    from database.session import engine
+    from database.base import Base
+    from database.migrations import run_migrations
+    import main  # noqa: F401, registers every model
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    return engine
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+@contextmanager
+def count_statements(engine, results: dict, name: str):
+    """
+    Count the SQL statements (round trips) executed on `engine` in the block.
+    """
+    from sqlalchemy import event
+
+    count = 0
+
+    def before_cursor_execute(*args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        results[name] = count
+
+@contextmanager
+def timer(results: dict, name: str):
+    started = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - started
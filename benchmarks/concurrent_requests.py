@@ -0,0 +1,114 @@
+"""
+Fire concurrent GET /skills/{skill}/jobs requests at the app in-process and
+report throughput and latency at increasing concurrency, for the route as it
+is (plain def, run in the threadpool) and as it was before (async def calling
+the synchronous Session, which blocks the event loop).
+
+    TEST_POSTGRES_HOST=localhost python -m benchmarks.concurrent_requests [--concurrency 1 8 24] [--db-latency-ms 5]
+
+A local database answers in well under a millisecond, which hides the
+difference; --db-latency-ms adds a sleep before every statement to stand in
+for the round trip to a remote one.
+
+Keep --concurrency below DB_POOL_SIZE + DB_MAX_OVERFLOW: past it the async def
+variant deadlocks, as a request waiting for a connection blocks the loop that
+would release the others, until the pool timeout fails it.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from benchmarks.common import reset_schema
+from sqlalchemy import text
+
+REQUESTS_PER_LEVEL = 200
+
+def seed(engine, rows: int = 1000):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO job (title, salary, skills, link)
+            SELECT 'برنامه نویس پایتون ' || i, '۲۰ تا ۳۰ میلیون تومان',
+                   ARRAY['Python', 'Django', 'PostgreSQL'],
+                   'https://example.com/jobs/' || i
+            FROM generate_series(1, :rows) AS i
+        """), {"rows": rows})
+
+def build_apps():
+    from fastapi import Depends, FastAPI, Query
+    from sqlalchemy.orm import Session
+    from app.api.routes import jobs
+    from app.schemas.job import MAX_JOBS_PAGE_SIZE, JobResponse
+    from database.session import get_db
+
+    threadpool = FastAPI()
+    threadpool.include_router(jobs.router)
+
+    event_loop = FastAPI()
+
+    @event_loop.get("/skills/{skill}/jobs", response_model=JobResponse)
+    async def get_jobs_for_skill(skill: str, limit: int = Query(10, ge=0, le=MAX_JOBS_PAGE_SIZE),
+                                 db: Session = Depends(get_db)):
+        return jobs.get_jobs_for_skill(skill, limit, db)
+
+    return {"threadpool (def)": threadpool, "event loop (async def)": event_loop}
+
+async def run_level(app, concurrency: int) -> dict:
+    import httpx
+
+    latencies = []
+    remaining = REQUESTS_PER_LEVEL
+
+    async def client_loop(client):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get("/skills/Python/jobs", params={"limit": 10})
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 24])
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    engine = reset_schema()
+    seed(engine)
+
+    from anyio import to_thread
+    from sqlalchemy import event
+    from app.core.config import settings
+
+    if args.db_latency_ms > 0:
+        @event.listens_for(engine, "before_cursor_execute")
+        def simulate_latency(*_):
+            time.sleep(args.db_latency_ms / 1000)
+
+    async def run():
+        # what main.configure_threadpool does on startup
+        to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+        print(f"{'route':<24} {'concurrency':>11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, app in build_apps().items():
+            for concurrency in args.concurrency:
+                result = await run_level(app, concurrency)
+                print(f"{name:<24} {concurrency:>11} {result['rps']:>8.0f} "
+                      f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Export 100k jobs of one keyword as CSV and XLSX and report time and peak RSS.
+
+    TEST_POSTGRES_HOST=localhost python -m benchmarks.export_csv [--rows 100000]
+
+The streamed exports should keep peak RSS flat regardless of --rows; the
+"materialized" baseline loads all rows first, like exports did before.
+"""
+import argparse
+import os
+import tempfile
+from benchmarks.common import reset_schema, peak_rss_mb, timer
+from sqlalchemy import text
+
+def seed(engine, rows: int) -> int:
+    # generated server-side so seeding doesn't count towards the client's RSS
+    with engine.begin() as conn:
+        keyword_id = conn.execute(text("INSERT INTO keyword (value) VALUES ('benchmark') RETURNING id")).scalar_one()
+        conn.execute(text("""
+            INSERT INTO job (title, salary, skills, link)
+            SELECT 'برنامه نویس پایتون ' || i, '۲۰ تا ۳۰ میلیون تومان',
+                   ARRAY['Python', 'Django', 'PostgreSQL', 'Docker'],
+                   'https://example.com/jobs/' || i
+            FROM generate_series(1, :rows) AS i
+        """), {"rows": rows})
+        conn.execute(text("""
+            INSERT INTO keyword_job (keyword_id, job_id) SELECT :keyword_id, id FROM job
+        """), {"keyword_id": keyword_id})
+    return keyword_id
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    from app.services.csv import write_jobs_csv, write_jobs_xlsx, _export_rows
+
+    engine = reset_schema()
+    keyword_id = seed(engine, args.rows)
+    print(f"{args.rows} rows, baseline peak RSS {peak_rss_mb():.1f} MiB")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # streaming first: ru_maxrss only ever grows
+        for name, write in (("csv", write_jobs_csv), ("xlsx", write_jobs_xlsx)):
+            path = os.path.join(tmp_dir, f"export.{name}")
+            with timer(results, name):
+                write(keyword_id, args.rows, path)
+            print(f"{name:>12}: {results[name]:6.2f}s  {os.path.getsize(path) / 2**20:6.1f} MiB  "
+                  f"peak RSS {peak_rss_mb():.1f} MiB")
+
+        with timer(results, "materialized"):
+            rows = list(_export_rows(keyword_id, args.rows))
+        print(f"{'materialized':>12}: {results['materialized']:6.2f}s  {len(rows)} rows in memory  "
+              f"peak RSS {peak_rss_mb():.1f} MiB")
+
+if __name__ == "__main__":
+    main()
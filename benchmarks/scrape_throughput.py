@@ -0,0 +1,134 @@
+"""
+Scrape a keyword from each job board through the HTTP backend and report
+list pages/s, jobs/s and peak RSS, next to parsing the same payloads alone.
+
+    python -m benchmarks.scrape_throughput [--pages 50] [--latency-ms 20]
+
+The job boards' APIs are replayed from tests/fixtures by a local server
+(every page and detail request gets --latency-ms added, to stand in for
+the round trip), so the numbers cover the pipeline, HTTP client and parsers
+but not the boards themselves. The Selenium backend isn't measured: it
+renders the live sites in Chrome, which a replay can't stand in for.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+from benchmarks.common import peak_rss_mb, timer
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+def load(name):
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+class Boards:
+    """
+    Listing and detail payloads of both boards, `pages` full pages per keyword,
+    each posting with its own id.
+    """
+
+    def __init__(self, pages: int, page_sizes: dict):
+        self.pages = pages
+        self.page_sizes = page_sizes
+        self.jobvision_post = load("jobvision_list.json")["data"]["jobPosts"][0]
+        self.karbord_position = load("karbord_list.json")["data"]["jobPositions"][0]
+        self.detail = {"jobvision": load("jobvision_detail.json"), "karbord": load("karbord_detail.json")}
+
+    def _items(self, board: str, template: dict, page: int) -> list:
+        if page > self.pages:
+            return []
+        size = self.page_sizes[board]
+        items = []
+        for i in range(size):
+            item = copy.copy(template)
+            item["id"] = page * size + i
+            items.append(item)
+        return items
+
+    def jobvision_list(self, body: dict) -> dict:
+        return {"isSuccess": True, "data": {"jobPosts": self._items("jobvision", self.jobvision_post, body["requestedPage"])}}
+
+    def karbord_list(self, body: dict) -> dict:
+        return {"isSuccess": True, "data": {"jobPositions": self._items("karbord", self.karbord_position, body["page"])}}
+
+def serve(boards: Boards, latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, payload):
+            time.sleep(latency)
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            path = urlparse(self.path).path
+            self._reply(boards.jobvision_list(body) if path.startswith("/jobvision") else boards.karbord_list(body))
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            self._reply(boards.detail["jobvision" if path.startswith("/jobvision") else "karbord"])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.worker.scraper import JobVision, Karbord, pipeline
+
+    settings.SCRAPER_BACKEND = "http"
+    boards = Boards(args.pages, {"jobvision": JobVision.PAGE_SIZE, "karbord": Karbord.PAGE_SIZE})
+    server = serve(boards, args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    JobVision.API_URL = f"{base_url}/jobvision"
+    Karbord.API_URL = f"{base_url}/karbord"
+
+    parsers = {
+        "jobvision": (JobVision.parse_job_list, boards.jobvision_list, "requestedPage"),
+        "karbord": (Karbord.parse_job_list, boards.karbord_list, "page"),
+    }
+    sources = {source["name"]: source for source in pipeline.SOURCES}
+
+    print(f"{'source':<10} {'step':<8} {'pages':>6} {'jobs':>7} {'seconds':>8} {'pages/s':>8} {'jobs/s':>8} {'RSS MiB':>8}")
+    for name, source in sources.items():
+        results = {}
+
+        # parsing alone, on payloads decoded up front
+        parse, list_payload, page_field = parsers[name]
+        payloads = [json.loads(json.dumps(list_payload({page_field: page}))) for page in range(1, args.pages + 1)]
+        with timer(results, "parse"):
+            parsed = sum(len(parse(payload)) for payload in payloads)
+        print(f"{name:<10} {'parse':<8} {args.pages:>6} {parsed:>7} {results['parse']:>8.2f} "
+              f"{args.pages / results['parse']:>8.0f} {parsed / results['parse']:>8.0f} {'':>8}")
+
+        pipeline.SOURCES = [source]
+        rss_before = peak_rss_mb()
+        with timer(results, "scrape"):
+            scraped = asyncio.run(pipeline.run_pipeline(
+                "python", lambda batch: None, watermark_links=None, max_pages=None, max_age_days=None,
+            ))
+        print(f"{name:<10} {'scrape':<8} {args.pages:>6} {scraped:>7} {results['scrape']:>8.2f} "
+              f"{args.pages / results['scrape']:>8.1f} {scraped / results['scrape']:>8.0f} "
+              f"{peak_rss_mb() - rss_before:>+8.0f}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Persist 100, 1k and 10k scraped jobs for a keyword with create_jobs_with_keyword
+and report round trips and wall time, for new jobs and for a re-scrape of the
+same jobs (all conflicts, nothing changed).
+
+    TEST_POSTGRES_HOST=localhost python -m benchmarks.upsert_jobs [--sizes 100 1000 10000]
+"""
+import argparse
+from benchmarks.common import reset_schema, count_statements, timer
+
+def make_jobs(n: int, offset: int = 0):
+    from app.schemas.job import JobCreate
+
+    return [
+        JobCreate(
+            title=f"برنامه نویس پایتون {i}",
+            salary="۲۰ تا ۳۰ میلیون تومان",
+            link=f"https://jobvision.ir/jobs/{offset + i}",
+            skills=["Python", "Django", "PostgreSQL"],
+        )
+        for i in range(n)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000])
+    args = parser.parse_args()
+
+    engine = reset_schema()
+    from app.crud.job import create_jobs_with_keyword
+    from database.session import SessionLocal
+
+    print(f"{'jobs':>6} {'pass':>8} {'round trips':>12} {'seconds':>8} {'jobs/s':>9}")
+    for offset, size in enumerate(args.sizes):
+        jobs = make_jobs(size, offset=offset * 1_000_000)
+        for name in ("insert", "rescrape"):
+            results = {}
+            with SessionLocal() as db:
+                with count_statements(engine, results, "statements"), timer(results, "seconds"):
+                    result = create_jobs_with_keyword(db, f"keyword {size}", jobs)
+            assert result["status"] == 1, result
+            print(f"{size:>6} {name:>8} {results['statements']:>12} {results['seconds']:>8.3f} "
+                  f"{size / results['seconds']:>9.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import hashlib
+import logging
+from collections import defaultdict
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from app.utils.text_utils import normalize_keyword
+
+logger = logging.getLogger(__name__)
+
+def _group_by_normalized(rows) -> dict:
+    groups = defaultdict(list)
+    for row in rows:
+        groups[normalize_keyword(row[1])].append(row)
+    return groups
+
+def _normalize_keyword_queue(connection: Connection):
+    """
+    Coalesce active queue items whose keywords normalize to the same value
+    into the oldest one (moving their requesters to its subscribers), and
+    store its keyword normalized. Must match normalize_keyword() exactly,
+    or add_keyword_to_queue() won't find the item, so it runs in Python.
+    """
+    rows = connection.execute(text(
+        "SELECT id, keyword FROM keyword_queue WHERE status IN ('pending', 'processing') ORDER BY id"
+    )).all()
+
+    for normalized, items in _group_by_normalized(rows).items():
+        keep_id, keyword = items[0]
+        merged_ids = [item_id for item_id, _ in items[1:]]
+        if merged_ids:
+            ids = {"keep_id": keep_id, "merged_ids": merged_ids, "all_ids": [keep_id] + merged_ids}
+            connection.execute(text("""
+                INSERT INTO keyword_queue_subscriber (queue_id, user_id)
+                SELECT :keep_id, q.user_id FROM keyword_queue q JOIN users u ON u.id = q.user_id
+                WHERE q.id = ANY(:all_ids)
+                UNION
+                SELECT :keep_id, user_id FROM keyword_queue_subscriber WHERE queue_id = ANY(:merged_ids)
+                ON CONFLICT DO NOTHING
+            """), ids)
+            connection.execute(text("UPDATE keyword_queue SET status = 'merged' WHERE id = ANY(:merged_ids)"), ids)
+        if keyword != normalized:
+            connection.execute(
+                text("UPDATE keyword_queue SET keyword = :keyword WHERE id = :id"),
+                {"keyword": normalized, "id": keep_id},
+            )
+
+def _normalize_keywords(connection: Connection):
+    """
+    Store every keyword normalized, merging keywords that only differed in
+    spelling (case, spacing, ZWNJ) into one: their jobs and export jobs move
+    to the kept keyword, the others are deleted with their derived rows.
+    """
+    rows = connection.execute(text("SELECT id, value FROM keyword ORDER BY id")).all()
+
+    merged = 0
+    for normalized, keywords in _group_by_normalized(rows).items():
+        if len(keywords) == 1 and keywords[0][1] == normalized:
+            continue
+
+        # keep the row already stored normalized if there is one, else the oldest
+        keep_id = next((keyword_id for keyword_id, value in keywords if value == normalized), keywords[0][0])
+        merged_ids = [keyword_id for keyword_id, _ in keywords if keyword_id != keep_id]
+        ids = {"keep_id": keep_id, "merged_ids": merged_ids}
+
+        if merged_ids:
+            connection.execute(text("""
+                INSERT INTO keyword_job (keyword_id, job_id, last_update)
+                SELECT :keep_id, job_id, max(last_update) FROM keyword_job
+                WHERE keyword_id = ANY(:merged_ids)
+                GROUP BY job_id
+                ON CONFLICT (keyword_id, job_id)
+                DO UPDATE SET last_update = GREATEST(keyword_job.last_update, EXCLUDED.last_update)
+            """), ids)
+            connection.execute(text("UPDATE export_job SET keyword_id = :keep_id WHERE keyword_id = ANY(:merged_ids)"), ids)
+            # their skill stats go with them, and out of the totals
+            connection.execute(text("""
+                UPDATE skill_stat SET count = skill_stat.count - merged.count, keywords = skill_stat.keywords - merged.keywords
+                FROM (
+                    SELECT "window", skill, sum(count) AS count, count(*) AS keywords FROM keyword_skill_stat
+                    WHERE keyword_id = ANY(:merged_ids)
+                    GROUP BY "window", skill
+                ) AS merged
+                WHERE skill_stat."window" = merged."window" AND skill_stat.skill = merged.skill
+            """), ids)
+            connection.execute(text("DELETE FROM skill_stat WHERE keywords <= 0"))
+            connection.execute(text("DELETE FROM keyword WHERE id = ANY(:merged_ids)"), ids)
+            # the precomputed first page no longer matches the merged job list
+            connection.execute(text("DELETE FROM keyword_response WHERE keyword_id = :keep_id"), ids)
+            merged += len(merged_ids)
+
+        connection.execute(
+            text("UPDATE keyword SET value = :value, data_version = data_version + 1 WHERE id = :keep_id"),
+            {"value": normalized, **ids},
+        )
+
+    if merged:
+        logger.warning(
+            f"Merged {merged} keyword spellings; run python -m app.services.keyword_refresh "
+            "to rebuild their skill and salary stats"
+        )
+
+# Idempotent DDL (and data fixes) for tables that already exist, since create_all()
+# only creates missing tables. Statements run in order, once per database
+# (see run_migrations); append new ones, editing one makes it run again.
+MIGRATIONS = [
+    # keyword_queue claiming / leases
+    "ALTER TABLE keyword_queue ADD COLUMN IF NOT EXISTS claimed_by VARCHAR(128)",
+    "ALTER TABLE keyword_queue ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ",
+    "ALTER TABLE keyword_queue ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ",
+    "ALTER TABLE keyword_queue ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_keyword_queue_status_created_at ON keyword_queue (status, created_at)",
+
+    # one active queue item per normalize_keyword() value
+    _normalize_keyword_queue,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_keyword_queue_active_keyword
+    ON keyword_queue (keyword) WHERE status IN ('pending', 'processing')
+    """,
+
+    # keyset pagination of jobs per keyword
+    "CREATE INDEX IF NOT EXISTS ix_keyword_job_keyword_last_update ON keyword_job (keyword_id, last_update, job_id)",
+    "ALTER TABLE keyword_response ADD COLUMN IF NOT EXISTS cursors TEXT[] NOT NULL DEFAULT '{}'",
+    # precomputed responses are served only while their keyword's data_version matches
+    "ALTER TABLE keyword_response ADD COLUMN IF NOT EXISTS data_version INTEGER",
+
+    # export cache keys
+    "ALTER TABLE keyword ADD COLUMN IF NOT EXISTS data_version INTEGER NOT NULL DEFAULT 0",
+
+    # one keyword row per normalize_keyword() value, as the API looks them up
+    _normalize_keywords,
+
+    # token revocation
+    "ALTER TABLE tokens ADD COLUMN IF NOT EXISTS revoked_at TIMESTAMPTZ",
+    "CREATE INDEX IF NOT EXISTS ix_tokens_revoked ON tokens (expires_at) WHERE revoked_at IS NOT NULL",
+
+    # job.skills: comma-joined text -> text[]. Splits on ',' and the Persian
+    # '،'; entries that contained commas were already split when stored.
+    """
+    DO $$
+    BEGIN
+        IF (SELECT data_type FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'job' AND column_name = 'skills') = 'text' THEN
+            ALTER TABLE job ALTER COLUMN skills TYPE TEXT[] USING
+                array_remove(array_remove(regexp_split_to_array(btrim(skills), '\\s*[,،]\\s*'), ''), 'نامشخص');
+            ALTER TABLE job ALTER COLUMN skills SET DEFAULT '{}';
+        END IF;
+    END
+    $$
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_job_skills ON job USING GIN (skills)",
+
+    # parsed salaries, filled by python -m app.utils.backfill_salaries
+    "ALTER TABLE job ADD COLUMN IF NOT EXISTS salary_min BIGINT",
+    "ALTER TABLE job ADD COLUMN IF NOT EXISTS salary_max BIGINT",
+
+    # cross-keyword skill totals, summed once from the per-keyword stats
+    # and kept up to date by refresh_keyword_skill_stats from then on
+    """
+    INSERT INTO skill_stat ("window", skill, count, keywords)
+    SELECT "window", skill, sum(count), count(*) FROM keyword_skill_stat
+    WHERE NOT EXISTS (SELECT 1 FROM skill_stat)
+    GROUP BY "window", skill
+    """,
+    "DROP INDEX IF EXISTS ix_keyword_skill_stat_window_skill",
+
+    # scrape completion; keywords whose first page was precomputed had
+    # a complete scrape, as that only happens once one finishes
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'keyword' AND column_name = 'scraped_at') THEN
+            ALTER TABLE keyword ADD COLUMN scraped_at TIMESTAMPTZ;
+            UPDATE keyword SET scraped_at = now() WHERE id IN (SELECT keyword_id FROM keyword_response);
+        END IF;
+    END
+    $$
+    """,
+]
+
+def migration_id(statement) -> str:
+    """
+    Key of a MIGRATIONS entry in schema_migration: the function's name,
+    or a digest of the SQL.
+    """
+    if callable(statement):
+        return statement.__name__
+    return "sql:" + hashlib.sha256(" ".join(statement.split()).encode("utf-8")).hexdigest()[:32]
+
+def run_migrations(engine: Engine) -> int:
+    """
+    Apply schema changes to existing tables.
+    Entries are SQL strings, or functions of the connection for data
+    migrations that can't be written in SQL.
+
+    Entries recorded in schema_migration are skipped, so the ALTERs (and their
+    ACCESS EXCLUSIVE locks) only run on the first start after they were added.
+    Concurrent callers (several API processes starting at once) wait on an
+    advisory lock and then find the work done.
+
+    Returns:
+        int: Number of entries applied
+    """
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_migration'))"))
+        applied = set(connection.execute(text("SELECT id FROM schema_migration")).scalars())
+
+        pending = [(migration_id(statement), statement) for statement in MIGRATIONS]
+        pending = [(key, statement) for key, statement in pending if key not in applied]
+        for key, statement in pending:
+            if callable(statement):
+                statement(connection)
+            else:
+                connection.execute(text(statement))
+            connection.execute(text("INSERT INTO schema_migration (id) VALUES (:id)"), {"id": key})
+
+    if pending:
+        logger.info(f"Applied {len(pending)} schema migrations")
+    return len(pending)
+
+if __name__ == "__main__":
+    from database.base import Base
+    from database.session import engine
+    from app.core.logging_config import configure_logging
+    import main  # noqa: F401, registers every model
+
+    configure_logging()
+    Base.metadata.create_all(engine)
+    print(f"Applied {run_migrations(engine)} schema migrations")
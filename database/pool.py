@@ -0,0 +1,66 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait for a connection,
+    how often it has to open overflow connections, and checkout timeouts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_connections = 0
+        self.timeouts = 0
+
+    def recreate(self):
+        # keep the counters across pool recreation (e.g. after dispose())
+        pool = super().recreate()
+        pool.__dict__.update({
+            key: getattr(self, key)
+            for key in ("checkouts", "wait_seconds_total", "wait_seconds_max", "overflow_connections", "timeouts")
+        })
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return connection
+
+    def _create_connection(self):
+        # overflow() is already incremented here and only positive past pool_size
+        if self.overflow() > 0:
+            with self._stats_lock:
+                self.overflow_connections += 1
+        return super()._create_connection()
+
+    def get_metrics(self) -> dict:
+        with self._stats_lock:
+            checkouts = self.checkouts
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "checkouts": checkouts,
+                "wait_ms_avg": round(self.wait_seconds_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "overflow_connections": self.overflow_connections,
+                "timeouts": self.timeouts,
+            }
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
 from collections.abc import Generator
 from app.core.config import settings
+from database.pool import InstrumentedQueuePool
 
 POSTGRES_USER = settings.POSTGRES_USER
 POSTGRES_PASSWORD = settings.POSTGRES_PASSWORD
@@ -14,10 +15,26 @@ SQLALCHEMY_DATABASE_URL = (
     f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+connect_args = {}
+if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
+# Sessions are synchronous: routes and dependencies that use them are plain
+# `def`, so FastAPI runs them in its threadpool instead of on the event loop.
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
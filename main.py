@@ -1,7 +1,10 @@
+import threading
 from database.base import Base
 from database.session import engine
+from database.migrations import run_migrations
 from fastapi import FastAPI
-from app.api.routes import auth, jobs, protected_routes
+from anyio import to_thread
+from app.api.routes import auth, jobs, protected_routes, metrics, insights
 from app.models.users import User
 from app.models.tokens import Token
 from app.models.otps import Otp
@@ -9,20 +12,55 @@ from app.models.job import Job
 from app.models.keyword import Keyword
 from app.models.keyword_job import keyword_job
 from app.models.keyword_queue import KeywordQueue
+from app.models.keyword_queue_subscriber import keyword_queue_subscriber
+from app.models.keyword_response import KeywordResponse
+from app.models.export_job import ExportJob
+from app.models.email_outbox import EmailOutbox
+from app.models.keyword_skill_stat import KeywordSkillStat
+from app.models.skill_stat import SkillStat
+from app.models.keyword_salary_stat import KeywordSalaryStat
+from app.models.schema_migration import SchemaMigration
 from fastapi.staticfiles import StaticFiles
 from app.worker.scheduler import *
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.services.email import mail_queue
+from app.worker.outbox import run_outbox_drainer
+from app.crud.queue import get_worker_id
 
 app = FastAPI()
+outbox_stop = threading.Event()
 
 @app.on_event("startup")
 def startup():
+    configure_logging()
     # Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    if settings.MIGRATE_ON_START:
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
 
-    start_scheduler()
+    # No scraping on the request-serving path: the scheduler normally runs
+    # in the queue consumer (python -m app.worker.consumer --with-scheduler)
+    if settings.RUN_SCHEDULER_IN_API:
+        start_scheduler()
+
+    # Emails are normally sent by the queue consumer
+    if settings.OUTBOX_DRAIN_IN_API:
+        threading.Thread(
+            target=run_outbox_drainer,
+            args=(f"{get_worker_id()}:outbox", outbox_stop, threading.Event()),
+            name="outbox-drainer",
+            daemon=True,
+        ).start()
     # # test
     # add_on_demand_job("python")
 
+@app.on_event("startup")
+async def configure_threadpool():
+    # Sync routes and dependencies run in this threadpool, one thread per
+    # in-flight request; keep it in step with the database pool size
+    to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+
 # Auth
 app.include_router(auth.router ,prefix="")
 
@@ -32,6 +70,15 @@ app.include_router(jobs.router, prefix="")
 # export
 app.include_router(protected_routes.router, prefix="")
 
+# insights
+app.include_router(insights.router, prefix="")
+
+# metrics
+app.include_router(metrics.router, prefix="")
+
 @app.on_event("shutdown")
 def on_shutdown():
-    shutdown_scheduler()
\ No newline at end of file
+    if settings.RUN_SCHEDULER_IN_API:
+        shutdown_scheduler()
+    outbox_stop.set()
+    mail_queue.flush()
\ No newline at end of file
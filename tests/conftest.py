@@ -0,0 +1,61 @@
+import os
+
+# Settings are read at import time, so the test environment has to be set
+# before anything from app/ or database/ is imported. The suite never uses
+# the POSTGRES_* values from .env: point it at a scratch database with TEST_POSTGRES_*.
+os.environ["POSTGRES_HOST"] = os.environ.get("TEST_POSTGRES_HOST", "localhost")
+os.environ["POSTGRES_PORT"] = os.environ.get("TEST_POSTGRES_PORT", "5432")
+os.environ["POSTGRES_USER"] = os.environ.get("TEST_POSTGRES_USER", "postgres")
+os.environ["POSTGRES_PASSWORD"] = os.environ.get("TEST_POSTGRES_PASSWORD", "postgres")
+os.environ["POSTGRES_DB"] = os.environ.get("TEST_POSTGRES_DB", "jobinsight_test")
+os.environ.setdefault("SMTP_HOST", "localhost")
+os.environ.setdefault("SMTP_PORT", "2525")
+os.environ.setdefault("SMTP_USER", "test@example.com")
+os.environ.setdefault("SMTP_PASS", "test")
+os.environ.setdefault("FROM_EMAIL", "test@example.com")
+os.environ.setdefault("JWT_SECRET", "test-secret-test-secret-test-secret!")
+os.environ["REDIS_URL"] = ""
+os.environ["RUN_SCHEDULER_IN_API"] = "false"
+os.environ["OUTBOX_DRAIN_IN_API"] = "false"
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """
+    Engine with a fresh schema, or skip if the test database is unreachable.
+    """
+    from database.session import engine
+    from database.base import Base
+    from database.migrations import run_migrations
+    import main  # noqa: F401, registers every model
+
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as e:
+        pytest.skip(f"Postgres not available: {e.orig}")
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    return engine
+
+@pytest.fixture
+def db(db_engine):
+    """
+    Session on an empty database; all tables are truncated afterwards.
+    """
+    from database.session import SessionLocal
+    from database.base import Base
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+        with db_engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
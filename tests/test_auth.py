@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+import jwt
+import pytest
+from fastapi import HTTPException
+from app.api.routes.auth import authenticate_user, verify_otp
+from app.core.config import settings
+from app.models.otps import Otp
+from app.models.email_outbox import EmailOutbox
+from app.schemas.auth import AuthRequest, VerifyOtpRequest
+from app.utils.auth_utils import create_jwt, decode_jwt
+from app.utils.clock import clock
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+TOLERANCE = timedelta(seconds=settings.CLOCK_SKEW_TOLERANCE_SECONDS)
+
+def test_jwt_valid_until_expiry_plus_tolerance():
+    with clock.frozen(NOW):
+        token, expires_at = create_jwt(42)
+        assert expires_at == NOW + timedelta(hours=settings.TOKEN_EXPIRE_HOURS)
+        assert decode_jwt(token)["sub"] == "42"
+
+        clock.advance(expires_at - NOW)
+        assert decode_jwt(token)["sub"] == "42"
+
+        clock.advance(TOLERANCE)
+        with pytest.raises(jwt.ExpiredSignatureError):
+            decode_jwt(token)
+
+def test_jwt_rejects_other_secret_and_missing_claims():
+    with clock.frozen(NOW):
+        forged = jwt.encode({"sub": "1", "exp": NOW + timedelta(hours=1)}, "x" * 32, algorithm=settings.JWT_ALGORITHM)
+        with pytest.raises(jwt.InvalidTokenError):
+            decode_jwt(forged)
+
+        no_exp = jwt.encode({"sub": "1"}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+        with pytest.raises(jwt.InvalidTokenError):
+            decode_jwt(no_exp)
+
+def _request_otp(db, email) -> str:
+    authenticate_user(AuthRequest(email=email), db)
+    return db.query(Otp).order_by(Otp.id.desc()).first().code
+
+def test_otp_email_goes_through_outbox(db):
+    with clock.frozen(NOW):
+        code = _request_otp(db, "user@example.com")
+    email = db.query(EmailOutbox).one()
+    assert email.to_email == "user@example.com"
+    assert code in email.body
+
+def test_otp_accepted_until_expiry_plus_tolerance(db):
+    with clock.frozen(NOW):
+        code = _request_otp(db, "user@example.com")
+        clock.advance(timedelta(minutes=settings.OTP_EXPIRE_MINUTES) + TOLERANCE - timedelta(seconds=1))
+        response = verify_otp(VerifyOtpRequest(email="user@example.com", code=code), db)
+        assert decode_jwt(response["access_token"])["sub"] == str(db.query(Otp).one().user_id)
+
+def test_otp_expired(db):
+    with clock.frozen(NOW):
+        code = _request_otp(db, "user@example.com")
+        clock.advance(timedelta(minutes=settings.OTP_EXPIRE_MINUTES) + TOLERANCE)
+        with pytest.raises(HTTPException) as error:
+            verify_otp(VerifyOtpRequest(email="user@example.com", code=code), db)
+    assert error.value.status_code == 400
+
+def test_otp_single_use(db):
+    with clock.frozen(NOW):
+        code = _request_otp(db, "user@example.com")
+        verify_otp(VerifyOtpRequest(email="user@example.com", code=code), db)
+        with pytest.raises(HTTPException):
+            verify_otp(VerifyOtpRequest(email="user@example.com", code=code), db)
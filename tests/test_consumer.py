@@ -0,0 +1,62 @@
+import threading
+from sqlalchemy import text
+import app.worker.consumer as consumer
+from app.crud.email_outbox import OUTBOX_CHANNEL
+from app.crud.queue import QUEUE_CHANNEL
+from app.worker.consumer import Listener
+
+ALL_CHANNELS = {QUEUE_CHANNEL, OUTBOX_CHANNEL}
+
+def _notify(engine, channel: str):
+    with engine.begin() as conn:
+        conn.execute(text(f"NOTIFY {channel}"))
+
+def test_listener_receives_notifications(db_engine):
+    listener = Listener(threading.Event())
+    try:
+        # connecting reports every channel, as anything sent before was missed
+        assert listener.wait(0.1) == ALL_CHANNELS
+        assert listener.wait(0.1) == set()
+
+        _notify(db_engine, QUEUE_CHANNEL)
+        assert listener.wait(5) == {QUEUE_CHANNEL}
+    finally:
+        listener.close()
+
+def test_listener_reconnects_after_connection_loss(db_engine, monkeypatch):
+    monkeypatch.setattr(consumer, "LISTEN_RETRY_MIN_SECONDS", 0)
+    listener = Listener(threading.Event())
+    try:
+        assert listener.wait(0.1) == ALL_CHANNELS
+        with db_engine.begin() as conn:
+            conn.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": listener.connection.get_backend_pid()})
+
+        # the FATAL notice is read first, the closed socket on the next poll
+        assert listener.wait(5) == set()
+        assert listener.wait(5) == set()
+        assert listener.connection is None
+
+        assert listener.wait(0.1) == ALL_CHANNELS
+        _notify(db_engine, OUTBOX_CHANNEL)
+        assert listener.wait(5) == {OUTBOX_CHANNEL}
+    finally:
+        listener.close()
+
+def test_listener_backs_off_while_database_is_down():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        return None
+
+    listener = Listener(threading.Event(), connect=connect)
+    assert listener.wait(0.01) == set()
+    # not retried before the backoff elapses
+    assert listener.wait(0.01) == set()
+    assert len(attempts) == 1
+    assert listener.retry_seconds == consumer.LISTEN_RETRY_MIN_SECONDS * 2
+
+def test_stats_log_includes_driver_pool(db_engine, caplog):
+    with caplog.at_level("INFO", logger=consumer.__name__):
+        consumer._log_stats()
+    assert any(message.startswith("Driver pool: {'size'") for message in caplog.messages)
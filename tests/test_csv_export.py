@@ -0,0 +1,41 @@
+import csv
+import io
+from app.schemas.job import JobCreate
+from app.crud.job import create_jobs_with_keyword
+from app.services.csv import content_disposition, iter_jobs_csv, stream_jobs_csv
+
+def test_content_disposition_ascii():
+    assert content_disposition("jobinsight_python50.csv") == (
+        "attachment; filename=\"jobinsight_python50.csv\"; filename*=utf-8''jobinsight_python50.csv"
+    )
+
+def test_content_disposition_persian_is_latin1_encodable():
+    header = content_disposition("jobinsight_برنامه نویس50.csv")
+    header.encode("latin-1")
+    assert "filename*=utf-8''jobinsight_%D8%A8%D8%B1%D9%86" in header
+
+def test_content_disposition_escapes_quotes_and_newlines():
+    header = content_disposition('a"b\r\nSet-Cookie: x=1.csv')
+    assert "\r" not in header and "\n" not in header
+    fallback = header.split(";")[1]
+    assert fallback == ' filename="a_b__Set-Cookie: x=1.csv"'
+
+def test_stream_jobs_csv_header():
+    response = stream_jobs_csv(1, 10, "jobinsight_پایتون10.csv")
+    assert response.headers["content-disposition"].startswith('attachment; filename="jobinsight_______10.csv"')
+
+def test_iter_jobs_csv(db):
+    jobs = [
+        JobCreate(title=f"Job {i}", salary="۲۰ میلیون تومان", link=f"https://example.com/jobs/{i}", skills=["Python", "SQL"])
+        for i in range(3)
+    ]
+    result = create_jobs_with_keyword(db, "python", jobs)
+    assert result["status"] == 1
+
+    data = b"".join(iter_jobs_csv(result["keyword_id"], 2))
+    assert data.startswith("\ufeff".encode("utf-8"))
+
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+    assert rows[0] == ["title", "salary", "link", "skills"]
+    assert len(rows) == 3
+    assert rows[1][1:] == ["۲۰ میلیون تومان", rows[1][2], "Python, SQL"]
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+import pytest
+from app.core.config import settings
+from app.crud.job import create_jobs_with_keyword, touch_jobs_for_keyword
+from app.crud.keyword import get_keyword
+from app.schemas.job import JobCreate
+from app.services import export_cache
+from app.services.csv import cached_export_response
+from app.services.export_cache import build_export, evict_exports, export_etag, export_key
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+def _job(i, title=None):
+    return JobCreate(title=title or f"Job {i}", salary=None, link=f"https://example.com/jobs/{i}", skills=["Python"])
+
+def _version(db, keyword):
+    db.expire_all()
+    return get_keyword(db, keyword)["data_version"]
+
+def test_data_version_changes_with_the_data_and_its_order(db):
+    create_jobs_with_keyword(db, "python", [_job(1), _job(2)])
+    create_jobs_with_keyword(db, "backend", [_job(2)])
+    python, backend = _version(db, "python"), _version(db, "backend")
+
+    # same content again: refreshed relations move to the top of the keyword's
+    # jobs, so only its exports change, not those of the other keywords
+    create_jobs_with_keyword(db, "python", [_job(1), _job(2)])
+    assert (_version(db, "python"), _version(db, "backend")) == (python + 1, backend)
+    touch_jobs_for_keyword(db, "python", ["https://example.com/jobs/1"])
+    assert (_version(db, "python"), _version(db, "backend")) == (python + 2, backend)
+    python = _version(db, "python")
+
+    # a changed job invalidates every keyword it belongs to
+    create_jobs_with_keyword(db, "python", [_job(2, title="Senior Job 2")])
+    assert _version(db, "python") > python and _version(db, "backend") > backend
+
+    # a job newly linked to a keyword invalidates only that keyword
+    python, backend = _version(db, "python"), _version(db, "backend")
+    touch_jobs_for_keyword(db, "backend", ["https://example.com/jobs/1"])
+    assert (_version(db, "python"), _version(db, "backend")) == (python, backend + 1)
+
+def test_if_none_match_on_post_is_412():
+    key = export_key(1, 10, "csv", 0)
+    etag = export_etag(key)
+    assert cached_export_response(key, "csv", "a.csv", etag, method="GET").status_code == 304
+    assert cached_export_response(key, "csv", "a.csv", etag, method="POST").status_code == 412
+    assert cached_export_response(key, "csv", "a.csv", None, method="POST") is None
+
+def _write(content):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(content)
+    return write
+
+async def _body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+def test_cached_export_survives_eviction_while_streaming():
+    key = export_key(1, 10, "csv", 0)
+    path = build_export(key, "csv", _write(b"x" * 300_000))
+
+    response = cached_export_response(key, "csv", "a.csv")
+    assert response.headers["content-length"] == "300000"
+
+    os.remove(path)  # what eviction does
+    assert asyncio.run(_body(response)) == b"x" * 300_000
+    assert cached_export_response(key, "csv", "a.csv") is None
+
+def test_eviction_skips_recently_used_exports(monkeypatch):
+    old = build_export("old", "csv", _write(b"x" * 1000))
+    recent = build_export("recent", "csv", _write(b"x" * 1000))
+    stale = time.time() - export_cache.EVICT_GRACE_SECONDS - 10
+    os.utime(old, (stale, stale))
+
+    evict_exports(max_bytes=0)
+    assert not os.path.exists(old)
+    assert os.path.exists(recent)
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update, func
+from app.api.routes.protected_routes import download_export
+from app.core.config import settings
+from app.crud.export_job import claim_export_job, create_export_job, finish_export_job
+from app.models.export_job import ExportJob
+from app.models.keyword import Keyword
+from app.models.users import User
+from app.utils.auth_utils import verify_download_token
+from app.utils.clock import clock
+from app.worker.exports import download_link
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def export_job(db):
+    user = User(email="user@example.com")
+    keyword = Keyword(value="python")
+    db.add_all([user, keyword])
+    db.commit()
+    return create_export_job(db, user.id, keyword.id, "python", None, "csv", 0), user
+
+def _reload(db, export_id):
+    db.expire_all()
+    return db.get(ExportJob, export_id)
+
+def test_export_retried_then_failed(db, export_job):
+    job, _ = export_job
+    for _ in range(settings.QUEUE_MAX_ATTEMPTS):
+        claimed = claim_export_job(db, worker_id="worker")
+        assert claimed.id == job.id
+        finish_export_job(db, job.id, error="disk full")
+
+    assert _reload(db, job.id).status == "failed"
+    assert claim_export_job(db, worker_id="worker") is None
+
+def test_expired_lease_on_last_attempt_is_failed(db, export_job):
+    job, _ = export_job
+    db.execute(
+        update(ExportJob)
+        .values(
+            status="processing",
+            attempts=settings.QUEUE_MAX_ATTEMPTS,
+            claimed_by="dead-worker",
+            lease_expires_at=func.now() - timedelta(seconds=1),
+        )
+    )
+    db.commit()
+
+    assert claim_export_job(db, worker_id="worker") is None
+    job = _reload(db, job.id)
+    assert (job.status, job.error, job.claimed_by) == ("failed", "worker lease expired", None)
+    assert job.finished_at is not None
+
+def test_failed_export_error_is_not_returned(db, export_job):
+    job, user = export_job
+    db.execute(update(ExportJob).values(status="failed", error="/srv/data/exports/x.tmp: No space left on device"))
+    db.commit()
+
+    with pytest.raises(HTTPException) as error:
+        download_export(job.id, db, user)
+    assert error.value.status_code == 500
+    assert error.value.detail == "Export failed, please request it again"
+
+def test_pending_export_is_accepted(db, export_job):
+    job, user = export_job
+    response = download_export(job.id, db, user)
+    assert response.status_code == 202
+
+def test_emailed_link_works_without_a_login_until_it_expires(db, export_job):
+    job, user = export_job
+    with clock.frozen(NOW):
+        token = parse_qs(urlparse(download_link(job.id, user.id)).query)["token"][0]
+        assert download_export(job.id, db, None, None, token).status_code == 202
+
+        # only for this export, and not once expired
+        with pytest.raises(HTTPException) as error:
+            download_export("other-export", db, None, None, token)
+        assert error.value.status_code == 401
+        clock.advance(timedelta(hours=settings.DOWNLOAD_LINK_EXPIRE_HOURS))
+        with pytest.raises(HTTPException) as error:
+            download_export(job.id, db, None, None, token)
+        assert error.value.status_code == 401
+
+    forged = token.replace(f"{user.id}.", f"{user.id + 1}.", 1)
+    assert verify_download_token(job.id, forged) is None
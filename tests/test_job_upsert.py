@@ -0,0 +1,40 @@
+from sqlalchemy import event, select
+from app.crud.job import create_jobs_with_keyword, upsert_jobs
+from app.models.job import Job
+from app.models.keyword_job import keyword_job
+from app.schemas.job import JobCreate
+from database.session import engine
+
+def _jobs(n, title="Job"):
+    return [
+        JobCreate(title=f"{title} {i}", salary="۲۰ میلیون تومان", link=f"https://example.com/jobs/{i}", skills=["Python", " SQL ", "نامشخص"])
+        for i in range(n)
+    ]
+
+def test_upsert_inserts_updates_and_collapses_duplicates(db):
+    job_ids, changed_ids = upsert_jobs(db, _jobs(3) + [_jobs(1, title="Duplicate")[0]])
+    db.commit()
+    assert len(job_ids) == 3 and sorted(changed_ids) == sorted(job_ids)
+
+    job = db.execute(select(Job).where(Job.link == "https://example.com/jobs/0")).scalar_one()
+    assert (job.title, job.skills, job.salary_min, job.salary_max) == ("Duplicate 0", ["Python", "SQL"], 20_000_000, 20_000_000)
+
+    again_ids, changed_ids = upsert_jobs(db, _jobs(3, title="Duplicate")[:1] + _jobs(3)[1:])
+    assert sorted(again_ids) == sorted(job_ids)
+    assert changed_ids == []
+
+def test_create_jobs_with_keyword_round_trips(db):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = create_jobs_with_keyword(db, "python", _jobs(2500))
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert result["status"] == 1
+    assert len(result["job_ids"]) == 2500
+    relations = db.execute(select(keyword_job).where(keyword_job.c.keyword_id == result["keyword_id"])).all()
+    assert len(relations) == 2500
+    # keyword lookup + insert, then per 1000-row chunk: one job upsert and one relation upsert
+    assert len(statements) <= 12, statements
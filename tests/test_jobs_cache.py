@@ -0,0 +1,60 @@
+import fakeredis
+import pytest
+from app.utils.cache import JobsCache
+
+JOBS = [{"title": "توسعه دهنده پایتون", "link": "https://example.com/1"}]
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+def _cache(server, ttl=60) -> JobsCache:
+    cache = JobsCache(maxsize=10, ttl=ttl)
+    cache.redis = fakeredis.FakeRedis(server=server)
+    return cache
+
+def test_local_tier_only_without_redis():
+    cache = JobsCache(maxsize=10, ttl=60)
+    assert cache.get("python", 1, 10) is None
+    cache.set("python", 1, 10, JOBS)
+    assert cache.get("python", 1, 10) == JOBS
+    assert cache.get_metrics() == {"local": {"size": 1, "hits": 1, "misses": 1}}
+
+def test_redis_tier_shared_between_processes(server):
+    writer, reader = _cache(server), _cache(server)
+    writer.set("python", 1, 10, JOBS)
+
+    assert reader.get("python", 1, 10) == JOBS
+    assert reader.get("python", 1, 20) is None
+    assert reader.get_metrics()["redis"] == {"hits": 1, "misses": 1}
+
+    # the redis hit fills the reader's local tier
+    assert reader.get("python", 1, 10) == JOBS
+    assert reader.get_metrics()["redis"]["hits"] == 1
+
+def test_redis_entries_expire_with_ttl(server):
+    cache = _cache(server, ttl=30)
+    cache.set("python", 1, 10, JOBS)
+    assert 0 < cache.redis.ttl("jobs:python:1") <= 30
+
+def test_new_data_version_misses_in_every_process(server):
+    writer, reader = _cache(server), _cache(server)
+    writer.set("python", 1, 10, JOBS)
+    writer.set("java", 1, 10, JOBS)
+    assert reader.get("python", 1, 10) == JOBS
+
+    # the keyword's jobs changed: version 2 misses even in the reader's local tier
+    assert writer.get("python", 2, 10) is None
+    assert reader.get("python", 2, 10) is None
+    assert reader.get("java", 1, 10) == JOBS
+
+def test_redis_failures_are_misses(server):
+    cache = _cache(server)
+    cache.set("python", 1, 10, JOBS)
+    cache.local.delete(("python", 1, 10))
+    server.connected = False
+
+    assert cache.get("python", 1, 10) is None
+    # writes still work locally
+    cache.set("java", 1, 10, JOBS)
+    assert cache.get("java", 1, 10) == JOBS
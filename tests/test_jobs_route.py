@@ -0,0 +1,52 @@
+from sqlalchemy import event
+from app.api.routes.jobs import get_jobs
+from app.crud.job import create_jobs_with_keyword
+from app.models.keyword_queue import KeywordQueue
+from app.schemas.job import DetailResponse, JobCreate, JobRequest
+from app.utils.cache import jobs_cache
+from database.session import engine
+
+def _job(i, title=None):
+    return JobCreate(title=title or f"Job {i}", salary=None, link=f"https://example.com/jobs/{i}", skills=["Python"])
+
+def _get(db, **request):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = get_jobs(JobRequest(**request), db, None)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return response, len(statements)
+
+def test_one_query_per_page(db):
+    create_jobs_with_keyword(db, "python", [_job(i) for i in range(3)])
+    jobs_cache.local.clear()
+
+    # data version without a precomputed response, then the page
+    first, queries = _get(db, keyword="Python", limit=2)
+    assert [job.title for job in first.jobs] == ["Job 2", "Job 1"]
+    assert queries == 2
+
+    last, queries = _get(db, keyword="python", limit=2, cursor=first.next_cursor)
+    assert [job.title for job in last.jobs] == ["Job 0"] and last.next_cursor is None
+    assert queries == 1
+
+def test_unknown_keyword_is_queued(db):
+    response, _ = _get(db, keyword="golang", limit=2)
+    assert isinstance(response, DetailResponse)
+    assert db.query(KeywordQueue).one().keyword == "golang"
+
+def test_cached_page_follows_jobs_changed_under_another_keyword(db):
+    create_jobs_with_keyword(db, "python", [_job(1)])
+    jobs_cache.local.clear()
+    _get(db, keyword="python", limit=2)
+
+    cached, queries = _get(db, keyword="python", limit=2)
+    assert [job.title for job in cached.jobs] == ["Job 1"]
+    assert queries == 1
+
+    # rescraped for another keyword, e.g. by a worker process: python's data version moves on
+    create_jobs_with_keyword(db, "backend", [_job(1, title="Job 1 (edited)")])
+    fresh, _ = _get(db, keyword="python", limit=2)
+    assert [job.title for job in fresh.jobs] == ["Job 1 (edited)"]
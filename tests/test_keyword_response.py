@@ -0,0 +1,30 @@
+import json
+from app.crud.job import create_jobs_with_keyword
+from app.crud.keyword_response import get_first_page, refresh_keyword_response
+from app.schemas.job import JobCreate
+
+def _job(i):
+    return JobCreate(title=f"Job {i}", salary=None, link=f"https://example.com/jobs/{i}", skills=["Python"])
+
+def _titles(body):
+    return [job["title"] for job in json.loads(body)["jobs"]]
+
+def get_keyword_response(db, keyword_text, limit):
+    return get_first_page(db, keyword_text, limit)[1]
+
+def test_precomputed_response_is_served_until_the_jobs_change(db):
+    keyword_id = create_jobs_with_keyword(db, "python", [_job(1), _job(2)])["keyword_id"]
+    refresh_keyword_response(db, keyword_id)
+    assert _titles(get_keyword_response(db, "python", 10)) == ["Job 2", "Job 1"]
+
+    # new jobs bump the keyword's data version, so the blob is stale until rebuilt
+    create_jobs_with_keyword(db, "python", [_job(3)])
+    assert get_keyword_response(db, "python", 10) is None
+
+    refresh_keyword_response(db, keyword_id)
+    assert _titles(get_keyword_response(db, "python", 10)) == ["Job 3", "Job 2", "Job 1"]
+
+def test_first_page_lookup_returns_the_data_version(db):
+    assert get_first_page(db, "python", 10) == (None, None)
+    create_jobs_with_keyword(db, "python", [_job(1)])
+    assert get_first_page(db, "python", 10) == (1, None)
@@ -0,0 +1,141 @@
+import smtplib
+import socket
+import threading
+import time
+import pytest
+from app.services.email import MailQueue
+
+aiosmtpd = pytest.importorskip("aiosmtpd.controller")
+
+class Handler:
+    """
+    Local SMTP server: refuses recipients starting with "refused",
+    answers 451 to the first `temporary_failures` messages.
+    """
+
+    def __init__(self, temporary_failures: int = 0):
+        self.temporary_failures = temporary_failures
+        self.messages = []
+        self.sessions = set()
+        self.lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("refused"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.sessions.add(id(session))
+            if self.temporary_failures:
+                self.temporary_failures -= 1
+                return "451 4.3.0 Try again later"
+            self.messages.append(envelope)
+        return "250 OK"
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(handler):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        controller = aiosmtpd.Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        servers.append(controller)
+        return lambda: smtplib.SMTP("127.0.0.1", port, timeout=5)
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+def _queue(connect, **kwargs):
+    options = {"workers": 2, "maxsize": 1000, "batch_size": 20, "max_retries": 3, "retry_base_seconds": 0.05}
+    options.update(kwargs)
+    return MailQueue(connect=connect, **options)
+
+def _collect():
+    results = []
+    return results, lambda error, attempts, seconds: results.append((error, attempts))
+
+def test_sessions_are_reused(smtp_server):
+    handler = Handler()
+    mail_queue = _queue(smtp_server(handler))
+    results, on_result = _collect()
+
+    messages = 500
+    started = time.perf_counter()
+    for i in range(messages):
+        mail_queue.enqueue(f"user{i}@example.com", "Subject", "Body", on_result=on_result)
+    mail_queue.flush()
+    elapsed = time.perf_counter() - started
+
+    metrics = mail_queue.get_metrics()
+    print(f"{messages / elapsed:.0f} messages/s over {metrics['connections']} SMTP sessions")
+    assert len(handler.messages) == messages
+    assert results == [(None, 1)] * messages
+    assert metrics["sent"] == messages
+    # one session per worker, not per message
+    assert metrics["connections"] <= mail_queue.workers
+    assert len(handler.sessions) == metrics["connections"]
+
+def test_temporary_failure_is_retried_with_backoff(smtp_server):
+    handler = Handler(temporary_failures=2)
+    mail_queue = _queue(smtp_server(handler), workers=1, retry_base_seconds=0.1)
+    results, on_result = _collect()
+
+    started = time.perf_counter()
+    mail_queue.enqueue("user@example.com", "Subject", "Body", on_result=on_result)
+    mail_queue.flush()
+
+    # backoff of 0.1s, then 0.2s
+    assert time.perf_counter() - started >= 0.3
+    assert results == [(None, 3)]
+    assert len(handler.messages) == 1
+    metrics = mail_queue.get_metrics()
+    assert metrics["retries"] == 2
+    # each retry runs on a fresh session
+    assert metrics["connections"] == 3
+
+def test_gives_up_after_max_retries(smtp_server):
+    handler = Handler(temporary_failures=10)
+    mail_queue = _queue(smtp_server(handler), workers=1, max_retries=2, retry_base_seconds=0.01)
+    results, on_result = _collect()
+
+    mail_queue.enqueue("user@example.com", "Subject", "Body", on_result=on_result)
+    mail_queue.flush()
+
+    [(error, attempts)] = results
+    assert "Try again later" in error
+    assert attempts == 3
+    assert mail_queue.get_metrics()["failed"] == 1
+
+def test_refused_recipient_is_not_retried(smtp_server):
+    handler = Handler()
+    mail_queue = _queue(smtp_server(handler), workers=1)
+    results, on_result = _collect()
+
+    mail_queue.enqueue("refused@example.com", "Subject", "Body", on_result=on_result)
+    mail_queue.enqueue("user@example.com", "Subject", "Body", on_result=on_result)
+    mail_queue.flush()
+
+    assert results[0][1] == 1 and "No such user" in results[0][0]
+    assert results[1] == (None, 1)
+    metrics = mail_queue.get_metrics()
+    assert (metrics["sent"], metrics["failed"], metrics["retries"]) == (1, 1, 0)
+    # the session stays usable after a refusal
+    assert metrics["connections"] == 1
+
+def test_before_send_can_drop_a_message(smtp_server):
+    handler = Handler()
+    mail_queue = _queue(smtp_server(handler), workers=1)
+    results, on_result = _collect()
+
+    mail_queue.enqueue("user1@example.com", "Subject", "Body", before_send=lambda: False, on_result=on_result)
+    mail_queue.enqueue("user2@example.com", "Subject", "Body", before_send=lambda: True, on_result=on_result)
+    mail_queue.flush()
+
+    assert [envelope.rcpt_tos for envelope in handler.messages] == [["user2@example.com"]]
+    assert results == [(None, 1)]
@@ -0,0 +1,80 @@
+import threading
+from sqlalchemy import event, text
+from database.migrations import MIGRATIONS, _normalize_keyword_queue, _normalize_keywords, migration_id, run_migrations
+
+def _execute(db, statement, **params):
+    return db.execute(text(statement), params)
+
+def test_normalize_keyword_queue_merges_spellings(db):
+    _execute(db, "INSERT INTO users (id, email) VALUES (1, 'a@example.com'), (2, 'b@example.com')")
+    # inserted without the unique active-keyword index, as on databases that predate it
+    _execute(db, "DROP INDEX uq_keyword_queue_active_keyword")
+    _execute(db, """
+        INSERT INTO keyword_queue (id, keyword, user_id, status) VALUES
+            (1, 'Back‌End', 1, 'pending'),
+            (2, 'back  end', 2, 'processing'),
+            (3, 'python', NULL, 'pending'),
+            (4, 'Back End', 1, 'done')
+    """)
+    connection = db.connection()
+    _normalize_keyword_queue(connection)
+    _normalize_keyword_queue(connection)  # idempotent
+    _execute(db, "CREATE UNIQUE INDEX uq_keyword_queue_active_keyword ON keyword_queue (keyword) WHERE status IN ('pending', 'processing')")
+
+    rows = _execute(db, "SELECT id, keyword, status FROM keyword_queue ORDER BY id").all()
+    assert rows == [(1, "back end", "pending"), (2, "back  end", "merged"), (3, "python", "pending"), (4, "Back End", "done")]
+    subscribers = _execute(db, "SELECT queue_id, user_id FROM keyword_queue_subscriber ORDER BY user_id").all()
+    assert subscribers == [(1, 1), (1, 2)]
+    db.rollback()
+
+def test_normalize_keywords_merges_jobs(db):
+    _execute(db, "INSERT INTO keyword (id, value) VALUES (1, 'Python'), (2, 'python'), (3, ' PYTHON '), (4, 'Go  Lang')")
+    _execute(db, "INSERT INTO job (id, title, link) VALUES (1, 'a', 'l1'), (2, 'b', 'l2'), (3, 'c', 'l3')")
+    _execute(db, """
+        INSERT INTO keyword_job (keyword_id, job_id, last_update) VALUES
+            (1, 1, '2024-01-02'), (2, 1, '2024-01-01'), (3, 2, '2024-01-03'), (4, 3, '2024-01-01')
+    """)
+    connection = db.connection()
+    _normalize_keywords(connection)
+    _normalize_keywords(connection)  # idempotent
+
+    keywords = _execute(db, "SELECT id, value, data_version FROM keyword ORDER BY id").all()
+    assert keywords == [(2, "python", 1), (4, "go lang", 1)]
+    relations = _execute(db, "SELECT keyword_id, job_id, last_update::date::text FROM keyword_job ORDER BY keyword_id, job_id").all()
+    assert relations == [(2, 1, "2024-01-02"), (2, 2, "2024-01-03"), (4, 3, "2024-01-01")]
+    db.rollback()
+
+def test_keywords_with_a_precomputed_response_count_as_scraped(db):
+    _execute(db, "ALTER TABLE keyword DROP COLUMN scraped_at")
+    _execute(db, "INSERT INTO keyword (id, value) VALUES (1, 'python'), (2, 'go')")
+    _execute(db, "INSERT INTO keyword_response (keyword_id, jobs_json, offsets, complete) VALUES (1, '[]', '{}', true)")
+    migration = next(m for m in MIGRATIONS if isinstance(m, str) and "scraped_at" in m)
+    _execute(db, migration)
+    _execute(db, migration)  # idempotent
+
+    scraped = _execute(db, "SELECT id, scraped_at IS NOT NULL FROM keyword ORDER BY id").all()
+    assert scraped == [(1, True), (2, False)]
+    db.rollback()
+
+def test_migrations_run_once(db, db_engine):
+    # the db fixture's TRUNCATE forgot what ran at session start
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(run_migrations(db_engine))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # one caller applied everything, the other waited for it and found it done
+    assert sorted(results) == [0, len(MIGRATIONS)]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_engine, "before_cursor_execute", listener)
+    try:
+        assert run_migrations(db_engine) == 0
+    finally:
+        event.remove(db_engine, "before_cursor_execute", listener)
+    assert not any("ALTER" in statement for statement in statements)
+
+    applied = _execute(db, "SELECT id FROM schema_migration").scalars().all()
+    assert sorted(applied) == sorted(migration_id(m) for m in MIGRATIONS)
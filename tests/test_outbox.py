@@ -0,0 +1,68 @@
+from datetime import timedelta
+from sqlalchemy import update, func
+from app.core.config import settings
+from app.crud.email_outbox import add_email, claim_emails, purge_emails, record_delivery, renew_email_lease
+from app.models.email_outbox import EmailOutbox
+
+def _claim_one(db, worker_id="worker-1"):
+    add_email(db, "user@example.com", "Your OTP", "Your OTP is: 123456")
+    db.commit()
+    [email] = claim_emails(db, limit=10, worker_id=worker_id)
+    return email.id
+
+def _get(db, email_id):
+    db.expire_all()
+    return db.get(EmailOutbox, email_id)
+
+def test_sent_email_body_is_cleared(db):
+    email_id = _claim_one(db)
+    assert record_delivery(db, email_id, "worker-1", None, 1, 0.2)
+
+    email = _get(db, email_id)
+    assert (email.status, email.body, email.attempts, email.claimed_by) == ("sent", "", 1, None)
+
+def test_failed_email_is_retried_then_cleared(db):
+    email_id = _claim_one(db)
+    assert record_delivery(db, email_id, "worker-1", "timed out", 4, 120)
+    email = _get(db, email_id)
+    assert (email.status, email.attempts) == ("pending", 4)
+    assert email.body == "Your OTP is: 123456"
+
+    db.execute(update(EmailOutbox).values(status="sending", claimed_by="worker-1"))
+    db.commit()
+    assert record_delivery(db, email_id, "worker-1", "timed out", settings.OUTBOX_MAX_ATTEMPTS - 4, 120)
+    email = _get(db, email_id)
+    assert (email.status, email.body) == ("failed", "")
+
+def test_delivery_after_lost_lease_is_not_recorded(db):
+    email_id = _claim_one(db)
+
+    # the lease expired and another worker took the email over
+    db.execute(update(EmailOutbox).values(lease_expires_at=func.now() - timedelta(seconds=1)))
+    db.commit()
+    assert [email.id for email in claim_emails(db, limit=10, worker_id="worker-2")] == [email_id]
+
+    assert not renew_email_lease(db, email_id, "worker-1")
+    assert not record_delivery(db, email_id, "worker-1", None, 1, 0.2)
+    assert _get(db, email_id).claimed_by == "worker-2"
+
+    assert renew_email_lease(db, email_id, "worker-2")
+    assert record_delivery(db, email_id, "worker-2", None, 1, 0.2)
+    # a late duplicate outcome is ignored
+    assert not record_delivery(db, email_id, "worker-2", "timed out", 1, 0.2)
+    assert _get(db, email_id).status == "sent"
+
+def test_purge_deletes_only_old_finished_emails(db):
+    for status in ("sent", "failed", "pending", "sent"):
+        add_email(db, "user@example.com", status, "body")
+    db.commit()
+    db.execute(update(EmailOutbox).values(status=EmailOutbox.subject))
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id < 4)
+        .values(created_at=func.now() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS + 1))
+    )
+    db.commit()
+
+    assert purge_emails(db, timedelta(hours=settings.OUTBOX_RETENTION_HOURS), batch_size=1) == 2
+    assert sorted(email.status for email in db.query(EmailOutbox)) == ["pending", "sent"]
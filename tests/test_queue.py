@@ -0,0 +1,163 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+import pytest
+from sqlalchemy import select, update, func
+from app.core.config import settings
+from app.models.keyword_queue import KeywordQueue
+from app.crud.queue import LeaseLost, add_keyword_to_queue, claim_pending_keywords, mark_keyword_done, release_keyword
+from app.models.email_outbox import EmailOutbox
+from app.models.keyword_queue_subscriber import keyword_queue_subscriber
+from app.models.users import User
+from app.worker.lease import LeaseHeartbeat
+from app.worker.scheduler import finish_keyword
+from database.session import SessionLocal
+
+def _expire_lease(db, queue_id):
+    db.execute(
+        update(KeywordQueue)
+        .where(KeywordQueue.id == queue_id)
+        .values(lease_expires_at=func.now() - timedelta(seconds=1))
+    )
+    db.commit()
+
+def test_concurrent_claimers_never_share_items(db):
+    items = 200
+    claimers = 16
+    for i in range(items):
+        add_keyword_to_queue(db, f"keyword {i}")
+
+    claimed = []
+    claimed_lock = threading.Lock()
+    start = threading.Barrier(claimers)
+
+    def claimer(worker_id):
+        with SessionLocal() as session:
+            start.wait()
+            while True:
+                batch = claim_pending_keywords(session, limit=3, worker_id=worker_id)
+                if not batch:
+                    return
+                with claimed_lock:
+                    claimed.extend((item.id, item.claimed_by) for item in batch)
+
+    threads = [threading.Thread(target=claimer, args=(f"worker-{i}",)) for i in range(claimers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counts = Counter(item_id for item_id, _ in claimed)
+    assert len(counts) == items
+    assert max(counts.values()) == 1
+
+    # every item is held by the worker that claimed it
+    owners = dict(claimed)
+    rows = db.query(KeywordQueue).all()
+    assert all(row.status == "processing" and row.claimed_by == owners[row.id] for row in rows)
+
+def test_release_retries_then_fails(db):
+    queue_id = add_keyword_to_queue(db, "python")
+
+    for attempt in range(1, settings.QUEUE_MAX_ATTEMPTS + 1):
+        [item] = claim_pending_keywords(db, worker_id="worker")
+        assert item.attempts == attempt
+        release_keyword(db, item.id, "worker")
+
+    item = db.get(KeywordQueue, queue_id)
+    db.refresh(item)
+    assert item.status == "failed"
+    assert item.processed_at is not None
+    assert claim_pending_keywords(db, worker_id="worker") == []
+
+def test_expired_lease_on_last_attempt_is_failed(db):
+    queue_id = add_keyword_to_queue(db, "python")
+    db.execute(
+        update(KeywordQueue)
+        .where(KeywordQueue.id == queue_id)
+        .values(
+            status="processing",
+            attempts=settings.QUEUE_MAX_ATTEMPTS,
+            claimed_by="dead-worker",
+            lease_expires_at=func.now() - timedelta(seconds=1),
+        )
+    )
+    db.commit()
+
+    assert claim_pending_keywords(db, worker_id="worker") == []
+    item = db.get(KeywordQueue, queue_id)
+    db.refresh(item)
+    assert item.status == "failed"
+    assert item.claimed_by is None
+
+def test_failed_item_frees_the_keyword(db):
+    queue_id = add_keyword_to_queue(db, "python")
+    for _ in range(settings.QUEUE_MAX_ATTEMPTS):
+        [item] = claim_pending_keywords(db, worker_id="worker")
+        release_keyword(db, item.id, "worker")
+
+    assert add_keyword_to_queue(db, "Python") != queue_id
+
+def test_requests_coalesce_on_normalized_keyword(db):
+    queue_id = add_keyword_to_queue(db, "Back‌End  Developer")
+    assert add_keyword_to_queue(db, " back end developer ") == queue_id
+    assert db.get(KeywordQueue, queue_id).keyword == "back end developer"
+
+def test_only_the_lease_holder_finishes_an_item(db):
+    queue_id = add_keyword_to_queue(db, "python")
+    claim_pending_keywords(db, worker_id="slow-worker")
+    _expire_lease(db, queue_id)
+    claim_pending_keywords(db, worker_id="worker")
+
+    assert not mark_keyword_done(db, queue_id, "slow-worker")
+    db.rollback()
+    release_keyword(db, queue_id, "slow-worker")
+    item = db.get(KeywordQueue, queue_id)
+    db.refresh(item)
+    assert (item.status, item.claimed_by) == ("processing", "worker")
+
+    assert mark_keyword_done(db, queue_id, "worker")
+    db.commit()
+    db.refresh(item)
+    assert item.status == "done"
+    assert item.processed_at is not None
+    assert not mark_keyword_done(db, queue_id, "worker")
+
+def test_heartbeat_renews_until_the_lease_is_lost(db):
+    queue_id = add_keyword_to_queue(db, "python")
+    [item] = claim_pending_keywords(db, worker_id="worker")
+    claimed_until = item.lease_expires_at
+
+    with LeaseHeartbeat(queue_id, "worker", interval=0.01) as lease:
+        while db.get(KeywordQueue, queue_id, populate_existing=True).lease_expires_at == claimed_until:
+            db.rollback()
+        lease.check()
+
+        _expire_lease(db, queue_id)
+        claim_pending_keywords(db, worker_id="other-worker")
+        assert lease.lost.wait(5)
+        with pytest.raises(LeaseLost):
+            lease.check()
+
+def test_subscriber_joining_while_finishing_is_notified(db):
+    user = User(email="late@example.com")
+    db.add(user)
+    db.commit()
+    queue_id = add_keyword_to_queue(db, "python")
+    [item] = claim_pending_keywords(db, worker_id="worker")
+
+    # a concurrent add_keyword_to_queue has locked the item and not yet committed
+    with SessionLocal() as joining:
+        joining.execute(
+            select(KeywordQueue.id).where(KeywordQueue.id == queue_id).with_for_update(read=True)
+        )
+        joining.execute(keyword_queue_subscriber.insert().values(queue_id=queue_id, user_id=user.id))
+
+        finisher = threading.Thread(target=finish_keyword, args=(db, item, "worker", "done"))
+        finisher.start()
+        finisher.join(0.2)
+        assert finisher.is_alive()
+        joining.commit()
+        finisher.join(5)
+
+    assert [email.to_email for email in db.query(EmailOutbox)] == ["late@example.com"]
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+from app.models.job import Job
+from app.utils.backfill_salaries import backfill_salaries
+from app.utils.salary_utils import parse_salaries, parse_salary, parse_salary_list
+
+@pytest.mark.parametrize("salary, expected", [
+    ("۲۰ - ۳۰ میلیون تومان", (20_000_000, 30_000_000)),
+    ("30 - 20 میلیون", (20_000_000, 30_000_000)),
+    ("از ۱۵ میلیون تومان", (15_000_000, None)),
+    ("حقوق از ۱۰ میلیون", (10_000_000, None)),
+    ("تا ۲۵ میلیون تومان", (None, 25_000_000)),
+    ("۲۵", (25_000_000, 25_000_000)),
+    ("25,000,000 تومان", (25_000_000, 25_000_000)),
+    ("۲۵۰٬۰۰۰٬۰۰۰ ریال", (25_000_000, 25_000_000)),
+    ("۱۲٫۵ میلیون", (12_500_000, 12_500_000)),
+    ("۱.۵ میلیارد تومان", (1_500_000_000, 1_500_000_000)),
+    ("۸۰۰ هزار تومان", (800_000, 800_000)),
+    ("۱۲ میلیون و ۵۰۰ هزار تومان", (12_500_000, 12_500_000)),
+    ("۸۰۰ هزار تا ۱.۲ میلیون", (800_000, 1_200_000)),
+    ("حقوق ۲۰ میلیون + پاداش ۲ ماهه", (20_000_000, 20_000_000)),
+    ("۲۰ الی ۲۵ میلیون تومان", (20_000_000, 25_000_000)),
+    ("توافقی", (None, None)),
+    ("حقوق توافقی", (None, None)),
+    ("قانون کار", (None, None)),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_salary(salary, expected):
+    assert parse_salary(salary) == expected
+
+def test_parse_salary_list_keeps_order_and_repeats():
+    salaries = ["۲۵", None, "توافقی", "۲۵", "از ۱۵ میلیون"]
+    assert parse_salary_list(salaries) == [
+        (25_000_000, 25_000_000),
+        (None, None),
+        (None, None),
+        (25_000_000, 25_000_000),
+        (15_000_000, None),
+    ]
+
+def test_parse_salaries_aligns_with_index():
+    salaries = pd.Series(["۲۰ - ۳۰ میلیون", None], index=[7, 3], dtype=object)
+    parsed = parse_salaries(salaries)
+
+    assert list(parsed.index) == [7, 3]
+    assert str(parsed["salary_min"].dtype) == "Int64"
+    assert parsed.loc[7, "salary_max"] == 30_000_000
+    assert pd.isna(parsed.loc[3, "salary_min"])
+
+def test_backfill_salaries(db):
+    db.add_all([
+        Job(title="a", link="https://example.com/a", salary="۲۰ - ۳۰ میلیون تومان"),
+        Job(title="b", link="https://example.com/b", salary="توافقی"),
+        Job(title="c", link="https://example.com/c", salary=None),
+        Job(title="d", link="https://example.com/d", salary="۲۵", salary_min=1, salary_max=1),
+    ])
+    db.commit()
+
+    assert backfill_salaries(db, batch_size=1) == 2
+    db.expire_all()
+    bounds = {job.title: (job.salary_min, job.salary_max) for job in db.query(Job)}
+    assert bounds == {
+        "a": (20_000_000, 30_000_000),
+        "b": (None, None),
+        "c": (None, None),
+        "d": (1, 1),
+    }
+
+    # a batch of only unparseable salaries is written as NULLs
+    assert backfill_salaries(db, batch_size=1, only_missing=False) == 3
+    db.expire_all()
+    assert db.query(Job).filter_by(title="d").one().salary_min == 25_000_000
@@ -0,0 +1,33 @@
+import app.worker.scheduler as scheduler
+from app.crud.keyword import get_keyword
+from app.crud.queue import add_keyword_to_queue
+from app.models.keyword_queue import KeywordQueue
+from app.schemas.job import JobCreate
+
+def test_partially_scraped_keyword_is_scraped_again(db, monkeypatch):
+    scrapes = []
+
+    def scrape_jobs(keyword, on_batch, **kwargs):
+        scrapes.append(keyword)
+        on_batch([JobCreate(title="Job", link=f"https://example.com/jobs/{len(scrapes)}", skills=["Python"])])
+        if len(scrapes) == 1:
+            raise RuntimeError("driver crashed")
+
+    monkeypatch.setattr(scheduler, "scrape_jobs", scrape_jobs)
+
+    queue_id = add_keyword_to_queue(db, "python")
+    scheduler.process_pending_keywords(db, limit=1)
+    # the first batch created the keyword, but the scrape didn't finish
+    keyword = get_keyword(db, "python")
+    assert keyword["status"] == 1 and keyword["scraped_at"] is None
+    assert db.get(KeywordQueue, queue_id, populate_existing=True).status == "pending"
+
+    scheduler.process_pending_keywords(db, limit=1)
+    assert len(scrapes) == 2
+    assert get_keyword(db, "python")["scraped_at"] is not None
+    assert db.get(KeywordQueue, queue_id, populate_existing=True).status == "done"
+
+    # once complete, requests are answered without scraping
+    add_keyword_to_queue(db, "python")
+    scheduler.process_pending_keywords(db, limit=1)
+    assert len(scrapes) == 2
@@ -0,0 +1,25 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from app.api.routes import jobs
+from app.schemas.job import JobRequest, MAX_JOBS_PAGE_SIZE
+
+@pytest.mark.parametrize("limit", [0, 1, MAX_JOBS_PAGE_SIZE])
+def test_job_request_limit_in_range(limit):
+    assert JobRequest(keyword="python", limit=limit).limit == limit
+
+def test_job_request_limit_default():
+    assert JobRequest(keyword="python").limit == 10
+
+@pytest.mark.parametrize("limit", [-1, -2**40, None, MAX_JOBS_PAGE_SIZE + 1])
+def test_job_request_limit_rejected(limit):
+    with pytest.raises(ValidationError):
+        JobRequest(keyword="python", limit=limit)
+
+@pytest.mark.parametrize("limit", [-1, MAX_JOBS_PAGE_SIZE + 1])
+def test_skill_jobs_limit_rejected(limit):
+    app = FastAPI()
+    app.include_router(jobs.router)
+    response = TestClient(app).get("/skills/Python/jobs", params={"limit": limit})
+    assert response.status_code == 422
@@ -0,0 +1,186 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import pytest
+from selenium.common.exceptions import WebDriverException
+from app.worker.scraper import JobVision, Karbord, driver_pool, pipeline
+from app.schemas.job import JobBase
+from app.utils.clock import clock
+from app.utils.date_utils import parse_relative_age
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+def load(name):
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+def test_jobvision_job_list():
+    jobs = JobVision.parse_job_list(load("jobvision_list.json"))
+    assert jobs == [
+        {
+            "title": "برنامه نویس Python",
+            "salary": "۲۵ تا ۳۵ میلیون تومان",
+            "link": "https://jobvision.ir/jobs/912345",
+            "posted_at": datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc),
+        },
+        {
+            "title": "کارآموز بک اند",
+            "salary": "نامشخص",
+            "link": "https://jobvision.ir/jobs/912346",
+            "posted_at": datetime(2024, 5, 2, 10, 0, tzinfo=timezone.utc),
+        },
+    ]
+
+def test_jobvision_job_skills():
+    skills = JobVision.parse_job_skills(load("jobvision_detail.json"))
+    assert skills == ["Python", "Django", "حل مسئله", "English"]
+
+def test_karbord_job_list():
+    jobs = Karbord.parse_job_list(load("karbord_list.json"))
+    assert jobs == [
+        {
+            "title": "توسعه دهنده فرانت اند",
+            "salary": "۲۰ - ۳۰ میلیون تومان",
+            "link": "https://karbord.io/jobs/detail/51234",
+            "posted_at": datetime(2024, 5, 3, 12, 0, tzinfo=timezone.utc),
+        },
+        {
+            "title": "Data Engineer",
+            "salary": "نامشخص",
+            "link": "https://karbord.io/jobs/detail/51235",
+            "posted_at": None,
+        },
+    ]
+
+def test_karbord_job_skills():
+    skills = Karbord.parse_job_skills(load("karbord_detail.json"))
+    assert skills == ["React", "TypeScript", "Figma (متوسط)", "Git"]
+
+@pytest.mark.parametrize("parse", [JobVision.parse_job_list, Karbord.parse_job_list])
+@pytest.mark.parametrize("payload", [
+    {},
+    [],
+    {"data": None},
+    {"data": {"items": []}},
+    {"data": {"jobPosts": [{"name": "x"}], "jobPositions": [{"name": "x"}]}},
+])
+def test_unrecognized_job_list_raises(parse, payload):
+    with pytest.raises(ValueError):
+        parse(payload)
+
+def test_empty_last_page_is_not_an_error():
+    assert JobVision.parse_job_list({"data": {"jobPosts": []}}) == []
+    assert Karbord.parse_job_list({"data": {"jobPositions": []}}) == []
+
+def _source(name, pages, fallback_jobs, calls):
+    def fetch_list_page(keyword, page):
+        calls.append((name, "list", page))
+        result = pages[page - 1] if page <= len(pages) else []
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def fetch_job_detail(job):
+        return {**job, "skills": ["Python"]}
+
+    def fallback(keyword, **bounds):
+        calls.append((name, "fallback", keyword))
+        return fallback_jobs
+
+    return {"name": name, "page_size": 2, "fetch_list_page": fetch_list_page, "fetch_job_detail": fetch_job_detail, "fallback": fallback}
+
+@pytest.mark.parametrize("first_page", [[], ValueError("Unrecognized listing payload")])
+def test_pipeline_falls_back_to_selenium_on_empty_or_unrecognized_first_page(monkeypatch, first_page):
+    calls = []
+    fallback_job = JobBase(title="From browser", salary=None, link="https://karbord.io/jobs/detail/1", skills=["Go"])
+    monkeypatch.setattr(pipeline, "SOURCES", [_source("karbord", [first_page], [fallback_job], calls)])
+    monkeypatch.setattr(pipeline.settings, "SCRAPER_BACKEND", "http")
+
+    batches = []
+    total = asyncio.run(pipeline.run_pipeline("golang", batches.extend, batch_size=10, host_concurrency=1))
+
+    assert total == 1
+    assert batches == [fallback_job]
+    assert calls == [("karbord", "list", 1), ("karbord", "fallback", "golang")]
+
+def _job(n):
+    return {"title": f"Job {n}", "salary": None, "link": f"https://karbord.io/jobs/detail/{n}"}
+
+@pytest.mark.parametrize("pages, listed", [
+    # a full page of known links ends pagination
+    ([[_job(1), _job(2)], [_job(3), _job(4)]], [1]),
+    # a short one doesn't
+    ([[_job(1)], [_job(3), _job(4)]], [1, 2, 3]),
+])
+def test_pipeline_watermark_needs_a_full_page(monkeypatch, pages, listed):
+    calls = []
+    monkeypatch.setattr(pipeline, "SOURCES", [_source("karbord", pages, [], calls)])
+    monkeypatch.setattr(pipeline.settings, "SCRAPER_BACKEND", "http")
+
+    watermark = {_job(1)["link"], _job(2)["link"]}
+    asyncio.run(pipeline.run_pipeline("golang", lambda batch: None, batch_size=10, host_concurrency=1,
+                                      watermark_links=watermark))
+
+    assert [page for _, kind, page in calls if kind == "list"] == listed
+
+def test_pipeline_passes_bounds_to_selenium_fallback(monkeypatch):
+    bounds = {}
+    source = _source("karbord", [ValueError("Unrecognized listing payload")], [], [])
+    source["fallback"] = lambda keyword, **kwargs: bounds.update(kwargs) or []
+    monkeypatch.setattr(pipeline, "SOURCES", [source])
+    monkeypatch.setattr(pipeline.settings, "SCRAPER_BACKEND", "http")
+
+    asyncio.run(pipeline.run_pipeline("golang", lambda batch: None, batch_size=10, host_concurrency=1,
+                                      watermark_links={"x"}, max_pages=3, max_age_days=7))
+
+    assert bounds["watermark_links"] == {"x"}
+    assert bounds["max_pages"] == 3
+    assert bounds["max_age_cutoff"] < datetime.now(timezone.utc)
+
+def test_pipeline_raises_after_a_failed_batch(monkeypatch):
+    pages = [[_job(1), _job(2)], [_job(3), _job(4)]]
+    monkeypatch.setattr(pipeline, "SOURCES", [_source("karbord", pages, [], [])])
+    monkeypatch.setattr(pipeline.settings, "SCRAPER_BACKEND", "http")
+
+    saved = []
+    def on_batch(batch):
+        if not saved:
+            saved.append(None)
+            raise RuntimeError("database went away")
+        saved.extend(batch)
+
+    with pytest.raises(pipeline.ScrapeError):
+        asyncio.run(pipeline.run_pipeline("golang", on_batch, batch_size=2, host_concurrency=1))
+    # the batches after it were still saved
+    assert len(saved) == 3
+
+class _CrashedDriver:
+    def get(self, url):
+        raise WebDriverException("chrome not reachable")
+
+    def quit(self):
+        pass
+
+@pytest.mark.parametrize("scraper", [JobVision, Karbord])
+def test_crashed_driver_only_loses_the_jobs_skills(monkeypatch, scraper):
+    pool = driver_pool.DriverPool(size=1, max_pages=10)
+    monkeypatch.setattr(driver_pool, "create_driver", _CrashedDriver)
+    monkeypatch.setattr(scraper, "driver_pool", pool)
+
+    jobs = [{"title": f"Job {n}", "link": f"https://example.com/jobs/{n}"} for n in range(2)]
+    assert [scraper.fetch_job_skills(job)["skills"] for job in jobs] == [[], []]
+    # each crashed driver was discarded rather than handed out again
+    assert pool.get_metrics()["recycles"] == 2
+
+@pytest.mark.parametrize("text, days", [
+    ("برنامه نویس پایتون\nتهران\n۳ روز پیش", 3),
+    ("2 هفته قبل", 14),
+    ("دیروز", 1),
+    ("امروز", 0),
+    ("برنامه نویس پایتون", None),
+])
+def test_parse_relative_age(text, days):
+    now = datetime(2024, 5, 10, tzinfo=timezone.utc)
+    with clock.frozen(now):
+        posted_at = parse_relative_age(text)
+    assert posted_at == (None if days is None else now - timedelta(days=days))
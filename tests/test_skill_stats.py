@@ -0,0 +1,82 @@
+from sqlalchemy import select, text, update
+from app.crud.skill_stat import get_trending_skills, refresh_keyword_skill_stats
+from app.models.job import Job
+from app.models.keyword import Keyword
+from app.models.keyword_job import keyword_job
+from app.models.skill_stat import SkillStat
+from app.services.keyword_refresh import refresh_all_skill_stats
+from database.migrations import MIGRATIONS, _normalize_keywords
+
+def _keyword(db, value, jobs):
+    keyword = Keyword(value=value)
+    db.add(keyword)
+    db.flush()
+    for link, skills in jobs.items():
+        job = db.execute(select(Job).where(Job.link == link)).scalar_one_or_none()
+        if job is None:
+            job = Job(title=link, link=link, skills=skills)
+            db.add(job)
+            db.flush()
+        db.execute(keyword_job.insert().values(keyword_id=keyword.id, job_id=job.id))
+    db.commit()
+    return keyword.id
+
+def _recomputed(db, window):
+    # what get_trending_skills returned before skill_stat
+    return db.execute(text("""
+        SELECT skill, sum(count), count(*) FROM keyword_skill_stat WHERE "window" = :window
+        GROUP BY skill ORDER BY sum(count) DESC, skill
+    """), {"window": window}).all()
+
+def test_totals_follow_keyword_refreshes(db):
+    python = _keyword(db, "python", {"j1": ["Python", "Django"], "j2": ["Python", "SQL"]})
+    backend = _keyword(db, "backend", {"j2": ["Python", "SQL"], "j3": ["Go"]})
+    refresh_keyword_skill_stats(db, python)
+    refresh_keyword_skill_stats(db, backend)
+
+    assert get_trending_skills(db, "all", 10) == [("Python", 3, 2), ("SQL", 2, 2), ("Django", 1, 1), ("Go", 1, 1)]
+    assert get_trending_skills(db, "7d", 10) == _recomputed(db, "7d")
+
+    # python loses j1, and Django with it
+    j1 = db.execute(select(Job.id).where(Job.link == "j1")).scalar_one()
+    db.execute(keyword_job.delete().where(keyword_job.c.keyword_id == python, keyword_job.c.job_id == j1))
+    db.commit()
+    refresh_keyword_skill_stats(db, python)
+    refresh_keyword_skill_stats(db, python)  # nothing changed
+
+    assert get_trending_skills(db, "all", 10) == [("Python", 2, 2), ("SQL", 2, 2), ("Go", 1, 1)]
+    for window in ("7d", "30d", "all"):
+        assert get_trending_skills(db, window, 10) == _recomputed(db, window)
+    assert db.execute(select(SkillStat).where(SkillStat.skill == "Django")).first() is None
+
+def test_daily_recount_ages_windowed_stats(db):
+    python = _keyword(db, "python", {"j1": ["Python"], "j2": ["Python", "SQL"]})
+    backend = _keyword(db, "backend", {"j2": ["Python", "SQL"]})
+    refresh_keyword_skill_stats(db, python)
+    refresh_keyword_skill_stats(db, backend)
+    assert get_trending_skills(db, "7d", 10) == [("Python", 3, 2), ("SQL", 2, 2)]
+
+    # days pass without the keywords being scraped again
+    db.execute(update(keyword_job).values(last_update=text("now() - interval '10 days'")).where(keyword_job.c.keyword_id == python))
+    db.commit()
+    assert refresh_all_skill_stats(db) == 2
+
+    assert get_trending_skills(db, "7d", 10) == [("Python", 1, 1), ("SQL", 1, 1)]
+    assert get_trending_skills(db, "30d", 10) == get_trending_skills(db, "all", 10) == [("Python", 3, 2), ("SQL", 2, 2)]
+
+def test_migrations_sum_existing_stats_and_drop_merged_keywords(db):
+    python = _keyword(db, "python", {"j1": ["Python"]})
+    spelled = _keyword(db, "Python", {"j2": ["Python", "SQL"]})
+    refresh_keyword_skill_stats(db, python)
+    refresh_keyword_skill_stats(db, spelled)
+
+    # as before skill_stat existed
+    db.execute(text("DELETE FROM skill_stat"))
+    backfill = next(m for m in MIGRATIONS if isinstance(m, str) and "INSERT INTO skill_stat" in m)
+    db.execute(text(backfill))
+    db.execute(text(backfill))  # idempotent
+    assert get_trending_skills(db, "all", 10) == [("Python", 2, 2), ("SQL", 1, 1)]
+
+    _normalize_keywords(db.connection())
+    assert get_trending_skills(db, "all", 10) == _recomputed(db, "all") == [("Python", 1, 1)]
+    db.rollback()
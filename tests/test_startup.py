@@ -0,0 +1,60 @@
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+import app.worker.scheduler as scheduler_module
+
+# API startup only creates the schema and runs migrations
+STARTUP_BUDGET_SECONDS = 5
+
+@pytest.fixture
+def no_scraping(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("scraping started during API startup")
+
+    for name in ("scrape_jobs", "seed_initial_keywords", "seed_job"):
+        monkeypatch.setattr(scheduler_module, name, fail)
+
+def _start(app) -> float:
+    started = time.perf_counter()
+    with TestClient(app) as client:
+        elapsed = time.perf_counter() - started
+        assert client.get("/docs").status_code == 200
+    return elapsed
+
+def test_startup_within_budget_without_scraping(db_engine, no_scraping):
+    from main import app
+
+    assert _start(app) < STARTUP_BUDGET_SECONDS
+    assert not scheduler_module.scheduler.running
+
+def test_startup_with_scheduler_does_not_wait_for_seeding(db_engine, monkeypatch):
+    from main import app
+
+    # seeding runs as a scheduler job, never inline in startup
+    seeding = threading.Event()
+    release = threading.Event()
+
+    def slow_seed():
+        seeding.set()
+        release.wait(STARTUP_BUDGET_SECONDS * 2)
+
+    monkeypatch.setattr(scheduler_module, "seed_job", slow_seed)
+    monkeypatch.setattr(settings, "RUN_SCHEDULER_IN_API", True)
+    monkeypatch.setattr(settings, "SEED_ON_START", True)
+
+    started = time.perf_counter()
+    with TestClient(app):
+        elapsed = time.perf_counter() - started
+        assert seeding.wait(STARTUP_BUDGET_SECONDS)
+        release.set()
+
+    assert elapsed < STARTUP_BUDGET_SECONDS
+    assert not scheduler_module.scheduler.running
+
+def test_threadpool_defaults_to_database_pool_size():
+    from app.core.config import Settings
+
+    assert Settings(DB_POOL_SIZE=5, DB_MAX_OVERFLOW=3).API_THREADPOOL_SIZE == 8
+    assert Settings(DB_POOL_SIZE=5, DB_MAX_OVERFLOW=3, API_THREADPOOL_SIZE=4).API_THREADPOOL_SIZE == 4